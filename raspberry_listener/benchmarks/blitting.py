@@ -0,0 +1,83 @@
+"""Compares a full draw of the line plot figure with blitting its lines over the cached background.
+
+Run from raspberry_listener/ with `python -m benchmarks.blitting`. The figure is the size of a
+1200x600 window, with a date axis, grid and legend, and a line per sensor holding the point
+budget of LinePlot. Each poll appends a reading to every line and redraws the figure.
+"""
+# ui is imported before plotmanager and plotstrategies, as by main
+from ui.drawwidget import Blitter  # isort: skip
+
+import timeit
+
+import numpy as np
+import pandas as pd
+from datamodels import TemperatureModel
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from plotstrategies.line import POINTS_PER_PIXEL
+from plotstrategies.tick import concise_date_formatter
+
+WIDTH, HEIGHT, DPI = 1200, 600, 100
+SENSORS = ("DHT11", "DS18B20", "PI_CPU", "Yr")
+POLLS = 50
+POINTS = WIDTH * POINTS_PER_PIXEL
+
+
+def synthetic_figure(sensors: int) -> tuple[FigureCanvasAgg, list, list]:
+    rng = np.random.default_rng(0)
+    figure = Figure(figsize=(WIDTH / DPI, HEIGHT / DPI), dpi=DPI)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    concise_date_formatter(ax, TemperatureModel())
+    ax.grid(True)
+    time = pd.date_range("2023-01-01", periods=POINTS + POLLS, freq="s").to_numpy()
+    lines, series = [], []
+    for name in SENSORS[:sensors]:
+        value = 20 + np.cumsum(rng.normal(0, 0.05, POINTS + POLLS))
+        lines.extend(ax.plot(time[:POINTS], value[:POINTS], label=name))
+        series.append((time, value))
+    # Room for the readings appended while polling, so the limits stay as they are
+    ax.set_xlim(time[0], time[-1])
+    ax.set_ylim(15, 25)
+    figure.legend()
+    return canvas, lines, series
+
+
+def poll(lines: list, series: list, step: int):
+    for line, (time, value) in zip(lines, series):
+        line.set_data(time[step : step + POINTS], value[step : step + POINTS])
+
+
+def measure(sensors: int) -> tuple[float, float]:
+    """Milliseconds per poll, redrawing the figure in full and blitting"""
+    canvas, lines, series = synthetic_figure(sensors)
+    canvas.draw()
+    steps = iter(range(1, 10 * POLLS))
+
+    def full_draw():
+        poll(lines, series, next(steps) % POLLS)
+        canvas.draw()
+
+    full = min(timeit.repeat(full_draw, number=POLLS, repeat=3)) / POLLS
+
+    blitter = Blitter(canvas)
+    blitter.set_artists(lines)
+    canvas.draw()
+
+    def blit():
+        poll(lines, series, next(steps) % POLLS)
+        blitter.blit()
+
+    blitted = min(timeit.repeat(blit, number=POLLS, repeat=3)) / POLLS
+    return full * 1e3, blitted * 1e3
+
+
+def main():
+    print(f"{'sensors':>8} {'full ms':>9} {'blit ms':>9} {'speedup':>8}")
+    for sensors in range(1, len(SENSORS) + 1):
+        full, blitted = measure(sensors)
+        print(f"{sensors:>8} {full:>9.2f} {blitted:>9.2f} {full / blitted:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Compares drawing the time-of-day clock as stacked bars with the single PolyCollection of TimeOfDayPlot.
+
+Run from raspberry_listener/ with `python -m benchmarks.clockplot`. The clock of a year of readings
+in 64 bins is refreshed over and over on a polar Agg canvas, and the time of a refresh and draw is
+printed after several numbers of refreshes. The bars added 24 hour borders on every refresh.
+"""
+import time
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from datamodels import TimeOfDayHistogram
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from plotstrategies import TimeOfDayPlot
+
+BINCOUNT = 64
+REFRESHES = (1, 10, 50, 100)
+
+
+def synthetic_clock() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2023-01-01", periods=365 * 24 * 60, freq="min").to_numpy()
+    hour = times.astype("datetime64[h]").astype(np.int64) % 24
+    value = 15 + 5 * np.sin(hour / 24 * 2 * np.pi) + rng.normal(0, 2, len(times))
+    bins = np.linspace(value.min(), value.max(), BINCOUNT + 1)
+    histogram = TimeOfDayHistogram()
+    histogram.update(times, value, bins)
+    return histogram.fractions(), bins
+
+
+def legacy_plot_clock(ax, artists: list, counts: np.ndarray, bins: np.ndarray):
+    colormap = matplotlib.colormaps["turbo"]
+    [artist.remove() for artist in artists]
+    artists.clear()
+    normalizer = Normalize(bins[0], bins[-2])
+    bottom = np.zeros(24)
+    theta = np.linspace(0, 2 * np.pi, 24, endpoint=False)
+    width = theta[1] - theta[0]
+    for i in range(len(bins) - 1):
+        color = colormap(normalizer((bins[i] + bins[i + 1]) / 2))
+        height = counts.T[i]
+        artists.append(
+            ax.bar(
+                x=theta,
+                height=height,
+                width=width,
+                bottom=bottom,
+                align="edge",
+                label=f"{bins[i]:.2f}",
+                color=color,
+                edgecolor=color,
+            )
+        )
+        bottom += height
+    for border in theta:
+        ax.axvline(border, 0, 1, color="grey", linewidth=0.3)
+
+
+def polar_canvas():
+    figure = Figure(figsize=(6, 6))
+    canvas = FigureCanvasAgg(figure)
+    return canvas, figure.add_subplot(projection="polar")
+
+
+def measure(refresh) -> list[tuple[float, int]]:
+    """Milliseconds of a refresh and draw, and the lines on the axes, after each number of refreshes in REFRESHES"""
+    canvas, ax = polar_canvas()
+    timings = []
+    for count in range(1, REFRESHES[-1] + 1):
+        start = time.perf_counter()
+        refresh(ax)
+        canvas.draw()
+        if count in REFRESHES:
+            timings.append(((time.perf_counter() - start) * 1e3, len(ax.lines)))
+    return timings
+
+
+def main():
+    counts, bins = synthetic_clock()
+    artists = []
+    legacy = measure(lambda ax: legacy_plot_clock(ax, artists, counts, bins))
+    plot = TimeOfDayPlot(None, None)  # type: ignore
+    plot.set_colormap(matplotlib.colormaps["turbo"])
+    mesh = measure(lambda ax: plot.plot_clock(ax, counts, bins))
+    print(f"{'refreshes':>9} {'bars ms':>9} {'lines':>6} {'mesh ms':>9} {'lines':>6}")
+    for refreshes, (bars_ms, bars_lines), (mesh_ms, mesh_lines) in zip(
+        REFRESHES, legacy, mesh
+    ):
+        print(
+            f"{refreshes:>9} {bars_ms:>9.1f} {bars_lines:>6} {mesh_ms:>9.1f} {mesh_lines:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measures the decode cost and payload size of the Pi archive formats.
+
+Run from raspberry_listener/ with `python -m benchmarks.formats`. The fitted costs
+printed at the end are the ones kept in archiveformat.DEFAULT_COSTS.
+"""
+import json
+import timeit
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from sources.raspberrysensors.archiveformat import (
+    FormatCost,
+    decode_archive,
+    encode_archive,
+)
+from sources.raspberrysensors.datatypes import SensorData
+from sources.raspberrysensors.remotereader import Format
+
+ROWS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+SERIES = (
+    ("temperature", "DHT11", "C"),
+    ("temperature", "DS18B20", "C"),
+    ("temperature", "PI_CPU", "C"),
+    ("humidity", "DHT11", "%"),
+)
+
+
+def synthetic_sensor_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    series = [SERIES[i % len(SERIES)] for i in range(rows)]
+    df = pd.DataFrame(
+        {
+            "sensor_type": [s[0] for s in series],
+            "sensor": [s[1] for s in series],
+            "timestamp": pd.date_range("2023-05-09", periods=rows, freq="250ms"),
+            "reading": rng.normal(22, 2, rows).round(1),
+            "unit": [s[2] for s in series],
+        }
+    )
+    return SensorData.repair_dataframe(df).sort_index()
+
+
+def decode_payload(payload: bytes, format: Format):
+    """Mirrors what Transport.download_archive hands to the decoder"""
+    match format:
+        case Format.JSON:
+            return decode_archive(json.loads(payload), format)
+        case _:
+            return decode_archive(BytesIO(payload), format)
+
+
+def measure(format: Format, rows: int) -> tuple[float, int]:
+    payload = encode_archive(synthetic_sensor_frame(rows), format)
+    repeats = max(1, min(50, 200_000 // max(rows, 1)))
+    seconds = min(
+        timeit.repeat(lambda: decode_payload(payload, format), number=1, repeat=repeats)
+    )
+    return seconds, len(payload)
+
+
+def main():
+    print(f"{'format':>8} {'rows':>9} {'decode ms':>10} {'bytes':>11}")
+    for format in (Format.JSON, Format.Parquet, Format.Arrow):
+        results = []
+        for rows in ROWS:
+            if format == Format.JSON and rows > 100_000:
+                continue
+            seconds, size = measure(format, rows)
+            results.append((rows, seconds, size))
+            print(f"{format.name:>8} {rows:>9} {seconds * 1e3:>10.3f} {size:>11}")
+        rows, seconds, sizes = map(np.array, zip(*results))
+        # The slopes are fitted, the fixed costs are the one row payload. The intercept of a fit
+        # dominated by the largest payloads is mostly noise, and can come out negative.
+        seconds_per_row = np.polyfit(rows, seconds, 1)[0]
+        bytes_per_row = np.polyfit(rows, sizes, 1)[0]
+        cost = FormatCost(
+            float(seconds[0]),
+            float(seconds_per_row),
+            float(sizes[0]),
+            float(bytes_per_row),
+        )
+        print(f"{format} fitted {cost}")
+
+
+if __name__ == "__main__":
+    main()
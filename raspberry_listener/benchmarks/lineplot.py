@@ -0,0 +1,66 @@
+"""Compares refreshing a line by removing and plotting it again with set_data on the existing Line2D.
+
+Run from raspberry_listener/ with `python -m benchmarks.lineplot`. The time of the update
+alone and of the update followed by a draw of an Agg canvas is printed for each size,
+the draw being what the window does after every update.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+ROWS = (10_000, 100_000, 1_000_000, 4_000_000)
+
+
+def synthetic_series(rows: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    time = pd.date_range("2023-01-01", periods=rows, freq="s").to_numpy()
+    value = (20 + np.cumsum(rng.normal(0, 0.01, rows))).astype(np.float32)
+    return time, value
+
+
+def replot(ax, lines: list, time, value):
+    lines.pop().remove()
+    lines.extend(ax.plot(time, value, label="DHT11, Pi", color="C0"))
+
+
+def set_data(ax, lines: list, time, value):
+    lines[0].set_data(time, value)
+
+
+def measure(update, rows: int) -> tuple[float, float]:
+    """Best of three runs in milliseconds, of the update and of the update and a draw"""
+    time, value = synthetic_series(rows)
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    lines = ax.plot(time, value, label="DHT11, Pi", color="C0")
+    figure.canvas.draw()
+
+    def refresh():
+        update(ax, lines, time, value)
+
+    def refresh_and_draw():
+        refresh()
+        figure.canvas.draw()
+
+    update_seconds = min(timeit.repeat(refresh, number=1, repeat=3))
+    draw_seconds = min(timeit.repeat(refresh_and_draw, number=1, repeat=3))
+    return update_seconds * 1e3, draw_seconds * 1e3
+
+
+def main():
+    print(f"{'rows':>9} {'update':>9} {'ms':>10} {'with draw':>10}")
+    for rows in ROWS:
+        replot_ms, replot_draw_ms = measure(replot, rows)
+        set_data_ms, set_data_draw_ms = measure(set_data, rows)
+        print(f"{rows:>9} {'replot':>9} {replot_ms:>10.1f} {replot_draw_ms:>10.1f}")
+        print(
+            f"{rows:>9} {'set_data':>9} {set_data_ms:>10.1f} {set_data_draw_ms:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
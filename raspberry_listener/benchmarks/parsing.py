@@ -0,0 +1,152 @@
+"""Compares the columnar Yr/Frost parsers with the from_records/explode frames they replaced.
+
+Run from raspberry_listener/ with `python -m benchmarks.parsing [response.json[.gz] ...]`.
+Pass recorded Frost responses, for instance the window files in cache/frost/<station>/,
+to measure on real data. Without arguments a three year hourly response is generated
+with the same layout as Frost, and a nine day forecast as api.met.no returns it.
+"""
+import gzip
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import IO, Callable
+
+import numpy as np
+import pandas as pd
+from sources.yr.parsing import parse_forecast, parse_observations
+
+ELEMENTS = (("air_temperature", "degC"), ("relative_humidity", "percent"))
+
+
+def synthetic_frost_data(years: int = 3) -> list[dict]:
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2023-01-01", periods=years * 365 * 24, freq="h", tz="UTC")
+    return [
+        {
+            "sourceId": "SN18700:0",
+            "referenceTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "observations": [
+                {
+                    "elementId": element,
+                    "value": round(float(rng.normal(10, 5)), 1),
+                    "unit": unit,
+                    "level": {
+                        "levelType": "height_above_ground",
+                        "unit": "m",
+                        "value": 2,
+                    },
+                    "timeOffset": "PT0H",
+                    "timeResolution": "PT1H",
+                    "timeSeriesId": 0,
+                    "performanceCategory": "C",
+                    "exposureCategory": "2",
+                    "qualityCode": 0,
+                }
+                for element, unit in ELEMENTS
+            ],
+        }
+        for time in times
+    ]
+
+
+def synthetic_forecast(hours: int = 9 * 24) -> dict:
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2023-05-09", periods=hours, freq="h", tz="UTC")
+    details = (
+        "air_pressure_at_sea_level",
+        "air_temperature",
+        "cloud_area_fraction",
+        "relative_humidity",
+        "wind_from_direction",
+        "wind_speed",
+    )
+    return {
+        "properties": {
+            "timeseries": [
+                {
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "data": {
+                        "instant": {
+                            "details": {
+                                name: round(float(rng.normal(10, 5)), 1)
+                                for name in details
+                            }
+                        },
+                        "next_1_hours": {"summary": {"symbol_code": "cloudy"}},
+                    },
+                }
+                for time in times
+            ]
+        }
+    }
+
+
+def legacy_observations(data: list[dict]) -> pd.DataFrame:
+    full_frame = pd.DataFrame.from_records(data)
+    full_frame = full_frame.explode("observations").reset_index(drop=True)
+    observations_frame = pd.DataFrame.from_records(full_frame.observations.to_numpy())
+    return full_frame.join(observations_frame).drop("observations", axis=1)
+
+
+def legacy_forecast(result: dict) -> pd.DataFrame:
+    forecast = result["properties"]["timeseries"]
+    frame = pd.DataFrame.from_records(forecast)
+    observations_frame = pd.DataFrame.from_records(frame.data)
+    instant_data = [
+        item["details"] for item in observations_frame["instant"].to_numpy()
+    ]
+    instant_frame = pd.DataFrame.from_records(instant_data)
+    frame["time"] = pd.to_datetime(frame["time"])
+    return frame.join(instant_frame).drop("data", axis=1)
+
+
+def open_recorded(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "rt", encoding="utf-8")
+
+
+def load_recorded(paths: list[str]) -> list[dict]:
+    data = []
+    for path in map(Path, paths):
+        with open_recorded(path) as file:
+            content = json.load(file)
+        data.extend(content["data"] if isinstance(content, dict) else content)
+    return data
+
+
+def measure(parser: Callable, payload) -> tuple[float, float]:
+    """Best of three runs in seconds, and the peak traced memory of one run in MB"""
+    seconds = min(timeit.repeat(lambda: parser(payload), number=1, repeat=3))
+    tracemalloc.start()
+    parser(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1e6
+
+
+def compare(name: str, payload, legacy: Callable, columnar: Callable):
+    legacy_seconds, legacy_peak = measure(legacy, payload)
+    seconds, peak = measure(columnar, payload)
+    print(f"{name:>9} {'legacy':>9} {legacy_seconds * 1e3:>10.1f} {legacy_peak:>9.1f}")
+    print(f"{name:>9} {'columnar':>9} {seconds * 1e3:>10.1f} {peak:>9.1f}")
+    print(f"{name:>9} speedup {legacy_seconds / seconds:.1f}x")
+
+
+def main():
+    frost_data = (
+        load_recorded(sys.argv[1:]) if len(sys.argv) > 1 else synthetic_frost_data()
+    )
+    observations = sum(len(item["observations"]) for item in frost_data)
+    print(
+        f"Frost response with {len(frost_data)} times and {observations} observations"
+    )
+    print(f"{'response':>9} {'parser':>9} {'ms':>10} {'peak MB':>9}")
+    compare("frost", frost_data, legacy_observations, parse_observations)
+    compare("forecast", synthetic_forecast(), legacy_forecast, parse_forecast)
+
+
+if __name__ == "__main__":
+    main()
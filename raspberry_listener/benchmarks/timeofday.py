@@ -0,0 +1,68 @@
+"""Compares the per-hour groupby and np.histogram of the time-of-day plot with TimeOfDayHistogram.
+
+Run from raspberry_listener/ with `python -m benchmarks.timeofday`. Three years of hourly Frost
+observations and a week of readings every second from the Pi are binned in full, and refreshed
+after a poll appended a few readings, which the groupby did in full as well.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+from datamodels import TimeOfDayHistogram
+
+SERIES = (
+    ("frost 3y", "h", 3 * 365 * 24),
+    ("pi 1w", "s", 7 * 24 * 3600),
+)
+BINCOUNT = 64
+APPENDED = 10
+
+
+def synthetic_series(freq: str, rows: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    time = pd.date_range("2023-01-01", periods=rows, freq=freq).to_numpy()
+    value = np.round(20 + np.cumsum(rng.normal(0, 0.05, rows)), 1).astype(np.float32)
+    return time, value
+
+
+def legacy_histogram(time: np.ndarray, value: np.ndarray, bins: np.ndarray):
+    index = pd.DatetimeIndex(time)
+    frame = pd.DataFrame(value, index=index)
+    counts = []
+    for _, group in frame.groupby(index.hour):
+        count, _ = np.histogram(group, bins, density=True)
+        counts.append(count / np.sum(count))
+    return np.array(counts)
+
+
+def best_ms(fn) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=5)) * 1e3
+
+
+def append_ms(time: np.ndarray, value: np.ndarray, bins: np.ndarray) -> float:
+    """Counting the last APPENDED rows into a histogram of the rest"""
+    timings = []
+    for _ in range(5):
+        histogram = TimeOfDayHistogram()
+        histogram.update(time[:-APPENDED], value[:-APPENDED], bins)
+        timings.append(
+            timeit.timeit(lambda: histogram.update(time, value, bins), number=1)
+        )
+    return min(timings) * 1e3
+
+
+def main():
+    print(
+        f"{'series':>9} {'rows':>8} {'legacy ms':>10} {'full ms':>9} {'append ms':>10}"
+    )
+    for name, freq, rows in SERIES:
+        time, value = synthetic_series(freq, rows)
+        bins = np.linspace(value.min(), value.max(), BINCOUNT + 1, dtype=value.dtype)
+        legacy = best_ms(lambda: legacy_histogram(time, value, bins))
+        full = best_ms(lambda: TimeOfDayHistogram().update(time, value, bins))
+        appended = append_ms(time, value, bins)
+        print(f"{name:>9} {rows:>8} {legacy:>10.2f} {full:>9.2f} {appended:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
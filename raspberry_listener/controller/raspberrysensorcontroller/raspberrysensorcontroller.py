@@ -1,13 +1,18 @@
 from collections.abc import Sequence
 from functools import partial
 
+import numpy as np
 from datamodels import (
     DataIdentifier,
     DataTypeManager,
     DataTypeModel,
+    DerivedSeries,
+    DewPoint,
     HumidityModel,
+    ResampledMean,
     TemperatureModel,
 )
+from datamodels.derived import Derivation
 from sources import SensorDataFrameHandler
 from sources.raspberrysensors.datatypes import Sensor, SensorType
 
@@ -16,24 +21,62 @@ def register_raspberry_sensor_data(
     sensordata_handler: SensorDataFrameHandler,
     datatype_manager: DataTypeManager,
     source_name: str,
+    derived: bool = False,
 ) -> Sequence[DataTypeModel]:
     temperature_model = datatype_manager.get_model(TemperatureModel)
     humidity_model = datatype_manager.get_model(HumidityModel)
-    temperature_model.register_data(
-        DataIdentifier(source_name, Sensor.DHT11.value),
-        partial(sensordata_handler.get_data, (SensorType.Temperature, Sensor.DHT11)),
-    )
-    temperature_model.register_data(
-        DataIdentifier(source_name, Sensor.DS18B20.value),
-        partial(sensordata_handler.get_data, (SensorType.Temperature, Sensor.DS18B20)),
-    )
-    temperature_model.register_data(
-        DataIdentifier(source_name, Sensor.PITEMP.value),
-        partial(sensordata_handler.get_data, (SensorType.Temperature, Sensor.PITEMP)),
-    )
-    humidity_model.register_data(
-        DataIdentifier(source_name, Sensor.DHT11.value),
-        partial(sensordata_handler.get_data, (SensorType.Humidity, Sensor.DHT11)),
-    )
+
+    def register(model: DataTypeModel, sensor_type: SensorType, sensor: Sensor):
+        model.register_data(
+            DataIdentifier(source_name, sensor.value),
+            partial(sensordata_handler.get_data, (sensor_type, sensor)),
+            supports_range=True,
+            generation_fn=partial(
+                sensordata_handler.data_generation, (sensor_type, sensor)
+            ),
+        )
+
+    register(temperature_model, SensorType.Temperature, Sensor.DHT11)
+    register(temperature_model, SensorType.Temperature, Sensor.DS18B20)
+    register(temperature_model, SensorType.Temperature, Sensor.PITEMP)
+    register(humidity_model, SensorType.Humidity, Sensor.DHT11)
+    if derived:
+        register_derived_data(sensordata_handler, temperature_model, source_name)
 
     return temperature_model, humidity_model
+
+
+def register_derived_data(
+    sensordata_handler: SensorDataFrameHandler,
+    temperature_model: TemperatureModel,
+    source_name: str,
+):
+    """Registers the series derived from the sensors that are in °C on the temperature model"""
+
+    def register(
+        data_name: str,
+        keys: Sequence[tuple[SensorType, Sensor]],
+        derivation: Derivation,
+    ):
+        derived = DerivedSeries(
+            [partial(sensordata_handler.get_data, key) for key in keys],
+            derivation,
+            [partial(sensordata_handler.data_generation, key) for key in keys],
+        )
+        temperature_model.register_data(
+            DataIdentifier(source_name, data_name),
+            derived,
+            generation_fn=derived.generation,
+        )
+
+    dht11_temperature = (SensorType.Temperature, Sensor.DHT11)
+    register(
+        f"{Sensor.DHT11.value} dew point",
+        [dht11_temperature, (SensorType.Humidity, Sensor.DHT11)],
+        DewPoint(),
+    )
+    register(
+        f"{Sensor.DHT11.value} hourly mean",
+        [dht11_temperature],
+        ResampledMean(np.timedelta64(1, "h")),
+    )
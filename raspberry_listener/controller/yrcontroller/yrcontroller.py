@@ -1,12 +1,13 @@
 from collections.abc import Callable, Sequence
 from functools import partial
 
-import numpy as np
 from datamodels import (
     DataIdentifier,
     DataTypeManager,
     DataTypeModel,
+    DerivedSeries,
     HumidityModel,
+    RollingMedian,
     TemperatureModel,
 )
 from pandas import Series, Timedelta
@@ -41,8 +42,9 @@ def register_yr_forecast_data(
         def extract_data(variable: str, indexer_fn: Callable[[Series], Series]):
             indexer = indexer_fn(data["time"])
             reduced_frame = data[["time", variable]].dropna()[indexer]
+            # Typed UTC times rather than an object array of Timestamps, so ranges can be binary searched
             return (
-                reduced_frame["time"].to_numpy(),
+                reduced_frame["time"].to_numpy(dtype="datetime64[ns]"),
                 reduced_frame[variable].to_numpy(),
             )
 
@@ -68,10 +70,12 @@ def register_yr_forecast_data(
         temperature_model.register_data(
             DataIdentifier(name, location),
             partial(get_data, location, "temperature"),
+            generation_fn=partial(yr_forecast.generation, location),
         )
         humidity_model.register_data(
             DataIdentifier(name, location),
             partial(get_data, location, "humidity"),
+            generation_fn=partial(yr_forecast.generation, location),
         )
 
     return temperature_model, humidity_model
@@ -83,40 +87,36 @@ def register_yr_historic_data(
     source_name: str,
 ) -> Sequence[DataTypeModel]:
     def get_data(location: str, variable: str):
-        data = yr_historic.data_for_location(location)
-
-        def med_filter(series: Series, window: int) -> Series:
-            return series.rolling(window, min_periods=1).median()
-
-        def extract_data(element_id: str, filter: Callable[[Series], Series]):
-            frame = data[data["elementId"] == element_id]
-            value_series = filter(frame["value"])
-            time = frame["referenceTime"].to_numpy(dtype="datetime64[s]")
-            value = value_series.to_numpy(dtype=np.float32)
-            return time, value
-
         match variable:
             case "temperature":
-                return extract_data("air_temperature", partial(med_filter, window=3))
+                element_id = "air_temperature"
             case "humidity":
-                return extract_data("relative_humidity", partial(med_filter, window=3))
+                element_id = "relative_humidity"
             case _:
                 raise KeyError("Unsupported variable type")
+        return yr_historic.series_for_location(location, element_id).arrays()
 
     settings = get_settings()
 
     temperature_model = datatype_manager.get_model(TemperatureModel)
     humidity_model = datatype_manager.get_model(HumidityModel)
 
-    locations: dict[str, str] = settings["frost"]["stations"]
-    for location in locations.keys():
-        temperature_model.register_data(
-            DataIdentifier(source_name, location),
-            partial(get_data, location, "temperature"),
+    def register(model: DataTypeModel, location: str, variable: str):
+        derived = DerivedSeries(
+            [partial(get_data, location, variable)],
+            RollingMedian(3),
+            [partial(yr_historic.generation, location)],
         )
-        humidity_model.register_data(
+        model.register_data(
             DataIdentifier(source_name, location),
-            partial(get_data, location, "humidity"),
+            derived,
+            generation_fn=derived.generation,
         )
 
+    # The observations are median filtered, the filter only runs on readings added since the last call
+    locations: dict[str, str] = settings["frost"]["stations"]
+    for location in locations.keys():
+        register(temperature_model, location, "temperature")
+        register(humidity_model, location, "humidity")
+
     return temperature_model, humidity_model
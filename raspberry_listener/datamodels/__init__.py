@@ -1,2 +1,25 @@
 from .basemodels import HumidityModel, OneDimensionalTimeSeriesModel, TemperatureModel
-from .datatypes import DataIdentifier, DataSet_Fn, DataTypeManager, DataTypeModel, Unit
+from .datatypes import (
+    DataIdentifier,
+    DataSet_Fn,
+    DataTypeManager,
+    DataTypeModel,
+    DataUpdate,
+    Generation_Fn,
+    SeriesChange,
+    Unit,
+)
+from .decimation import Decimation
+from .derived import (
+    CenteredMedian,
+    DerivedSeries,
+    DewPoint,
+    Difference,
+    ResampledMean,
+    RollingMedian,
+    SeriesVersion,
+    version_of,
+)
+from .pyramid import Aggregates
+from .statistics import StreamingStatistics
+from .timeofday import TimeOfDayHistogram
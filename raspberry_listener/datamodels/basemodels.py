@@ -3,8 +3,23 @@ from typing import Self
 
 from numpy import datetime64, floating
 from numpy.typing import NDArray
-
-from .datatypes import DataIdentifier, DataSet_Fn, DataTypeModel, Unit
+from sources import DataNotReadyException
+
+from .datatypes import (
+    DataIdentifier,
+    DataSet_Fn,
+    DataTypeModel,
+    DataUpdate,
+    Generation_Fn,
+    SeriesChange,
+    Unit,
+)
+from .decimation import Decimation, TimeBound, decimate, time_range
+from .derived import DerivedSeries, SeriesVersion, first_changed_row, version_of
+from .pyramid import Aggregates, TimeSeriesPyramid
+from .statistics import StreamingStatistics
+from .storage import MemoryUsage
+from .timeofday import TimeOfDayHistogram
 
 OneDimensionalTimeSeries = tuple[NDArray[datetime64], NDArray[floating]]
 
@@ -13,24 +28,159 @@ class OneDimensionalTimeSeriesModel(DataTypeModel):
     def __init__(self: Self):
         super().__init__()
         self._datalines: dict[DataIdentifier, DataSet_Fn] = dict()
+        self._ranged_datalines: set[DataIdentifier] = set()
+        self._generation_fns: dict[DataIdentifier, Generation_Fn] = dict()
+        self._pyramids: dict[DataIdentifier, TimeSeriesPyramid] = dict()
+        self._statistics: dict[DataIdentifier, StreamingStatistics] = dict()
+        self._time_of_day: dict[DataIdentifier, TimeOfDayHistogram] = dict()
+        # The version of each data line when changes were last collected
+        self._seen: dict[DataIdentifier, SeriesVersion] = dict()
         self._source_name_to_data_name: dict[str, list[str]] = defaultdict(list)
 
-    def register_data(self, dataset: DataIdentifier, dataset_fn: DataSet_Fn):
+    def register_data(
+        self,
+        dataset: DataIdentifier,
+        dataset_fn: DataSet_Fn,
+        supports_range: bool = False,
+        generation_fn: Generation_Fn | None = None,
+    ):
+        """With supports_range, dataset_fn takes start and end keyword arguments and returns only that range.
+        Otherwise the range is cut from the full series. generation_fn tells when rows other than
+        appended ones changed, without it the data line is taken to only grow at the end.
+        """
         if dataset in self._datalines:
             raise KeyError(f"{dataset.data} from {dataset.source} already registered")
         self._datalines[dataset] = dataset_fn
+        if supports_range:
+            self._ranged_datalines.add(dataset)
+        if generation_fn is not None:
+            self._generation_fns[dataset] = generation_fn
         self._source_name_to_data_name[dataset.source].append(dataset.data)
         self.dataline_registered.emit(dataset)
 
     def get_data_name_from_source(self, source_name: str) -> list[str]:
         return self._source_name_to_data_name[source_name]
 
-    def get_data(self, dataset: DataIdentifier) -> OneDimensionalTimeSeries:
-        return self._datalines[dataset]()
+    def get_data(
+        self,
+        dataset: DataIdentifier,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        max_points: int | None = None,
+        method: Decimation = Decimation.MinMax,
+    ) -> OneDimensionalTimeSeries:
+        """The series between start and end. Without max_points these are views of the series,
+        with it the series is decimated to at most max_points by method."""
+        dataset_fn = self._datalines[dataset]
+        if start is None and end is None:
+            time, value = dataset_fn()
+        elif dataset in self._ranged_datalines:
+            time, value = dataset_fn(start=start, end=end)
+        else:
+            time, value = dataset_fn()
+            selection = time_range(time, start, end)
+            time, value = time[selection], value[selection]
+        if max_points is not None:
+            time, value = decimate(time, value, max_points, method)
+        return time, value
+
+    def get_aggregates(
+        self,
+        dataset: DataIdentifier,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        buckets: int = 1000,
+    ) -> Aggregates:
+        """Min/max/mean/count of the series between start and end, in about buckets buckets.
+        The pyramid behind it takes in the rows appended since the last call."""
+        pyramid = self._pyramids.setdefault(dataset, TimeSeriesPyramid())
+        generation, (time, value) = self._versioned_data(dataset)
+        pyramid.update(time, value, generation)
+        return pyramid.query(start, end, buckets)
+
+    def get_statistics(self, dataset: DataIdentifier) -> StreamingStatistics:
+        """Statistics of the whole series, updated with the rows appended since the last call"""
+        statistics = self._statistics.setdefault(dataset, StreamingStatistics())
+        generation, (time, value) = self._versioned_data(dataset)
+        statistics.update(time, value, generation)
+        return statistics
+
+    def get_time_of_day_histogram(
+        self, dataset: DataIdentifier, bins: NDArray[floating]
+    ) -> TimeOfDayHistogram:
+        """Counts of the whole series per hour of day and bin, updated with the rows appended since the last call"""
+        histogram = self._time_of_day.setdefault(dataset, TimeOfDayHistogram())
+        generation, (time, value) = self._versioned_data(dataset)
+        histogram.update(time, value, bins, generation)
+        return histogram
+
+    def generation(self, dataset: DataIdentifier) -> int:
+        generation_fn = self._generation_fns.get(dataset)
+        return 0 if generation_fn is None else generation_fn()
+
+    def data_version(self, dataset: DataIdentifier) -> SeriesVersion:
+        """Changes whenever the content of the data line changes, see SeriesVersion"""
+        generation, (time, _) = self._versioned_data(dataset)
+        return version_of(time, generation)
+
+    def _versioned_data(
+        self, dataset: DataIdentifier
+    ) -> tuple[int, OneDimensionalTimeSeries]:
+        # The generation is read first, a change while the data is read then shows up next time
+        generation = self.generation(dataset)
+        return generation, self._datalines[dataset]()
+
+    def collect_changes(self, source_name: str) -> DataUpdate:
+        changes = {}
+        for data_name in self.get_data_name_from_source(source_name):
+            dataset = DataIdentifier(source_name, data_name)
+            try:
+                generation, (time, _) = self._versioned_data(dataset)
+            except DataNotReadyException:
+                continue
+            change = self.change_since_seen(dataset, time, generation)
+            if change is not None:
+                changes[dataset] = change
+        return DataUpdate(source_name, changes)
+
+    def change_since_seen(
+        self, dataset: DataIdentifier, time: NDArray[datetime64], generation: int = 0
+    ) -> SeriesChange | None:
+        if len(time) == 0:
+            return None
+        start = first_changed_row(self._seen.get(dataset), time, generation)
+        self._seen[dataset] = version_of(time, generation)
+        if start is None:
+            return None
+        return SeriesChange(
+            start, len(time), time[start], time[-1], replaced=start == 0
+        )
 
     def get_data_identifiers(self) -> set[DataIdentifier]:
         return set(self._datalines.keys())
 
+    def memory_usage(self) -> dict[str, MemoryUsage]:
+        """What the model holds on top of the series of the sources, per data line: the results
+        of derived series, and the pyramids, statistics and time of day histograms"""
+        derived = {
+            f"{dataset} derived": dataset_fn.memory()
+            for dataset, dataset_fn in self._datalines.items()
+            if isinstance(dataset_fn, DerivedSeries)
+        }
+        pyramids = {
+            f"{dataset} pyramid": pyramid.memory()
+            for dataset, pyramid in self._pyramids.items()
+        }
+        statistics = {
+            f"{dataset} statistics": statistics.memory()
+            for dataset, statistics in self._statistics.items()
+        }
+        time_of_day = {
+            f"{dataset} time of day": histogram.memory()
+            for dataset, histogram in self._time_of_day.items()
+        }
+        return derived | pyramids | statistics | time_of_day
+
     def get_source_names(self) -> set[str]:
         return set(self._source_name_to_data_name.keys())
 
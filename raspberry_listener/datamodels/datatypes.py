@@ -3,6 +3,9 @@ from typing import Any, Protocol, Self, TypeVar
 
 from PySide6 import QtCore
 
+from .decimation import Decimation, TimeBound
+from .storage import MemoryUsage
+
 
 @dataclass(frozen=True)
 class DataIdentifier:
@@ -16,8 +19,45 @@ class DataIdentifier:
         return f"{self.data}, {self.source}"
 
 
+@dataclass(frozen=True)
+class SeriesChange:
+    """Rows start to end of the series are new. With replaced, the earlier rows changed as well."""
+
+    start: int
+    end: int
+    start_time: Any = None
+    end_time: Any = None
+    replaced: bool = False
+
+    def then(self, later: "SeriesChange") -> "SeriesChange":
+        """This change followed by later, as a single change"""
+        first = self if self.start <= later.start else later
+        return SeriesChange(
+            first.start,
+            later.end,
+            first.start_time,
+            later.end_time,
+            self.replaced or later.replaced,
+        )
+
+
+@dataclass(frozen=True)
+class DataUpdate:
+    source: str
+    changes: dict[DataIdentifier, SeriesChange]
+
+
 class DataSet_Fn(Protocol):
-    def __call__(self) -> Any:
+    """Returns the series. Registered with supports_range it also takes start and end keyword arguments."""
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        ...
+
+
+class Generation_Fn(Protocol):
+    """The generation of a data line, bumped whenever rows other than appended ones change"""
+
+    def __call__(self) -> int:
         ...
 
 
@@ -30,7 +70,9 @@ class Unit:
 
 class DataTypeModel(QtCore.QObject):
     source_updated = QtCore.Signal(str)
+    data_updated = QtCore.Signal(DataUpdate)
     dataline_registered = QtCore.Signal(DataIdentifier)
+    range_loaded = QtCore.Signal(str)
     _unit: Unit
 
     def __init__(self: Self):
@@ -42,20 +84,69 @@ class DataTypeModel(QtCore.QObject):
     @QtCore.Slot(str)
     def forward_source_updated(self, source_name: str):
         self.source_updated.emit(source_name)
+        update = self.collect_changes(source_name)
+        if update.changes:
+            self.data_updated.emit(update)
 
-    def register_data(self, dataset: DataIdentifier, dataset_fn: DataSet_Fn):
+    @QtCore.Slot(str)
+    def forward_range_loaded(self, source_name: str):
+        """Readings of the source that get_data didn't hold yet for a range were loaded"""
+        self.range_loaded.emit(source_name)
+
+    def collect_changes(self, source_name: str) -> DataUpdate:
+        """The data lines of the source that changed since the last update, and what changed in them"""
+        raise NotImplementedError
+
+    def register_data(
+        self,
+        dataset: DataIdentifier,
+        dataset_fn: DataSet_Fn,
+        supports_range: bool = False,
+        generation_fn: Generation_Fn | None = None,
+    ):
         raise NotImplementedError
         ...
 
     def get_data_name_from_source(self, source_name: str) -> list[str]:
         raise NotImplementedError
 
-    def get_data(self, data_identifier: DataIdentifier) -> Any:
+    def get_data(
+        self,
+        dataset: DataIdentifier,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        max_points: int | None = None,
+        method: Decimation = Decimation.MinMax,
+    ) -> Any:
+        raise NotImplementedError
+
+    def get_aggregates(
+        self,
+        dataset: DataIdentifier,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        buckets: int = 1000,
+    ) -> Any:
+        raise NotImplementedError
+
+    def get_statistics(self, data_identifier: DataIdentifier) -> Any:
+        raise NotImplementedError
+
+    def data_version(self, data_identifier: DataIdentifier) -> Any:
+        """Changes whenever the content of the data line changes"""
+        raise NotImplementedError
+
+    def get_time_of_day_histogram(
+        self, data_identifier: DataIdentifier, bins: Any
+    ) -> Any:
         raise NotImplementedError
 
     def get_data_identifiers(self) -> set[DataIdentifier]:
         raise NotImplementedError
 
+    def memory_usage(self) -> dict[str, MemoryUsage]:
+        raise NotImplementedError
+
     def get_source_names(self) -> set[str]:
         raise NotImplementedError
 
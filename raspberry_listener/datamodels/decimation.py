@@ -0,0 +1,103 @@
+from datetime import datetime
+from enum import Enum, auto
+
+import numpy as np
+import pandas as pd
+from numpy import datetime64, floating
+from numpy.typing import NDArray
+
+TimeBound = datetime | datetime64 | pd.Timestamp | None
+
+
+class Decimation(Enum):
+    # The extremes of equal-count buckets, exact for line plots at one bucket per pixel
+    MinMax = auto()
+    # Largest-Triangle-Three-Buckets, keeps the visual shape with fewer points
+    LTTB = auto()
+
+
+def to_datetime64(time: datetime | datetime64 | pd.Timestamp) -> datetime64:
+    """Timezone aware times are compared in naive UTC, like matplotlib plots them"""
+    timestamp = pd.Timestamp(time)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.to_datetime64()
+
+
+def time_range(time: NDArray[datetime64], start: TimeBound, end: TimeBound) -> slice:
+    """The slice of the sorted time array within [start, end], found by binary search"""
+    first, last = 0, len(time)
+    if start is not None:
+        first = int(np.searchsorted(time, to_datetime64(start), "left"))
+    if end is not None:
+        last = int(np.searchsorted(time, to_datetime64(end), "right"))
+    return slice(first, last)
+
+
+def decimate(
+    time: NDArray[datetime64],
+    value: NDArray[floating],
+    max_points: int,
+    method: Decimation = Decimation.MinMax,
+) -> tuple[NDArray[datetime64], NDArray[floating]]:
+    # The first and last point and a bucket's minimum and maximum take at least 4
+    if len(time) <= max_points or max_points < 4:
+        return time, value
+    match method:
+        case Decimation.MinMax:
+            indices = minmax_indices(value, max_points)
+        case Decimation.LTTB:
+            indices = lttb_indices(time, value, max_points)
+    return time[indices], value[indices]
+
+
+def minmax_indices(value: NDArray[floating], max_points: int) -> NDArray[np.intp]:
+    """Indices of the first and last point, and the minimum and maximum of each bucket in time order"""
+    length = len(value)
+    buckets = (max_points - 2) // 2
+    size = int(np.ceil(length / buckets))
+    full = length // size
+    blocks = value[: full * size].reshape(full, size)
+    offsets = np.arange(full) * size
+    minimum = offsets + np.argmin(blocks, axis=1)
+    maximum = offsets + np.argmax(blocks, axis=1)
+    pairs = [np.minimum(minimum, maximum), np.maximum(minimum, maximum)]
+    if full * size < length:
+        rest = value[full * size :]
+        low, high = sorted((np.argmin(rest), np.argmax(rest)))
+        pairs = [
+            np.append(pairs[0], full * size + low),
+            np.append(pairs[1], full * size + high),
+        ]
+    inner = np.column_stack(pairs).ravel()
+    # Already in order, unique drops the points picked twice
+    return np.unique(np.r_[0, inner, length - 1])
+
+
+def lttb_indices(
+    time: NDArray[datetime64], value: NDArray[floating], max_points: int
+) -> NDArray[np.intp]:
+    x = time.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    x -= x[0]
+    y = value.astype(np.float64)
+    length = len(value)
+    edges = np.linspace(1, length - 1, max_points - 1).astype(np.intp)
+    indices = np.empty(max_points, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = length - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x = x[end : edges[bucket + 2]].mean()
+            next_y = y[end : edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the area of the triangle from the previous point, through each candidate, to the next bucket's mean
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        indices[bucket + 1] = previous
+    return indices
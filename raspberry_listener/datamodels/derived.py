@@ -0,0 +1,253 @@
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+from numpy import datetime64, floating
+from numpy.typing import NDArray
+from scipy.signal import medfilt
+
+from .datatypes import DataSet_Fn, Generation_Fn
+from .storage import MemoryUsage
+
+TimeSeries = tuple[NDArray[datetime64], NDArray[floating]]
+# Generation, length, first and last time. The generation is bumped by the source whenever rows
+# other than appended ones change, so the rest tells whether rows were appended
+SeriesVersion = tuple[int, int, datetime64 | None, datetime64 | None]
+
+
+def version_of(time: NDArray[datetime64], generation: int = 0) -> SeriesVersion:
+    if len(time) == 0:
+        return generation, 0, None, None
+    return generation, len(time), time[0], time[-1]
+
+
+def first_changed_row(
+    previous: SeriesVersion | None, time: NDArray[datetime64], generation: int = 0
+) -> int | None:
+    """The first row that isn't in the series of version previous. None when nothing changed,
+    0 when the series is new or its earlier rows changed as well."""
+    if previous is None:
+        return 0
+    previous_generation, length, first, last = previous
+    if previous_generation != generation:
+        return 0
+    if length == 0:
+        return 0 if len(time) else None
+    if len(time) < length or time[0] != first or time[length - 1] != last:
+        return 0
+    return length if len(time) > length else None
+
+
+class Derivation(ABC):
+    """How a derived series is computed from its inputs. The output takes its time axis from the first input."""
+
+    def cutoff(self, time: NDArray[datetime64], changed: int) -> datetime64:
+        """The earliest output time affected when the first input changed from row changed on"""
+        return time[changed]
+
+    @abstractmethod
+    def compute(self, inputs: Sequence[TimeSeries], start: int) -> TimeSeries:
+        """The output for the rows of the first input from start on. Earlier rows can be read for context."""
+        ...
+
+
+class RollingMedian(Derivation):
+    """The median of each reading and the window - 1 before it"""
+
+    def __init__(self, window: int):
+        self.window = window
+
+    def compute(self, inputs: Sequence[TimeSeries], start: int) -> TimeSeries:
+        time, value = inputs[0]
+        context = max(start - self.window + 1, 0)
+        median = (
+            pd.Series(value[context:])
+            .rolling(self.window, min_periods=1)
+            .median()
+            .to_numpy(dtype=value.dtype)
+        )
+        return time[start:], median[start - context :]
+
+
+class CenteredMedian(Derivation):
+    """scipy.signal.medfilt, the readings near the end change as more arrive"""
+
+    def __init__(self, kernel_size: int):
+        self.kernel_size = kernel_size
+
+    def cutoff(self, time: NDArray[datetime64], changed: int) -> datetime64:
+        return time[max(changed - self.kernel_size // 2, 0)]
+
+    def compute(self, inputs: Sequence[TimeSeries], start: int) -> TimeSeries:
+        time, value = inputs[0]
+        context = max(start - self.kernel_size // 2, 0)
+        filtered = medfilt(value[context:], self.kernel_size)
+        return time[start:], filtered[start - context :]
+
+
+class ResampledMean(Derivation):
+    """The mean of the readings in each period, at the start of the period. Empty periods are left out."""
+
+    def __init__(self, period: np.timedelta64):
+        self.seconds = int(period / np.timedelta64(1, "s"))
+
+    def cutoff(self, time: NDArray[datetime64], changed: int) -> datetime64:
+        seconds = time[changed].astype("datetime64[s]").astype(np.int64)
+        return np.datetime64(int(seconds // self.seconds * self.seconds), "s")
+
+    def compute(self, inputs: Sequence[TimeSeries], start: int) -> TimeSeries:
+        time, value = inputs[0]
+        period = time[start:].astype("datetime64[s]").astype(np.int64) // self.seconds
+        value = np.asarray(value[start:], dtype=np.float64)
+        if len(period) == 0:
+            return time[:0], value
+        starts = np.flatnonzero(np.r_[True, period[1:] != period[:-1]])
+        mean = np.add.reduceat(value, starts) / np.diff(np.r_[starts, len(value)])
+        return (period[starts] * self.seconds).astype("datetime64[s]"), mean
+
+
+class Aligned(Derivation):
+    """Combines the first input with the latest reading of the others at most tolerance before it"""
+
+    def __init__(self, tolerance: np.timedelta64 = np.timedelta64(5, "m")):
+        self.tolerance = tolerance
+
+    @abstractmethod
+    def combine(self, value: NDArray[floating], *others: NDArray[floating]):
+        """Subclasses name the inputs they take"""
+        ...
+
+    def compute(self, inputs: Sequence[TimeSeries], start: int) -> TimeSeries:
+        time, value = inputs[0]
+        time = time[start:]
+        others = [as_of(time, *other, self.tolerance) for other in inputs[1:]]
+        return time, self.combine(np.asarray(value[start:], dtype=np.float64), *others)
+
+
+class Difference(Aligned):
+    def combine(  # type: ignore[override]
+        self, value: NDArray[floating], other: NDArray[floating]
+    ):
+        return value - other
+
+
+class DewPoint(Aligned):
+    """From temperature in Celsius and relative humidity in percent, by the Magnus formula"""
+
+    B = 17.62
+    C = 243.12
+
+    def combine(  # type: ignore[override]
+        self, temperature: NDArray[floating], humidity: NDArray[floating]
+    ):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gamma = np.log(humidity / 100) + self.B * temperature / (
+                self.C + temperature
+            )
+            return np.where(humidity > 0, self.C * gamma / (self.B - gamma), np.nan)
+
+
+def as_of(
+    time: NDArray[datetime64],
+    other_time: NDArray[datetime64],
+    other_value: NDArray[floating],
+    tolerance: np.timedelta64,
+) -> NDArray[floating]:
+    """The latest value of other at or before each time, NaN where there is none within tolerance"""
+    index = np.searchsorted(other_time, time, side="right") - 1
+    found = index >= 0
+    index = np.maximum(index, 0)
+    value = np.full(len(time), np.nan)
+    if len(other_time):
+        found &= time - other_time[index] <= tolerance
+        value[found] = other_value[index[found]]
+    return value
+
+
+class DerivedSeries:
+    """A data line computed from other data lines, registered with a model like any other DataSet_Fn.
+
+    The result is cached with the versions of the inputs, their generations included. When inputs
+    only grew, the rows from the derivation's cutoff on are computed again and the earlier rows are
+    kept. Inputs without a generation are taken to only grow at the end. Inputs can be derived
+    series themselves, so series form a dependency graph that is evaluated lazily.
+    """
+
+    def __init__(
+        self,
+        inputs: Sequence[DataSet_Fn],
+        derivation: Derivation,
+        generations: Sequence[Generation_Fn | None] | None = None,
+    ):
+        self.inputs = list(inputs)
+        self.derivation = derivation
+        self.generations = (
+            list(generations) if generations is not None else [None] * len(inputs)
+        )
+        self._versions: list[SeriesVersion] | None = None
+        self._result: TimeSeries = (np.array([], dtype="datetime64[ns]"), np.array([]))
+        self._generation = 0
+
+    def __call__(self) -> TimeSeries:
+        # Generations are read before the data, a change in between is then caught by the next call
+        generations = [
+            0 if generation_fn is None else generation_fn()
+            for generation_fn in self.generations
+        ]
+        inputs = [dataset_fn() for dataset_fn in self.inputs]
+        versions = [
+            version_of(time, generation)
+            for (time, _), generation in zip(inputs, generations)
+        ]
+        if versions == self._versions:
+            return self._result
+        start = self._first_changed_row(inputs, generations)
+        if start == 0:
+            result = self.derivation.compute(inputs, 0)
+            self._generation += 1
+        elif start == len(inputs[0][0]):
+            # Only the other inputs grew, past the end of the first
+            result = self._result
+        else:
+            cutoff = self.derivation.cutoff(inputs[0][0], start)
+            time, value = self._result
+            keep = int(np.searchsorted(time, cutoff))
+            if keep < len(time):
+                self._generation += 1
+            start = int(np.searchsorted(inputs[0][0], cutoff))
+            new_time, new_value = self.derivation.compute(inputs, start)
+            result = (
+                np.concatenate((time[:keep], new_time.astype(time.dtype))),
+                np.concatenate((value[:keep], new_value)),
+            )
+        self._versions = versions
+        self._result = result
+        return result
+
+    def memory(self) -> MemoryUsage:
+        """The cached result"""
+        time, value = self._result
+        size = time.nbytes + value.nbytes
+        return MemoryUsage(len(time), size, size)
+
+    def generation(self) -> int:
+        """Bumped whenever rows of the result other than appended ones changed, the Generation_Fn of the series"""
+        self()
+        return self._generation
+
+    def _first_changed_row(
+        self, inputs: Sequence[TimeSeries], generations: Sequence[int]
+    ) -> int:
+        """The first row of the first input at or after the earliest change in any input"""
+        if self._versions is None:
+            return 0
+        first_time = inputs[0][0]
+        start = len(first_time)
+        for (time, _), version, generation in zip(inputs, self._versions, generations):
+            changed = first_changed_row(version, time, generation)
+            if changed == 0:
+                return 0
+            if changed is not None:
+                start = min(start, int(np.searchsorted(first_time, time[changed])))
+        return start
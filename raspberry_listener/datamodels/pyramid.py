@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from numpy import datetime64, floating
+from numpy.typing import NDArray
+
+from .decimation import TimeBound, to_datetime64
+from .derived import SeriesVersion, first_changed_row, version_of
+from .storage import MemoryUsage
+
+# Level k holds buckets of 2**k seconds, level 25 buckets are a little over a year
+MAX_LEVEL = 25
+
+
+@dataclass(frozen=True)
+class Aggregates:
+    """Buckets of a series at one resolution. time is the start of each bucket."""
+
+    time: NDArray[datetime64]
+    minimum: NDArray[floating]
+    maximum: NDArray[floating]
+    mean: NDArray[floating]
+    count: NDArray[np.int32]
+    resolution: np.timedelta64
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def envelope(self) -> tuple[NDArray[datetime64], NDArray[floating]]:
+        """A line through the minimum and maximum of every bucket, at the bucket centres.
+        With a bucket per pixel column it draws like the full series."""
+        centre = self.time + self.resolution // 2
+        return (
+            np.repeat(centre, 2),
+            np.column_stack((self.minimum, self.maximum)).ravel(),
+        )
+
+
+class _Level:
+    """Growable bucket arrays, sorted by bucket id. The minimum and maximum are held in the precision
+    of the readings, the total in double precision so the mean of large buckets stays exact.
+    """
+
+    _INITIAL_CAPACITY = 256
+
+    def __init__(self, value_dtype: np.dtype = np.dtype(np.float64)):
+        self.length = 0
+        self.id = np.empty(self._INITIAL_CAPACITY, dtype=np.int64)
+        self.minimum = np.empty(self._INITIAL_CAPACITY, dtype=value_dtype)
+        self.maximum = np.empty(self._INITIAL_CAPACITY, dtype=value_dtype)
+        self.total = np.empty(self._INITIAL_CAPACITY, dtype=np.float64)
+        self.count = np.empty(self._INITIAL_CAPACITY, dtype=np.int32)
+
+    def columns(self, start: int = 0):
+        end = self.length
+        return (
+            self.id[start:end],
+            self.minimum[start:end],
+            self.maximum[start:end],
+            self.total[start:end],
+            self.count[start:end],
+        )
+
+    def replace_from(self, bucket_id: int, columns):
+        """Drops the buckets from bucket_id on and appends columns in their place"""
+        keep = int(np.searchsorted(self.id[: self.length], bucket_id))
+        size = keep + len(columns[0])
+        if size > len(self.id):
+            capacity = max(size, 2 * len(self.id))
+            for name in ("id", "minimum", "maximum", "total", "count"):
+                array = getattr(self, name)
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:keep] = array[:keep]
+                setattr(self, name, grown)
+        for array, column in zip(
+            (self.id, self.minimum, self.maximum, self.total, self.count), columns
+        ):
+            array[keep:size] = column
+        self.length = size
+
+    def memory(self) -> MemoryUsage:
+        arrays = (self.id, self.minimum, self.maximum, self.total, self.count)
+        row_size = sum(array.itemsize for array in arrays)
+        return MemoryUsage(self.length, self.length * row_size, len(self.id) * row_size)
+
+
+def group(bucket_id, minimum, maximum, total, count):
+    """Merges runs of equal, sorted bucket ids"""
+    if len(bucket_id) == 0:
+        return bucket_id, minimum, maximum, total, count
+    starts = np.flatnonzero(np.r_[True, bucket_id[1:] != bucket_id[:-1]])
+    return (
+        bucket_id[starts],
+        np.minimum.reduceat(minimum, starts),
+        np.maximum.reduceat(maximum, starts),
+        np.add.reduceat(total, starts),
+        np.add.reduceat(count, starts),
+    )
+
+
+class TimeSeriesPyramid:
+    """Min/max/mean/count of a time series in buckets of 2**k seconds, for every level k up to MAX_LEVEL.
+
+    Buckets are aligned to the epoch, so appended rows only change the last buckets of each level.
+    update is handed the full series and its generation. It aggregates the rows added since the
+    last call, and rebuilds the pyramid only when the earlier rows or the generation changed.
+    Levels finer than base are left empty, see base_level.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, base: int = 0, value_dtype: np.dtype = np.dtype(np.float64)):
+        self.base = base
+        self.levels = [_Level(value_dtype) for _ in range(MAX_LEVEL + 1)]
+        self._version: SeriesVersion | None = None
+
+    def update(
+        self, time: NDArray[datetime64], value: NDArray[floating], generation: int = 0
+    ):
+        consumed = first_changed_row(self._version, time, generation)
+        if consumed is None:
+            return
+        if consumed == 0:
+            value_dtype = np.float32 if value.dtype == np.float32 else np.float64
+            self.reset(base_level(time), np.dtype(value_dtype))
+        self._version = version_of(time, generation)
+        if len(time) == 0:
+            return
+        # The bucket of the first new row may already hold older rows, aggregate it again from the start
+        changed_second = time[consumed].astype("datetime64[s]").astype(np.int64)
+        changed = int(changed_second) >> self.base
+        raw_start = int(np.searchsorted(time, np.datetime64(changed << self.base, "s")))
+        seconds = time[raw_start:].astype("datetime64[s]").astype(np.int64)
+        raw_value = np.asarray(value[raw_start:], dtype=np.float64)
+        valid = ~np.isnan(raw_value)
+        raw_value = raw_value[valid]
+        columns = group(
+            seconds[valid] >> self.base,
+            raw_value,
+            raw_value,
+            raw_value,
+            np.ones(len(raw_value), dtype=np.int64),
+        )
+        self.levels[self.base].replace_from(changed, columns)
+        for lower, level in zip(self.levels[self.base :], self.levels[self.base + 1 :]):
+            changed >>= 1
+            start = int(np.searchsorted(lower.id[: lower.length], changed << 1))
+            bucket_id, minimum, maximum, total, count = lower.columns(start)
+            level.replace_from(
+                changed, group(bucket_id >> 1, minimum, maximum, total, count)
+            )
+
+    def query(
+        self, start: TimeBound = None, end: TimeBound = None, buckets: int = 1000
+    ) -> Aggregates:
+        """The finest level with at most about buckets buckets between start and end"""
+        base = self.levels[self.base]
+        if base.length == 0:
+            return self.aggregates(self.base, 0, 0)
+        first = base.id[0] << self.base if start is None else seconds_of(start)
+        last = base.id[base.length - 1] << self.base if end is None else seconds_of(end)
+        span = max(int(last - first), 1)
+        level = int(
+            np.clip(np.ceil(np.log2(span / max(buckets, 1))), self.base, MAX_LEVEL)
+        )
+        ids = self.levels[level].id[: self.levels[level].length]
+        return self.aggregates(
+            level,
+            int(np.searchsorted(ids, first >> level)),
+            int(np.searchsorted(ids, last >> level, side="right")),
+        )
+
+    def aggregates(self, level: int, start: int, end: int) -> Aggregates:
+        bucket_id, minimum, maximum, total, count = self.levels[level].columns()
+        selection = slice(start, end)
+        return Aggregates(
+            (bucket_id[selection] << level).astype("datetime64[s]"),
+            minimum[selection],
+            maximum[selection],
+            total[selection] / count[selection],
+            count[selection],
+            np.timedelta64(2**level, "s"),
+        )
+
+    def memory(self) -> MemoryUsage:
+        return sum((level.memory() for level in self.levels), MemoryUsage(0, 0, 0))
+
+
+def base_level(time: NDArray[datetime64]) -> int:
+    """The finest level worth keeping for a series, the first with buckets longer than the spacing of
+    its readings. The finer levels would hold about a bucket per reading, as many rows as the series.
+    """
+    if len(time) < 2:
+        return 0
+    spacing = np.median(np.diff(time)) / np.timedelta64(1, "s")
+    if spacing < 1:
+        return 0
+    return min(int(np.log2(spacing)) + 1, MAX_LEVEL)
+
+
+def seconds_of(time: datetime | datetime64 | pd.Timestamp) -> int:
+    return int(to_datetime64(time).astype("datetime64[s]").astype(np.int64))
@@ -0,0 +1,106 @@
+import sys
+from math import ceil
+
+import numpy as np
+from numpy import datetime64, floating
+from numpy.typing import NDArray
+
+from .derived import SeriesVersion, first_changed_row, version_of
+from .storage import MemoryUsage, quantization_step
+
+
+class StreamingStatistics:
+    """Min, max, count, mean, variance and quantization step of a series, kept up to date as it grows.
+
+    update is handed the full series and its generation, and takes in the rows appended since the last
+    call. A new generation starts over. The mean and variance are merged with Welford's method. Reading any of the statistics is O(1).
+    NaN readings are not counted. dtype is that of the values, for bins that compare like the readings.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.minimum = np.nan
+        self.maximum = np.nan
+        self.mean = np.nan
+        self._m2 = 0.0
+        self.step: float | None = None
+        self.dtype = np.dtype(np.float64)
+        self.first_time: datetime64 | None = None
+        self.last_time: datetime64 | None = None
+        self._version: SeriesVersion | None = None
+
+    def memory(self) -> MemoryUsage:
+        """A handful of scalars, whatever the length of the series"""
+        size = sum(sys.getsizeof(value) for value in vars(self).values())
+        return MemoryUsage(0, size, size)
+
+    def update(
+        self, time: NDArray[datetime64], value: NDArray[floating], generation: int = 0
+    ):
+        start = first_changed_row(self._version, time, generation)
+        if start is None:
+            return
+        if start == 0:
+            self.reset()
+        self.dtype = value.dtype
+        self.add(value[start:])
+        self._version = version_of(time, generation)
+        _, _, self.first_time, self.last_time = self._version
+
+    def add(self, value: NDArray[floating]):
+        value = np.asarray(value, dtype=np.float64)
+        value = value[~np.isnan(value)]
+        count = len(value)
+        if count == 0:
+            return
+        mean = value.mean()
+        m2 = np.square(value - mean).sum()
+        if self.count == 0:
+            self.minimum, self.maximum = value.min(), value.max()
+            self.mean, self._m2 = mean, m2
+        else:
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean += delta * count / total
+            self._m2 += m2 + delta**2 * self.count * count / total
+            self.minimum = min(self.minimum, value.min())
+            self.maximum = max(self.maximum, value.max())
+        self.count += count
+        self.step = quantization_step(value, self.step)
+
+    @property
+    def variance(self) -> float:
+        if self.count < 2:
+            return np.nan
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(self.variance)
+
+    @property
+    def value_range(self) -> float:
+        return self.maximum - self.minimum
+
+    @property
+    def dynamic_range(self) -> int | None:
+        """The number of steps between the minimum and maximum, None for series without a step"""
+        if not self.step:
+            return None
+        return ceil(round(self.value_range / self.step, 6))
+
+    def bins(self, bincount: int) -> NDArray[np.float64]:
+        """Bin edges from the minimum to the maximum. Quantized series get bins centered on their
+        values, the bin width doubled until there are at most bincount bins."""
+        if self.step:
+            width = self.step
+            while ceil(round(self.value_range / width, 6)) > bincount:
+                width *= 2
+        else:
+            width = self.value_range / bincount if self.value_range > 0 else 1.0
+        left_of_first_bin = self.minimum - width / 2
+        bins = ceil(round(self.value_range / width, 6)) + 1
+        return left_of_first_bin + width * np.arange(bins + 1)
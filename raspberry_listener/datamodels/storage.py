@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+from numpy import datetime64, floating
+from numpy.typing import ArrayLike, NDArray
+
+# The canonical layout of a series: nanoseconds since the epoch and single precision values
+TIME_DTYPE = np.int64
+VALUE_DTYPE = np.float32
+# Steps readings are tested against, the largest that fits is the quantization of the series
+QUANTIZATION_STEPS = (1.0, 0.5, 0.25, 0.1, 0.0625, 0.05, 0.01)
+
+
+def to_epoch_ns(time: ArrayLike) -> NDArray[np.int64]:
+    return np.asarray(time, dtype="datetime64[ns]").view(TIME_DTYPE)
+
+
+def as_datetime(epoch_ns: NDArray[np.int64]) -> NDArray[datetime64]:
+    """A datetime64[ns] view of the epoch times, without a copy"""
+    return epoch_ns.view("datetime64[ns]")
+
+
+def quantization_step(value: NDArray[floating], previous: float | None = None) -> float:
+    """The largest step that value and the readings of step previous are all multiples of.
+    0.0 when there is none, previous is None when there were no readings before."""
+    if previous == 0.0:
+        return 0.0
+    value = np.asarray(value, dtype=np.float64)
+    value = value[~np.isnan(value)]
+    for step in QUANTIZATION_STEPS:
+        if previous is not None and not is_multiple(np.array([previous]), step):
+            continue
+        if is_multiple(value, step):
+            return step
+    return 0.0
+
+
+def is_multiple(value: NDArray[np.float64], step: float) -> bool:
+    # Tolerant of the rounding of values that went through float32
+    steps = value / step
+    return bool(np.all(np.abs(steps - np.round(steps)) <= 1e-3))
+
+
+@dataclass(frozen=True)
+class MemoryUsage:
+    rows: int
+    used: int  # Bytes holding readings
+    allocated: int  # Bytes held, including spare capacity
+
+    def __add__(self, other: "MemoryUsage") -> "MemoryUsage":
+        return MemoryUsage(
+            self.rows + other.rows,
+            self.used + other.used,
+            self.allocated + other.allocated,
+        )
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How much of a growing source is held in memory. Readings more than hot_window older than the
+    newest are moved out of memory, once the oldest are slack past that, so series aren't trimmed on
+    every append. A hot_window of None keeps everything."""
+
+    hot_window: timedelta | None = timedelta(days=7)
+    slack: timedelta = timedelta(hours=6)
+
+    def cutoff(
+        self, oldest: datetime64 | None, newest: datetime64 | None
+    ) -> datetime64 | None:
+        """The time to trim before, or None when the series should be kept as is"""
+        if self.hot_window is None or oldest is None or newest is None:
+            return None
+        cutoff = newest - np.timedelta64(self.hot_window)
+        if oldest >= cutoff - np.timedelta64(self.slack):
+            return None
+        return cutoff
+
+
+class CompactSeries:
+    """A series that doesn't grow, in the canonical layout. step is its quantization, see quantization_step."""
+
+    def __init__(self, time: ArrayLike, value: ArrayLike):
+        self.epoch_ns = to_epoch_ns(time)
+        self.value = np.asarray(value, dtype=VALUE_DTYPE)
+        self.step = quantization_step(self.value) if len(self.value) else None
+
+    def __len__(self) -> int:
+        return len(self.epoch_ns)
+
+    def arrays(self) -> tuple[NDArray[datetime64], NDArray[floating]]:
+        return as_datetime(self.epoch_ns), self.value
+
+    def memory(self) -> MemoryUsage:
+        size = self.epoch_ns.nbytes + self.value.nbytes
+        return MemoryUsage(len(self), size, size)
+
+
+def memory_report(usage: dict[str, dict[str, MemoryUsage]]) -> str:
+    """One line per series and a total per source and overall"""
+    lines = []
+    total = MemoryUsage(0, 0, 0)
+    for source, series in usage.items():
+        source_total = sum(series.values(), MemoryUsage(0, 0, 0))
+        total += source_total
+        lines.append(format_usage(source, source_total))
+        lines.extend(
+            format_usage(f"  {name}", series_usage)
+            for name, series_usage in sorted(series.items())
+        )
+    lines.append(format_usage("Total", total))
+    return "\n".join(lines)
+
+
+def format_usage(name: str, usage: MemoryUsage) -> str:
+    return (
+        f"{name}: {usage.rows} rows, {format_bytes(usage.used)}"
+        f" ({format_bytes(usage.allocated)} allocated)"
+    )
+
+
+def format_bytes(size: int) -> str:
+    if size < 2**20:
+        return f"{size / 2**10:.1f} KiB"
+    return f"{size / 2**20:.1f} MiB"
@@ -0,0 +1,66 @@
+import numpy as np
+from numpy import datetime64, floating
+from numpy.typing import NDArray
+
+from .derived import SeriesVersion, first_changed_row, version_of
+from .storage import MemoryUsage
+
+HOURS = 24
+
+
+class TimeOfDayHistogram:
+    """Counts of readings per hour of the day and value bin, kept up to date as the series grows.
+
+    update is handed the full series and the bin edges. While the edges stay the same only the rows
+    appended since the last call are counted, all of them in one np.bincount on hour * bins + bin.
+    New edges, a new generation of the series, or a series that changed before its end, are counted
+    again from the start.
+    Bins are half open like np.histogram's, except for the last which includes its right edge.
+    """
+
+    def __init__(self):
+        self.reset(np.array([0.0, 1.0]))
+
+    def reset(self, bins: NDArray[floating]):
+        self.bins = bins
+        self.counts = np.zeros((HOURS, len(bins) - 1), dtype=np.int64)
+        self._version: SeriesVersion | None = None
+
+    def update(
+        self,
+        time: NDArray[datetime64],
+        value: NDArray[floating],
+        bins: NDArray[floating],
+        generation: int = 0,
+    ):
+        if not np.array_equal(bins, self.bins):
+            self.reset(bins)
+        start = first_changed_row(self._version, time, generation)
+        if start is None:
+            return
+        if start == 0:
+            self.counts[:] = 0
+        self.add(time[start:], value[start:])
+        self._version = version_of(time, generation)
+
+    def add(self, time: NDArray[datetime64], value: NDArray[floating]):
+        bincount = len(self.bins) - 1
+        hour = time.astype("datetime64[h]").astype(np.int64) % HOURS
+        index = np.searchsorted(self.bins, value, side="right") - 1
+        index[value == self.bins[-1]] = bincount - 1
+        counted = (index >= 0) & (index < bincount)
+        self.counts += np.bincount(
+            hour[counted] * bincount + index[counted], minlength=HOURS * bincount
+        ).reshape(HOURS, bincount)
+
+    def memory(self) -> MemoryUsage:
+        """The counts and bin edges, a fixed size whatever the length of the series"""
+        size = self.counts.nbytes + self.bins.nbytes
+        return MemoryUsage(0, size, size)
+
+    def fractions(self) -> NDArray[np.float64]:
+        """The share of each bin in the readings of each hour, zero for hours without readings"""
+        total = self.counts.sum(axis=1, keepdims=True)
+        return np.divide(
+            self.counts, total, out=np.zeros(self.counts.shape), where=total > 0
+        )
@@ -1,56 +1,407 @@
+import datetime
+import logging
+import random
+import threading
 import weakref
-from typing import Callable
+from collections.abc import Hashable
+from enum import IntEnum
+from functools import cache
+from typing import Callable, Protocol
 
 import debugpy
+from datamodels.storage import MemoryUsage
 from PySide6 import QtCore
+from sources import PollOutcome
 
 LoadFn = Callable[[], None]
 
+logger = logging.getLogger("datathread")
+
+
+class Priority(IntEnum):
+    Backfill = 0
+    LiveUpdate = 1
+    Interactive = 2
+
+
+class Job(QtCore.QRunnable):
+    def __init__(
+        self,
+        scheduler: "JobScheduler",
+        source: Hashable,
+        kind: str,
+        fn: LoadFn,
+        priority: Priority,
+    ):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.scheduler = scheduler
+        self.source = source
+        self.kind = kind
+        self.fn = fn
+        self.priority = priority
+        self.started = False
+        self.cancelled = False
+
+    @property
+    def key(self) -> tuple[Hashable, str]:
+        return self.source, self.kind
+
+    def run(self):
+        self.started = True
+        # Call this before code running in the worker threads when debugging.
+        if debugpy.is_client_connected():
+            debugpy.debug_this_thread()
+        failed = False
+        try:
+            if not self.cancelled:
+                self.fn()
+        except Exception:
+            logger.exception(f"{self.kind} job for {self.source} failed")
+            failed = True
+        finally:
+            self.scheduler.job_done(self, failed)
+
+
+class JobScheduler(QtCore.QObject):
+    """Runs load jobs on a bounded QThreadPool, most urgent first.
+
+    A source runs one job at a time, the rest wait their turn by priority. Submitting a job
+    of a kind that is already waiting for the same source coalesces into the waiting one,
+    raising its priority if needed. finished and failed are emitted with the job's (source, kind).
+    """
+
+    finished = QtCore.Signal(object)
+    failed = QtCore.Signal(object)
+
+    def __init__(self, max_workers: int = 4):
+        super().__init__()
+        self.pool = QtCore.QThreadPool()
+        self.pool.setMaxThreadCount(max_workers)
+        self._lock = threading.Lock()
+        self._active: dict[Hashable, Job] = {}  # Queued in the pool or running
+        self._waiting: dict[Hashable, list[Job]] = {}
+
+    def submit(
+        self, source: Hashable, kind: str, fn: LoadFn, priority: Priority
+    ) -> Job:
+        with self._lock:
+            for job in self._pending(source):
+                if job.kind == kind:
+                    if priority > job.priority:
+                        self._reprioritize(job, priority)
+                    return job
+            job = Job(self, source, kind, fn, priority)
+            if source in self._active:
+                self._waiting.setdefault(source, []).append(job)
+            else:
+                self._start(job)
+            return job
+
+    def cancel(self, source: Hashable):
+        """Drops every job for source that hasn't started. A running job completes, but isn't reported."""
+        with self._lock:
+            for job in self._waiting.pop(source, []):
+                job.cancelled = True
+            active = self._active.get(source)
+            if active is None:
+                return
+            active.cancelled = True
+            if not active.started and self.pool.tryTake(active):
+                del self._active[source]
+
+    def job_done(self, job: Job, failed: bool):
+        with self._lock:
+            if self._active.get(job.source) is job:
+                del self._active[job.source]
+                waiting = self._waiting.get(job.source)
+                if waiting:
+                    next_job = max(waiting, key=lambda job: job.priority)
+                    waiting.remove(next_job)
+                    self._start(next_job)
+        if job.cancelled:
+            return
+        if failed:
+            self.failed.emit(job.key)
+        else:
+            self.finished.emit(job.key)
+
+    def _pending(self, source: Hashable) -> list[Job]:
+        pending = list(self._waiting.get(source, []))
+        active = self._active.get(source)
+        if active is not None and not active.started:
+            pending.append(active)
+        return pending
+
+    def _start(self, job: Job):
+        self._active[job.source] = job
+        self.pool.start(job, job.priority)
+
+    def _reprioritize(self, job: Job, priority: Priority):
+        job.priority = priority
+        if self._active.get(job.source) is job and self.pool.tryTake(job):
+            self.pool.start(job, priority)
+
+
+@cache
+def job_scheduler() -> JobScheduler:
+    return JobScheduler()
+
+
+class Subscription(Protocol):
+    def stop(self) -> None:
+        ...
+
+
+SubscribeFn = Callable[[Callable[[], None], Callable[[bool], None]], Subscription]
+
+
+class SubscriptionController(QtCore.QObject):
+    """Keeps a push subscription to a source open. While it is down the source is polled instead.
+
+    subscribe_fn opens the subscription and calls its first argument when data arrived and its
+    second when the subscription closed, both from the thread the subscription runs on.
+    A closed subscription is retried after retry_interval_ms, or never if the source has no push support.
+    """
+
+    received = QtCore.Signal()
+    closed = QtCore.Signal(bool)
+
+    def __init__(self, subscribe_fn: SubscribeFn, retry_interval_ms: int = 60_000):
+        super().__init__()
+        self.subscribe_fn = subscribe_fn
+        self.subscription: Subscription | None = None
+        self.active = False
+        self.supported = True
+        self.retry_timer = QtCore.QTimer()
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.setInterval(retry_interval_ms)
+        self.closed.connect(self.subscription_closed)
+
+    @QtCore.Slot()
+    def start_if_idle(self):
+        if self.active or not self.supported or self.retry_timer.isActive():
+            return
+        self.active = True
+        self.subscription = self.subscribe_fn(self.received.emit, self.closed.emit)
+
+    @QtCore.Slot(bool)
+    def subscription_closed(self, available: bool):
+        self.active = False
+        self.subscription = None
+        self.supported = available
+        if available:
+            self.retry_timer.start()
+
+    def stop(self):
+        self.supported = False
+        self.retry_timer.stop()
+        if self.subscription is not None:
+            self.subscription.stop()
+
 
 class DataThreadController(QtCore.QObject):
+    """Runs the loads of one source as jobs on the shared JobScheduler.
+
+    init_load and update_data submit a job, finished is emitted when it completed and failed when it raised.
+    submit_page runs a load of older readings for the plots, paged is emitted when it completed.
+    """
+
     finished = QtCore.Signal()
+    failed = QtCore.Signal()
+    paged = QtCore.Signal()
     init_load = QtCore.Signal()
     update_data = QtCore.Signal()
 
-    def __init__(self, initial_load_fn: LoadFn, update_data_fn: LoadFn | None = None):
+    def __init__(
+        self,
+        initial_load_fn: LoadFn,
+        update_data_fn: LoadFn | None = None,
+        subscribe_fn: SubscribeFn | None = None,
+        initial_priority: Priority = Priority.Interactive,
+        scheduler: JobScheduler | None = None,
+    ):
         super().__init__()
-        self.workerThread = QtCore.QThread()
+        self.scheduler = job_scheduler() if scheduler is None else scheduler
+        self.poller: PollScheduler | None = None
+        self.memory_fn: Callable[[], dict[str, MemoryUsage]] | None = None
+        # Called on shutdown, after the jobs of the source were cancelled
+        self.close_fn: Callable[[], None] | None = None
         self.finalizer = weakref.finalize(self, self.quit_thread)
 
         self.initial_load_fn = initial_load_fn
         self.update_data_fn = update_data_fn
+        self.initial_priority = initial_priority
 
-        self.init_load_worker = self.Worker(self.initial_load_fn)
-        self.init_load_worker.moveToThread(self.workerThread)
-        self.init_load.connect(self.init_load_worker.run)
-        self.init_load_worker.finished.connect(self.finished)
+        self.scheduler.finished.connect(self.job_finished)
+        self.scheduler.failed.connect(self.job_failed)
+        self.init_load.connect(self.submit_initial_load)
 
+        self.subscription: SubscriptionController | None = None
         if self.update_data_fn is not None:
-            self.repeat_load_worker = self.Worker(self.update_data_fn)
-            self.repeat_load_worker.moveToThread(self.workerThread)
-            self.update_data.connect(self.repeat_load_worker.run)
-            self.repeat_load_worker.finished.connect(self.finished)
-        else:
-            self.init_load_worker.finished.connect(self.quit_thread)
+            self.update_data.connect(self.submit_update)
+            if subscribe_fn is not None:
+                self.subscription = SubscriptionController(subscribe_fn)
+                self.subscription.received.connect(self.finished)
 
-        self.workerThread.start()
         self.init_load.emit()
 
+    @property
+    def subscribed(self) -> bool:
+        return self.subscription is not None and self.subscription.active
+
+    @QtCore.Slot()
+    def submit_initial_load(self):
+        self.scheduler.submit(
+            self, "initial", self.initial_load_fn, self.initial_priority
+        )
+
+    @QtCore.Slot()
+    def submit_update(self):
+        if self.update_data_fn is not None:
+            self.scheduler.submit(
+                self, "update", self.update_data_fn, Priority.LiveUpdate
+            )
+
+    def submit_page(self, page_fn: LoadFn):
+        # The user is waiting on it, it goes ahead of the polls
+        self.scheduler.submit(self, "page", page_fn, Priority.Interactive)
+
+    @QtCore.Slot(object)
+    def job_finished(self, key: tuple[Hashable, str]):
+        source, kind = key
+        if source is not self:
+            return
+        if kind == "page":
+            self.paged.emit()
+            return
+        # Subscribe after a poll has caught up, the stream only replays from the high-water mark.
+        # Done before finished, so listeners see the subscription as active.
+        if kind == "update" and self.subscription is not None:
+            self.subscription.start_if_idle()
+        self.finished.emit()
+
+    @QtCore.Slot(object)
+    def job_failed(self, key: tuple[Hashable, str]):
+        source, _ = key
+        if source is self:
+            self.failed.emit()
+
     def quit_thread(self):
-        self.workerThread.quit()
-        self.workerThread.wait()
-
-    class Worker(QtCore.QObject):
-        finished = QtCore.Signal()
-
-        def __init__(self, data_source_callback: Callable):
-            super().__init__()
-            self.data_source_callback = data_source_callback
-
-        @QtCore.Slot()
-        def run(self):
-            # Call this before code running in the datathread when debugging.
-            if debugpy.is_client_connected():
-                debugpy.debug_this_thread()
-            self.data_source_callback()
-            self.finished.emit()
+        if self.subscription is not None:
+            self.subscription.stop()
+        self.scheduler.cancel(self)
+        if self.close_fn is not None:
+            self.close_fn()
+
+
+class PollScheduler(QtCore.QObject):
+    """Schedules the update_data polls of a source with an adaptive interval.
+
+    interval_fn gives the interval while polls find new data, for instance the sensor cadence.
+    Polls that fail or find nothing double it, up to max_interval_ms, with jitter so retries against
+    a flaky link don't line up. While visible_fn says no plot of the source is shown, the interval is
+    stretched by idle_factor. Polling pauses while the source has a push subscription.
+    changed is emitted whenever a poll is scheduled, with the description from status().
+    """
+
+    changed = QtCore.Signal(str)
+
+    def __init__(
+        self,
+        controller: DataThreadController,
+        interval_fn: Callable[[], int],
+        outcome_fn: Callable[[], PollOutcome | None] | None = None,
+        max_interval_ms: int = 5 * 60_000,
+        idle_factor: float = 6.0,
+        jitter: float = 0.2,
+    ):
+        super().__init__()
+        self.controller = controller
+        self.interval_fn = interval_fn
+        self.outcome_fn = outcome_fn
+        self.visible_fn: Callable[[], bool] = lambda: True
+        self.max_interval_ms = max_interval_ms
+        self.idle_factor = idle_factor
+        self.jitter = jitter
+        self.error_streak = 0
+        self.empty_streak = 0
+        self.interval_ms: int | None = None
+        self.next_poll: datetime.datetime | None = None
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.poll)
+        controller.finished.connect(self.job_finished)
+        controller.failed.connect(self.job_failed)
+        if controller.subscription is not None:
+            controller.subscription.closed.connect(self.schedule)
+
+    def set_visible_fn(self, visible_fn: Callable[[], bool]):
+        self.visible_fn = visible_fn
+
+    @QtCore.Slot()
+    def poll(self):
+        self.next_poll = None
+        self.controller.update_data.emit()
+
+    @QtCore.Slot()
+    def job_finished(self):
+        if self.controller.subscribed:
+            # Pushed readings arrive on their own, only poll while there is no subscription
+            self.timer.stop()
+            self.next_poll = None
+            self.changed.emit(self.status())
+            return
+        outcome = None if self.outcome_fn is None else self.outcome_fn()
+        match outcome:
+            case PollOutcome.Failed:
+                self.error_streak += 1
+            case PollOutcome.NoNewData:
+                self.error_streak = 0
+                self.empty_streak += 1
+            case _:
+                self.error_streak = 0
+                self.empty_streak = 0
+        self.schedule()
+
+    @QtCore.Slot()
+    def job_failed(self):
+        self.error_streak += 1
+        self.schedule()
+
+    @QtCore.Slot()
+    def schedule(self):
+        if self.controller.subscribed:
+            return
+        self.interval_ms = self.next_interval_ms()
+        self.next_poll = datetime.datetime.now() + datetime.timedelta(
+            milliseconds=self.interval_ms
+        )
+        self.timer.start(self.interval_ms)
+        self.changed.emit(self.status())
+
+    @QtCore.Slot()
+    def visibility_changed(self):
+        """Polls sooner when the source came into view while waiting out an idle interval"""
+        if (
+            self.timer.isActive()
+            and self.timer.remainingTime() > self.next_interval_ms()
+        ):
+            self.schedule()
+
+    def next_interval_ms(self) -> int:
+        interval = self.interval_fn() * 2 ** (self.error_streak + self.empty_streak)
+        if not self.visible_fn():
+            interval *= self.idle_factor
+        interval = min(interval, self.max_interval_ms)
+        return int(interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def status(self) -> str:
+        if self.controller.subscribed:
+            return "push"
+        if self.next_poll is None or self.interval_ms is None:
+            return "polling"
+        status = f"every {self.interval_ms / 1000:.1f}s, next {self.next_poll:%H:%M:%S}"
+        if self.error_streak:
+            status += f", {self.error_streak} errors"
+        return status
@@ -1,6 +1,7 @@
 import logging
 from collections.abc import Sequence
 from functools import partial
+from typing import Callable
 
 from controller import (
     register_raspberry_sensor_data,
@@ -8,9 +9,15 @@ from controller import (
     register_yr_historic_data,
 )
 from datamodels import DataTypeManager, DataTypeModel, HumidityModel, TemperatureModel
-from datathread import DataThreadController, LoadFn
-from PySide6 import QtCore, QtWidgets
-from sources import SensorDataFrameHandler, YrForecast, YrHistoric
+from datathread import (
+    DataThreadController,
+    LoadFn,
+    PollScheduler,
+    Priority,
+    SubscribeFn,
+)
+from PySide6 import QtWidgets
+from sources import PollOutcome, SensorDataFrameHandler, YrForecast, YrHistoric
 from ui.dataplotterwindow import DataPlotterWindow
 
 
@@ -23,22 +30,33 @@ def create_populated_manager() -> DataTypeManager:
     return datatype_manager
 
 
+def every_five_seconds() -> int:
+    return 5000
+
+
 def load_dataset(
     source_name: str, datatype_manager: DataTypeManager
 ) -> DataThreadController:
-    def make_thread(init_load_fn: LoadFn, update_data_fn: LoadFn | None = None):
-        thread = DataThreadController(init_load_fn, update_data_fn)
+    def make_thread(
+        init_load_fn: LoadFn,
+        update_data_fn: LoadFn | None = None,
+        subscribe_fn: SubscribeFn | None = None,
+        update_interval_fn: Callable[[], int] = every_five_seconds,
+        initial_priority: Priority = Priority.Interactive,
+        outcome_fn: Callable[[], PollOutcome | None] | None = None,
+    ):
+        thread = DataThreadController(
+            init_load_fn, update_data_fn, subscribe_fn, initial_priority
+        )
         if update_data_fn is not None:
-            data_collection_timer = QtCore.QTimer()
-            data_collection_timer.setSingleShot(True)
-            data_collection_timer.timeout.connect(thread.update_data)
-            thread.finished.connect(partial(data_collection_timer.start, 5000))
+            thread.poller = PollScheduler(thread, update_interval_fn, outcome_fn)
         return thread
 
     def connect_model(
         model: DataTypeModel, thread: DataThreadController, source_name: str
     ):
         thread.finished.connect(partial(model.forward_source_updated, source_name))
+        thread.paged.connect(partial(model.forward_range_loaded, source_name))
 
     def connect_models(
         models: Sequence[DataTypeModel],
@@ -48,6 +66,12 @@ def load_dataset(
         for model in models:
             connect_model(model, thread, source_name)
 
+    handler: SensorDataFrameHandler | YrForecast | YrHistoric
+    update_fn: LoadFn | None
+    subscribe_fn: SubscribeFn | None
+    outcome_fn: Callable[[], PollOutcome | None] | None
+    # Only sources that are polled set their own interval
+    update_interval_fn: Callable[[], int] = every_five_seconds
     match source_name:
         case "Pi-sensors":
             handler = SensorDataFrameHandler()
@@ -56,19 +80,46 @@ def load_dataset(
             )
             init_load_fn = handler.initial_load
             update_fn = handler.update_data
+            subscribe_fn = handler.subscribe
+            # Poll at the cadence of the sensors, backing off while polls fail or come back empty
+            update_interval_fn = handler.poll_interval_ms
+            initial_priority = Priority.Interactive
+            outcome_fn = handler.poll_outcome
         case "Yr Forecast":
             handler = YrForecast()
             models = register_yr_forecast_data(handler, datatype_manager, source_name)
             init_load_fn = handler.initial_load
-            update_fn = None
+            # Refresh when the forecast expires, the conditional request after that is cheap
+            update_fn = handler.update_data
+            subscribe_fn = None
+            update_interval_fn = handler.milliseconds_until_refresh
+            initial_priority = Priority.Interactive
+            outcome_fn = None
         case "Yr Historic":
             handler = YrHistoric()
             models = register_yr_historic_data(handler, datatype_manager, source_name)
             init_load_fn = handler.initial_load
             update_fn = None
+            subscribe_fn = None
+            # Years of history, it shouldn't hold up the other sources
+            initial_priority = Priority.Backfill
+            outcome_fn = None
         case _:
             raise KeyError(f"Dataset {source_name} not available")
-    thread = make_thread(init_load_fn, update_fn)
+    thread = make_thread(
+        init_load_fn,
+        update_fn,
+        subscribe_fn,
+        update_interval_fn,
+        initial_priority,
+        outcome_fn,
+    )
+    thread.memory_fn = handler.memory_usage
+    if isinstance(handler, SensorDataFrameHandler):
+        # Polls only write the archive cache every few minutes
+        thread.close_fn = handler.close
+        # Older readings for the plots are paged in from the archive cache off the GUI thread
+        handler.page_loader = thread.submit_page
     connect_models(models, thread, source_name)
     return thread
 
@@ -1,13 +1,27 @@
 from functools import wraps
 
-from datamodels import DataIdentifier, DataTypeModel
+import numpy as np
+from datamodels import (
+    DataIdentifier,
+    DataTypeModel,
+    DataUpdate,
+    SeriesChange,
+    SeriesVersion,
+)
+from matplotlib.artist import Artist
 from plotstrategies import PlotStrategy
 from plotstrategies.axes import AxesStrategy
 from plotstrategies.color import ColorStrategy
 from plotstrategies.legend import LegendStrategy
 from plotstrategies.plotitem import PlotItem, PlotStatus
+from redrawscheduler import RedrawScheduler, default_scheduler
+from sources import DataNotReadyException
 from ui.drawwidget import DrawWidget
 
+# Fraction of the x span left free to the right of the data when rescaling, so that the
+# next polls land inside the limits and can be blitted instead of drawing the whole figure
+X_HEADROOM = 0.05
+
 
 class PlotManager:
     @staticmethod
@@ -17,10 +31,10 @@ class PlotManager:
         @wraps(func)
         def wrapper(self: "PlotManager", *args, **kwargs):
             if self.widget.plot_live and self.widget.isVisible():
-                func(self, *args, **kwargs)
+                blittable = func(self, *args, **kwargs)
                 if self.widget.rescale_plot:
                     self.rescale()
-                self.widget.canvas.draw_idle()
+                self.render(bool(blittable))
 
         return wrapper
 
@@ -32,6 +46,7 @@ class PlotManager:
         axes: AxesStrategy,
         color: ColorStrategy,
         legend: LegendStrategy,
+        scheduler: RedrawScheduler | None = None,
     ):
         self.widget = draw_widget
         self.model = model
@@ -39,17 +54,20 @@ class PlotManager:
         self.color = color
         self.legend = legend
         self.axes_strategy = axes
-        self.model.source_updated.connect(self.source_updated)
+        self.model.data_updated.connect(self.data_updated)
+        self.model.range_loaded.connect(self.range_loaded)
         self.model.dataline_registered.connect(self.construct_plot_strategy)
 
+        self.scheduler = scheduler if scheduler is not None else default_scheduler()
+        # What is waiting for the scheduler: a redraw of every plot, or the changes to some
+        self._pending_plot = False
+        self._pending_changes: dict[DataIdentifier, SeriesChange] = {}
+        self._drawn_versions: dict[DataIdentifier, tuple] | None = None
+
         self.plots: dict[DataIdentifier, PlotItem] = {}
+        self._drawn_state: tuple | None = None
         self.construct_plot_strategies()
 
-    def source_updated(self, source_name: str):
-        data_names = self.model.get_data_name_from_source(source_name)
-        plots = [DataIdentifier(source_name, data_name) for data_name in data_names]
-        self.draw_plots(plots)
-
     def construct_plot_strategies(self):
         datasets = self.model.get_data_identifiers()
         for dataset in datasets:
@@ -62,10 +80,88 @@ class PlotManager:
             dataset, constructed_strategy, PlotStatus.Disabled, self.axes_strategy
         )
 
+    def shows_source(self, source_name: str) -> bool:
+        """Whether a plot of the source is enabled and on screen"""
+        return self.widget.isVisible() and any(
+            item.visible and dataset.source == source_name
+            for dataset, item in self.plots.items()
+        )
+
     def rescale(self):
+        """Fits the axes to the data. Uses the data limits of the plots when they all know them,
+        which is O(1), rather than going through every point of every artist.
+
+        The x limits are kept while they still hold the data and aren't much wider than needed.
+        When they are moved, X_HEADROOM is added on the right for the readings still to come.
+        """
         for ax in self.axes_strategy:
-            ax.relim()
+            drawn_left, drawn_right = ax.get_xlim()
+            limits = [
+                item.plot_strategy.data_limits()
+                for item in self.plots.values()
+                if item.visible and item.ax is ax
+            ]
+            if limits and None not in limits:
+                ax.ignore_existing_data_limits = True
+                for (left, right), (bottom, top) in limits:
+                    ax.update_datalim([(left, bottom), (right, top)])
+            else:
+                ax.relim()
             ax.autoscale()
+            data_left, data_right = ax.dataLim.intervalx
+            if not np.isfinite([data_left, data_right]).all():
+                continue
+            left, right = ax.get_xlim()
+            headroom = X_HEADROOM * (right - left)
+            holds_data = drawn_left <= data_left and data_right <= drawn_right
+            if holds_data and drawn_right - drawn_left <= right - left + headroom:
+                ax.set_xlim(drawn_left, drawn_right)
+            else:
+                ax.set_xlim(left, right + headroom)
+
+    def render(self, blittable: bool):
+        """Blits the plots when the widget blits and only their data changed since the last full draw.
+        Otherwise, or when the limits, ticks or artists changed, the whole figure is drawn.
+        """
+        blitter = self.widget.blitter
+        if not self.widget.blit:
+            blitter.set_artists([])
+            self._drawn_state = None
+            self.widget.canvas.draw_idle()
+            return
+        artists = self.artists()
+        blitter.set_artists(artists)
+        state = (artists, self.view_state())
+        if blittable and state == self._drawn_state and blitter.blit():
+            return
+        self._drawn_state = state
+        self.widget.canvas.draw_idle()
+
+    def artists(self) -> list[Artist]:
+        """The artists of the visible plots, those that strategies keep as one"""
+        artists = []
+        for item in self.plots.values():
+            if not item.visible:
+                continue
+            try:
+                artist = item.plot_strategy.artist()
+            except AttributeError:
+                continue
+            if isinstance(artist, Artist):
+                artists.append(artist)
+        return artists
+
+    def view_state(self) -> tuple:
+        """What the cached background depends on besides the legend: the limits and ticks of the axes"""
+        return tuple(
+            (
+                ax.get_xlim(),
+                ax.get_ylim(),
+                tuple(ax.get_xticks()),
+                tuple(ax.get_yticks()),
+            )
+            for ax in self.axes_strategy
+        )
 
     def add_plotting_strategy(self, dataset: DataIdentifier):
         self.plots[dataset].status = PlotStatus.Enabled
@@ -84,6 +180,68 @@ class PlotManager:
                 drawn_plots.append(self.plots[dataset])
         self.legend(drawn_plots)
 
+    def data_updated(self, update: DataUpdate):
+        """Schedules a redraw of the plots of the data lines that changed"""
+        for dataset, change in update.changes.items():
+            pending = self._pending_changes.get(dataset)
+            self._pending_changes[dataset] = (
+                change if pending is None else pending.then(change)
+            )
+        self.scheduler.schedule(self)
+
+    @draw
+    def update_plots(self, changes: dict[DataIdentifier, SeriesChange]):
+        """Redraws the plots of the data lines that changed, appending to them where the strategy can"""
+        redrawn_plots = []
+        for dataset, change in changes.items():
+            plot = self.plots.get(dataset)
+            if plot is not None and plot.visible and plot.update_plot(change):
+                redrawn_plots.append(plot)
+        # Plots updated in place keep their legend entries, and can be blitted
+        if redrawn_plots:
+            self.legend(redrawn_plots)
+        return not redrawn_plots
+
+    def range_loaded(self, source_name: str):
+        """Redraws the plots of the source, with the readings loaded for the range in view.
+        Their data versions don't change, so the redraw is forced."""
+        if self.shows_source(source_name):
+            self._drawn_versions = None
+            self.plot()
+
     def plot(self):
-        datasets_to_plot = list(self.plots.keys())
-        self.draw_plots(datasets_to_plot)
+        """Schedules a redraw of every plot"""
+        self._pending_plot = True
+        self.scheduler.schedule(self)
+
+    def visible(self) -> bool:
+        return self.widget.isVisible()
+
+    def flush(self) -> bool:
+        """Draws what is pending, unless the data and plots are the same as when last drawn.
+        Returns False when the widget can't draw now, what is pending is then kept."""
+        if not (self.widget.plot_live and self.widget.isVisible()):
+            return False
+        versions = self.data_versions()
+        if versions != self._drawn_versions:
+            if self._pending_plot:
+                self.draw_plots(list(self.plots.keys()))
+            elif self._pending_changes:
+                self.update_plots(self._pending_changes)
+        self._drawn_versions = versions
+        self._pending_plot = False
+        self._pending_changes = {}
+        return True
+
+    def data_versions(self) -> dict[DataIdentifier, tuple]:
+        """The status of every plot and the version of the data of the visible ones"""
+        versions: dict[DataIdentifier, tuple] = {}
+        for dataset, item in self.plots.items():
+            version: SeriesVersion | None = None
+            if item.visible:
+                try:
+                    version = self.model.data_version(dataset)
+                except DataNotReadyException:
+                    pass
+            versions[dataset] = (item.status, version)
+        return versions
@@ -10,14 +10,13 @@ class HistogramPlot(SingleColorPlotStrategy):
         super().__init__(model, dataset)
         self.color = None
 
-    def __call__(self, ax: Axes, **kwargs):
+    def __call__(self, ax: Axes, **kwargs) -> bool:
         time_series, barchart_data = self.model.get_data(
             self.dataset
         )  # We don't care about the time_series
-        unique_values = len(np.unique(barchart_data))
-        histogram, bin_edges = np.histogram(
-            barchart_data, bins=np.min((16, unique_values)), density=True
-        )
+        # Quantized sensors get a bin per value they can report, or per a multiple of it
+        bin_edges = self.model.get_statistics(self.dataset).bins(16)
+        histogram, bin_edges = np.histogram(barchart_data, bins=bin_edges, density=True)
         histogram = histogram / np.sum(histogram)
         try:
             self.remove_artist()
@@ -25,7 +24,7 @@ class HistogramPlot(SingleColorPlotStrategy):
             pass
         width = bin_edges[1] - bin_edges[0]
         self._artist = ax.bar(
-            bin_edges[:-1],
+            bin_edges[:-1] + width / 2,
             histogram,
             width=width,
             align="center",
@@ -35,6 +34,7 @@ class HistogramPlot(SingleColorPlotStrategy):
             color=self.color,
             **kwargs,
         )
+        return True
 
     def remove_artist(self):
         self._artist.remove()
@@ -1,18 +1,29 @@
-from datamodels import DataTypeModel
+from datamodels import DataTypeModel, SeriesChange
+from datamodels.decimation import decimate
 from matplotlib.axes import Axes
+from matplotlib.dates import date2num, num2date
 from matplotlib.lines import Line2D
 
 from .plotstrategy import Color, DataIdentifier, SingleColorPlotStrategy
 
+# A min/max envelope draws the line exactly with two points per pixel column
+POINTS_PER_PIXEL = 2
+MINIMUM_POINTS = 1000
+
 
 class LinePlot(SingleColorPlotStrategy):
     def __init__(self, model: DataTypeModel, dataset: DataIdentifier):
         super().__init__(model, dataset)
         self.color = None
+        self._drawn_color: Color | None = None
+        self._connected_axes: Axes | None = None
 
-    def __call__(self, ax: Axes, **kwargs):
-        x, y = self.model.get_data(self.dataset)
+    def __call__(self, ax: Axes, **kwargs) -> bool:
+        x, y = self.visible_data(ax)
+        if not kwargs and self.set_data(ax, x, y):
+            return False
         self.remove_artist()
+        self.connect_view(ax)
         self._artists = ax.plot(
             x,
             y,
@@ -20,6 +31,75 @@ class LinePlot(SingleColorPlotStrategy):
             color=self.color,
             **kwargs,
         )
+        self._drawn_color = self.color
+        return True
+
+    def append(self, ax: Axes, change: SeriesChange) -> bool:
+        """get_data returns views of the store, so the line is handed the appended tail without a copy of the rest"""
+        if not hasattr(self, "_artists"):
+            return False
+        return self.set_data(ax, *self.visible_data(ax))
+
+    def set_data(self, ax: Axes, x, y) -> bool:
+        """Updates the line in place. Returns False if it has to be created anew,
+        when there is none yet, or it is on other axes or in another color."""
+        try:
+            line = self.artist()
+        except AttributeError:
+            return False
+        if line.axes is not ax or self._drawn_color != self.color:
+            return False
+        line.set_data(x, y)
+        return True
+
+    def visible_data(self, ax: Axes):
+        """The readings in view, or the min/max envelope from the model's pyramid when there are more than the point budget"""
+        start, end = self.view_range(ax)
+        budget = self.point_budget(ax)
+        x, y = self.model.get_data(self.dataset, start, end)
+        if len(x) <= budget:
+            return x, y
+        aggregates = self.model.get_aggregates(self.dataset, start, end, budget // 2)
+        if len(aggregates) and aggregates.time[0] <= x[0]:
+            return aggregates.envelope()
+        # The range reaches into readings paged in from disk, which the pyramid doesn't hold
+        return decimate(x, y, budget)
+
+    def point_budget(self, ax: Axes) -> int:
+        return max(MINIMUM_POINTS, int(ax.bbox.width * POINTS_PER_PIXEL))
+
+    def view_range(self, ax: Axes):
+        """The zoomed x range, padded by half its width on each side so short pans stay covered.
+        While the axes autoscale the whole series is shown."""
+        if ax.get_autoscalex_on():
+            return None, None
+        left, right = ax.get_xlim()
+        padding = (right - left) / 2
+        return num2date(left - padding), num2date(right + padding)
+
+    def connect_view(self, ax: Axes):
+        if self._connected_axes is not ax:
+            ax.callbacks.connect("xlim_changed", self.view_changed)
+            self._connected_axes = ax
+
+    def view_changed(self, ax: Axes):
+        """Refetches the visible range at full resolution when zooming or panning"""
+        try:
+            line = self.artist()
+        except AttributeError:
+            return
+        if line.axes is not ax or ax.get_autoscalex_on():
+            return
+        line.set_data(*self.visible_data(ax))
+
+    def data_limits(self):
+        statistics = self.model.get_statistics(self.dataset)
+        if statistics.count == 0:
+            return None
+        return (
+            (date2num(statistics.first_time), date2num(statistics.last_time)),
+            (statistics.minimum, statistics.maximum),
+        )
 
     def artist(self) -> Line2D:
         return self._artists[0]
@@ -1,7 +1,7 @@
 from enum import Enum, auto
 
 from attrs import define, field
-from datamodels import DataIdentifier
+from datamodels import DataIdentifier, SeriesChange
 from matplotlib.axes import Axes
 from sources import DataNotReadyException
 
@@ -81,3 +81,12 @@ class PlotItem:
             self.plot_strategy(self.ax)
         except DataNotReadyException:
             pass
+
+    def update_plot(self, change: SeriesChange) -> bool:
+        """Returns whether the plot was drawn anew, rather than updated in place"""
+        try:
+            if not change.replaced and self.plot_strategy.append(self.ax, change):
+                return False
+            return self.plot_strategy(self.ax)
+        except DataNotReadyException:
+            return False
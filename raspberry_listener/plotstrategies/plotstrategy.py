@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from datamodels import DataIdentifier, DataTypeModel
+from datamodels import DataIdentifier, DataTypeModel, SeriesChange
 from matplotlib.axes import Axes
 from matplotlib.colors import Colormap, Normalize
 
@@ -17,8 +17,9 @@ class PlotStrategy(ABC):
         self.dataset = dataset
 
     @abstractmethod
-    def __call__(self, ax: Axes, **kwargs):
-        """A method that plots something from self on axes ax."""
+    def __call__(self, ax: Axes, **kwargs) -> bool:
+        """A method that plots something from self on axes ax. Returns whether the artist was
+        created anew, rather than updated in place."""
         ...
 
     @abstractmethod
@@ -29,6 +30,16 @@ class PlotStrategy(ABC):
     def remove_artist(self):
         ...
 
+    def data_limits(self) -> tuple[tuple[float, float], tuple[float, float]] | None:
+        """The x and y range of the data in axes coordinates, when the strategy knows it without
+        looking at the data. Otherwise the axes compute it from the artists."""
+        return None
+
+    def append(self, ax: Axes, change: SeriesChange) -> bool:
+        """Adds the rows of change to the artist already on ax. Returns False when the strategy
+        can't, and the plot has to be drawn again."""
+        return False
+
 
 class SingleColorPlotStrategy(PlotStrategy):
     @abstractmethod
@@ -1,10 +1,8 @@
-from typing import Sequence
-
 import numpy as np
-import pandas as pd
+from datamodels.timeofday import HOURS
 from matplotlib.axes import Axes
+from matplotlib.collections import PolyCollection
 from matplotlib.colors import Colormap, Normalize
-from matplotlib.container import BarContainer
 
 from .plotstrategy import ColormapPlotStrategy, PlotNotReadyException
 
@@ -13,14 +11,21 @@ class ColorNotSetException(Exception):
     ...
 
 
+# Points along the inner and outer edge of each cell, so the cells follow the circle on polar axes
+ARC_POINTS = 8
+
+
 class TimeOfDayPlot(ColormapPlotStrategy):
-    def __call__(self, ax: Axes, **kwargs):
+    """The share of each value bin in the readings of every hour, stacked from the centre.
+
+    All 24 x bins cells are a single PolyCollection coloured through its array and norm. Refreshes
+    update the vertices, array and norm in place. The collection is only created anew on other axes.
+    The hour borders are drawn once per axes.
+    """
+
+    def __call__(self, ax: Axes, **kwargs) -> bool:
         counts, bins = self.time_of_day_histogram(max_bincount=64)
-        try:
-            self.remove_artist()
-        except AttributeError:
-            pass
-        self.plot_clock(ax, counts, bins, **kwargs)
+        return self.plot_clock(ax, counts, bins, **kwargs)
 
     def plot_clock(
         self,
@@ -28,73 +33,100 @@ class TimeOfDayPlot(ColormapPlotStrategy):
         counts: np.ndarray,
         bins: np.ndarray,
         **kwargs,
-    ):
+    ) -> bool:
+        try:
+            colormap = self.colormap
+        except AttributeError:
+            raise ColorNotSetException
         normalizer = Normalize(bins[0], bins[-2])
-        bottom = np.zeros(24)
-        self.artists: Sequence[BarContainer] = []
-        theta = np.linspace(0, 2 * np.pi, 24, endpoint=False)
-        width = theta[1] - theta[0]
-        for i in range(len(bins) - 1):
-            centre_value = (bins[i] + bins[i + 1]) / 2
-            left_value = bins[i]
-            try:
-                color = self.colormap(X=normalizer(centre_value))
-            except AttributeError:
-                raise ColorNotSetException
-            height = counts.T[i]
-            artist = ax.bar(
-                x=theta,
-                height=height,
-                width=width,
-                bottom=bottom,
-                align="edge",
-                label=f"{left_value:.2f}",
-                color=color,
-                edgecolor=color,
+        vertices = self.cell_vertices(counts)
+        centre_values = np.tile((bins[:-1] + bins[1:]) / 2, HOURS)
+        collection = getattr(self, "_collection", None)
+        if collection is None or collection.axes is not ax or kwargs:
+            self.remove_artist()
+            # An (N, points, 2) array is taken as N polygons, the stubs only allow a sequence
+            collection = PolyCollection(
+                vertices,  # type: ignore[arg-type]
+                array=centre_values,
+                cmap=colormap,
+                norm=normalizer,
+                edgecolors="face",
                 **kwargs,
             )
-            bottom += height
-            self.artists.append(artist)
-        for border in theta:
-            ax.axvline(border, 0, 1, color="grey", linewidth=0.3)
+            ax.add_collection(collection, autolim=False)
+            ax.set_ybound(0, 1)
+            self._collection = collection
+            created = True
+        else:
+            collection.set_verts(vertices)
+            collection.set_array(centre_values)
+            collection.set_norm(normalizer)
+            created = False
+        self.draw_hour_borders(ax)
         self._used_norm = normalizer
+        return created
+
+    @staticmethod
+    def cell_vertices(counts: np.ndarray) -> np.ndarray:
+        """The outline of every cell, hour by hour and bin by bin, in (theta, radius)"""
+        bincount = counts.shape[1]
+        width = 2 * np.pi / HOURS
+        theta = (
+            np.arange(HOURS)[:, None] * width
+            + np.linspace(0, width, ARC_POINTS)[None, :]
+        )
+        outer = np.cumsum(counts, axis=1)
+        inner = outer - counts
+        theta = np.broadcast_to(theta[:, None, :], (HOURS, bincount, ARC_POINTS))
+        outline_theta = np.concatenate((theta, theta[..., ::-1]), axis=2)
+        outline_radius = np.concatenate(
+            (
+                np.broadcast_to(outer[..., None], theta.shape),
+                np.broadcast_to(inner[..., None], theta.shape),
+            ),
+            axis=2,
+        )
+        return np.stack((outline_theta, outline_radius), axis=-1).reshape(
+            HOURS * bincount, 2 * ARC_POINTS, 2
+        )
+
+    def draw_hour_borders(self, ax: Axes):
+        if getattr(self, "_borders_axes", None) is ax:
+            return
+        for border in np.linspace(0, 2 * np.pi, HOURS, endpoint=False):
+            ax.axvline(border, 0, 1, color="grey", linewidth=0.3)
+        self._borders_axes = ax
 
     def time_of_day_histogram(self, max_bincount):
-        full_timeseries, full_data = self.model.get_data(self.dataset)
-        timeseries = full_timeseries[::1]
-        data = full_data[0::1]
         # Here we get the bins for the entire range of values in the dataset. Each hour can have a different range of values, producing different bins
         # In order to properly compare we want to use the same bins for every hour
-        first_edge = np.min(data)
-        last_edge = np.max(data)
-        bin_count = min(max_bincount, len(np.unique(data)))
+        statistics = self.model.get_statistics(self.dataset)
+        first_edge = statistics.minimum
+        # A constant series still gets bins of some width
+        last_edge = max(statistics.maximum, first_edge + (statistics.step or 1.0))
+        # Quantized sensors can't report more values than steps in their range
+        distinct_values = statistics.dynamic_range
+        bin_count = (
+            max_bincount
+            if distinct_values is None
+            else max(min(max_bincount, distinct_values + 1), 2)
+        )
         bin_edges = np.linspace(
-            first_edge, last_edge, bin_count, endpoint=True, dtype=data.dtype
+            first_edge, last_edge, bin_count, endpoint=True, dtype=statistics.dtype
         )
         bin_edges = np.append(bin_edges, bin_edges[-1] + (bin_edges[1] - bin_edges[0]))
-        frame = pd.DataFrame(data, index=pd.DatetimeIndex(timeseries))
-        histogram = self._density_count_by_hour(frame, bin_edges)
-        return histogram, bin_edges
+        histogram = self.model.get_time_of_day_histogram(self.dataset, bin_edges)
+        return histogram.fractions(), bin_edges
 
-    def _density_count_by_hour(self, frame: pd.DataFrame, bins):
-        assert isinstance(frame.index, pd.DatetimeIndex)
-        grouping = frame.groupby(frame.index.hour)
-
-        def count_without_bins(array, bins):
-            count, _ = np.histogram(array, bins, density=True)
-            return count / np.sum(
-                count
-            )  # The density integral is 1, not the sum. They are equal if the bin-width is 1, which is not the case here.
-
-        counts = np.array([count_without_bins(group, bins) for _, group in grouping])
-        return counts
-
-    def artist(self):
-        pass
+    def artist(self) -> PolyCollection:
+        return self._collection
 
     def remove_artist(self):
-        [artist.remove() for artist in self.artists]
-        del self.artists
+        try:
+            self._collection.remove()
+            del self._collection
+        except AttributeError:
+            pass
 
     def set_colormap(self, colors: Colormap):
         self.colormap = colors
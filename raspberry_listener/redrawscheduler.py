@@ -0,0 +1,51 @@
+from functools import cache
+from typing import Protocol
+
+from PySide6 import QtCore
+
+# About one frame of a 60 Hz display
+FRAME_MS = 16
+
+
+class Redrawable(Protocol):
+    def visible(self) -> bool:
+        ...
+
+    def flush(self) -> bool:
+        ...
+
+
+class RedrawScheduler(QtCore.QObject):
+    """Coalesces the redraws of plot managers into at most one pass every interval_ms.
+
+    Managers mark themselves dirty with schedule, for instance once per model of a poll and once
+    per tab switch, and what they have pending is drawn together when the timer fires. Visible
+    managers are flushed first. Those that can't draw, because they are hidden or frozen, keep
+    what is pending until they are scheduled again.
+    """
+
+    def __init__(self, interval_ms: int = FRAME_MS):
+        super().__init__()
+        self.interval_ms = interval_ms
+        # A dict rather than a set, so managers are flushed in the order they were scheduled
+        self._dirty: dict[Redrawable, None] = {}
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, manager: Redrawable):
+        self._dirty[manager] = None
+        if not self.timer.isActive():
+            self.timer.start(self.interval_ms)
+
+    def flush(self):
+        self.timer.stop()
+        dirty = sorted(self._dirty, key=lambda manager: not manager.visible())
+        self._dirty.clear()
+        for manager in dirty:
+            manager.flush()
+
+
+@cache
+def default_scheduler() -> RedrawScheduler:
+    return RedrawScheduler()
@@ -1,7 +1,16 @@
+from enum import Enum, auto
+
+
 class DataNotReadyException(Exception):
     ...
 
 
+class PollOutcome(Enum):
+    NewData = auto()
+    NoNewData = auto()
+    Failed = auto()
+
+
 from .raspberrysensors import SensorDataFrameHandler
 from .settings import get_settings
 from .yr import YrForecast, YrHistoric
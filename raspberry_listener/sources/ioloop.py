@@ -0,0 +1,60 @@
+import asyncio
+import concurrent.futures
+import threading
+from functools import cache
+from typing import Any, Coroutine, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+T = TypeVar("T")
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=4, max_keepalive_connections=4, keepalive_expiry=60.0
+)
+
+
+class IOLoop:
+    """A single asyncio loop on a daemon thread, shared by every network source.
+
+    It owns one httpx.AsyncClient per host, so concurrent loads reuse the same kept-alive
+    connections and each host is held to its own connection limit. Sources hand coroutines
+    to submit and get a concurrent.futures.Future back, which any thread can wait on.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._clients_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="io-loop", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, coroutine: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Runs coroutine on the loop and blocks the calling thread until it is done"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("IOLoop.run would deadlock when called from the loop")
+        return self.submit(coroutine).result()
+
+    def client(
+        self, url: str, limits: httpx.Limits = DEFAULT_LIMITS, **kwargs
+    ) -> httpx.AsyncClient:
+        """The client for the host of url, with url's origin as base_url.
+        limits and kwargs only apply when the client is created by the first caller."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._clients_lock:
+            client = self._clients.get(origin)
+            if client is None:
+                client = httpx.AsyncClient(base_url=origin, limits=limits, **kwargs)
+                self._clients[origin] = client
+            return client
+
+
+@cache
+def io_loop() -> IOLoop:
+    return IOLoop()
@@ -0,0 +1,135 @@
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from .datatypes import SensorData
+from .seriesstore import SeriesStore
+
+# Next to the package, not in whatever directory the app was started from
+CACHE_DIRECTORY = Path(__file__).resolve().parents[3] / "cache" / "pi-sensors"
+DAY_FORMAT = "%Y-%m-%d"
+
+logger = logging.getLogger("archivecache")
+
+
+class ArchiveCache:
+    """A local copy of the readings already fetched from the Pi, one Parquet file per day.
+
+    The files hold the same flat frame the Pi sends, with the index reset, so they are read
+    back with SensorData.repair_dataframe. Only the days touched by new readings are rewritten,
+    and at most once per flush_interval, as the current day is rewritten in full every time.
+    Days more than max_age before the newest reading are deleted when flushing, None keeps them all.
+    """
+
+    def __init__(
+        self,
+        directory: Path = CACHE_DIRECTORY,
+        flush_interval: pd.Timedelta = pd.Timedelta(minutes=10),
+        max_age: pd.Timedelta | None = pd.Timedelta(days=365),
+    ):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_age = max_age
+        self._dirty_since: pd.Timestamp | None = None
+        self._last_flush: datetime | None = None
+
+    def day_paths(self) -> dict[pd.Timestamp, Path]:
+        paths = {}
+        for path in self.directory.glob("*.parquet"):
+            try:
+                day = pd.Timestamp(datetime.strptime(path.stem, DAY_FORMAT))
+            except ValueError:
+                continue
+            paths[day] = path
+        return dict(sorted(paths.items()))
+
+    def load(self, since: pd.Timestamp | None = None) -> pd.DataFrame | None:
+        """Reads the cached days overlapping [since, now). Returns None if nothing is cached."""
+        df = self.load_range(since)
+        if df is not None and since is not None:
+            df = df[df.index.get_level_values("timestamp") >= since]
+        return df
+
+    def load_range(
+        self, start: pd.Timestamp | None = None, end: pd.Timestamp | None = None
+    ) -> pd.DataFrame | None:
+        """Reads the whole cached days overlapping [start, end]. Returns None if none are cached."""
+        first_day = None if start is None else start.normalize()
+        frames = []
+        for day, path in self.day_paths().items():
+            if first_day is not None and day < first_day:
+                continue
+            if end is not None and day > end:
+                break
+            try:
+                frames.append(pd.read_parquet(path))
+            except (OSError, ValueError):
+                logger.warning(f"Discarding unreadable cache file {path}")
+                path.unlink(missing_ok=True)
+        if not frames:
+            return None
+        df = pd.concat(frames, ignore_index=True)
+        return SensorData.repair_dataframe(df).sort_index()
+
+    def mark_dirty(self, earliest: pd.Timestamp):
+        if self._dirty_since is None or earliest < self._dirty_since:
+            self._dirty_since = earliest
+
+    def flush(self, store: SeriesStore, force: bool = False):
+        """Rewrites the day files touched since the last flush"""
+        if self._dirty_since is None:
+            return
+        now = datetime.now()
+        if (
+            not force
+            and self._last_flush is not None
+            and now - self._last_flush < self.flush_interval
+        ):
+            return
+        high_water_mark = store.high_water_mark
+        if high_water_mark is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        oldest = store.oldest
+        day = self._dirty_since.normalize()
+        while day <= high_water_mark:
+            next_day = day + pd.Timedelta(days=1)
+            df = store.to_dataframe(day, next_day)
+            if oldest is not None and day < oldest:
+                # The start of the day was trimmed from the store, keep it from the file
+                df = self._with_cached_before(day, pd.Timestamp(oldest), df)
+            self._write_day(day, df)
+            day = next_day
+        self._dirty_since = None
+        self._last_flush = now
+        self.prune(high_water_mark)
+
+    def prune(self, newest: pd.Timestamp):
+        """Deletes the day files more than max_age before newest"""
+        if self.max_age is None:
+            return
+        cutoff = (newest - self.max_age).normalize()
+        for day, path in self.day_paths().items():
+            if day >= cutoff:
+                break
+            path.unlink(missing_ok=True)
+
+    def _with_cached_before(
+        self, day: pd.Timestamp, oldest: pd.Timestamp, df: pd.DataFrame
+    ) -> pd.DataFrame:
+        cached = self.load_range(day, day)
+        if cached is None:
+            return df
+        cached = cached[cached.index.get_level_values("timestamp") < oldest]
+        return pd.concat([cached, df]).sort_index()
+
+    def _write_day(self, day: pd.Timestamp, df: pd.DataFrame):
+        if len(df) == 0:
+            return
+        path = self.directory / f"{day.strftime(DAY_FORMAT)}.parquet"
+        temporary_path = path.with_suffix(".tmp")
+        df.reset_index().to_parquet(temporary_path, index=False)
+        os.replace(temporary_path, path)
@@ -0,0 +1,118 @@
+import json
+import time
+from dataclasses import dataclass, field
+from io import BytesIO, StringIO
+
+import pandas as pd
+import pyarrow
+from pyarrow import ipc
+
+from .datatypes import SensorData
+from .remotereader import Format
+
+
+def decode_archive(payload, format: Format) -> pd.DataFrame:
+    """Decodes a payload as returned by Transport.download_archive into a sorted SensorData frame.
+
+    Parquet loses the categorical index levels, so the frame is repaired after reading.
+    JSON uses orient=table which preserves the index, but every row is parsed from text twice.
+    Arrow IPC is read straight into typed columns, with sensor_type, sensor and unit dictionary encoded.
+    The transport hands over the table it read while the stream downloaded, a stream is read here.
+    """
+    match format:
+        case Format.Parquet:
+            df = pd.read_parquet(payload)
+            return SensorData.repair_dataframe(df).sort_index()
+        case Format.JSON:
+            return pd.read_json(StringIO(payload), orient="table").sort_index()
+        case Format.Arrow:
+            if not isinstance(payload, pyarrow.Table):
+                payload = ipc.open_stream(payload).read_all()
+            df = payload.to_pandas()
+            return SensorData.repair_dataframe(df).sort_index()
+        case _:
+            raise TypeError("Format not supported")
+
+
+def encode_archive(df: pd.DataFrame, format: Format) -> bytes:
+    """Encodes a SensorData frame the way the Pi serves it. Used for benchmarks and the stand-in server."""
+    match format:
+        case Format.Parquet:
+            buffer = BytesIO()
+            df.reset_index().to_parquet(buffer)
+            return buffer.getvalue()
+        case Format.JSON:
+            return json.dumps(df.to_json(orient="table")).encode()
+        case Format.Arrow:
+            table = pyarrow.Table.from_pandas(df.reset_index(), preserve_index=False)
+            sink = pyarrow.BufferOutputStream()
+            with ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes()
+        case _:
+            raise TypeError("Format not supported")
+
+
+@dataclass(frozen=True)
+class FormatCost:
+    """Linear cost model of fetching and decoding a payload, fitted by benchmarks/formats.py"""
+
+    seconds: float  # Fixed decode overhead
+    seconds_per_row: float
+    bytes: float  # Fixed payload overhead
+    bytes_per_row: float
+
+    def estimate(self, rows: float, bytes_per_second: float) -> float:
+        decode = self.seconds + self.seconds_per_row * rows
+        transfer = (self.bytes + self.bytes_per_row * rows) / bytes_per_second
+        return decode + transfer
+
+
+# Fitted once with `python -m benchmarks.formats` on a desktop, for the Pi's 5 column frame.
+# They are not measured at runtime, only the link throughput is. Rerun it to refit them.
+DEFAULT_COSTS = {
+    Format.Parquet: FormatCost(4.0e-3, 6.9e-7, 4.6e3, 7.5),
+    Format.JSON: FormatCost(5.1e-3, 5.0e-6, 6.8e2, 129.0),
+    Format.Arrow: FormatCost(3.2e-3, 6.8e-7, 2.4e3, 19.0),
+}
+
+
+@dataclass
+class FormatSelector:
+    """Chooses the archive format with the lowest estimated cost for the expected number of rows.
+
+    Formats the Pi turns out not to serve are dropped with mark_unsupported, and tried again
+    after unsupported_seconds, so a server upgrade or a one-off error doesn't rule them out for good.
+    """
+
+    costs: dict[Format, FormatCost] = field(default_factory=lambda: dict(DEFAULT_COSTS))
+    bytes_per_second: float = 2e6
+    unsupported_seconds: float = 3600.0
+    # When each format was marked unsupported, in time.monotonic() seconds
+    unsupported: dict[Format, float] = field(default_factory=dict)
+
+    def choose(self, rows: float | None) -> Format:
+        now = time.monotonic()
+        candidates = {
+            format: cost
+            for format, cost in self.costs.items()
+            if self.supported(format, now)
+        }
+        if rows is None:
+            # Unknown size, usually the full archive
+            return min(candidates, key=lambda format: candidates[format].bytes_per_row)
+        expected = rows
+        return min(
+            candidates,
+            key=lambda format: candidates[format].estimate(
+                expected, self.bytes_per_second
+            ),
+        )
+
+    def supported(self, format: Format, now: float) -> bool:
+        marked = self.unsupported.get(format)
+        return marked is None or now - marked >= self.unsupported_seconds
+
+    def mark_unsupported(self, format: Format):
+        if format != Format.Parquet:
+            self.unsupported[format] = time.monotonic()
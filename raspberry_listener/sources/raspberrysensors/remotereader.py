@@ -1,14 +1,29 @@
+import asyncio
+import json
 import logging
+import queue
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
 from enum import Enum
-from io import BytesIO
+from functools import cache
+from io import BytesIO, RawIOBase
 
+import httpx
 import pandera as pa
-import requests
+import pyarrow
 from fastapi import HTTPException
+from pyarrow import ipc
+
+from ..ioloop import io_loop
 
 URL = "http://192.168.4.141:8000"
 # URL = "http://localhost:8000"
 ARCHIVE_ENDPOINT = "/archive/"
+TIMEOUT = httpx.Timeout(30.0, connect=3.0)
+# One connection for a push subscription, one for archive requests
+LIMITS = httpx.Limits(max_connections=2, max_keepalive_connections=2)
 
 logger = logging.getLogger("remotereader")
 
@@ -20,60 +35,187 @@ class ArchiveNotAvailableException(Exception):
 class Format(Enum):
     Parquet = "parquet/"
     JSON = "json/"
+    Arrow = "arrow/"  # Arrow IPC stream
+
+
+@dataclass(frozen=True)
+class TransferStats:
+    url: str
+    status_code: int
+    bytes: int
+    latency: float  # Seconds until the response headers arrived
+    duration: float  # Seconds until the body was read
+
+
+class Transport:
+    """Downloads archives from the Pi on the shared I/O loop, over its kept-alive connections to the Pi.
+    Arrow bodies are decoded while they stream in, see read_payload.
+
+    The counters of the most recent requests are kept in transfers.
+    """
+
+    def __init__(
+        self,
+        base_url: str = URL,
+        timeout: httpx.Timeout = TIMEOUT,
+        history: int = 100,
+    ):
+        self.client = io_loop().client(base_url, limits=LIMITS)
+        self.timeout = timeout
+        self.transfers: deque[TransferStats] = deque(maxlen=history)
+        self.total_bytes = 0
+        self.total_requests = 0
+
+    def download_archive(
+        self, timestamp: pa.DateTime | None = None, format: Format = Format.Parquet
+    ):
+        return io_loop().run(self.fetch_archive(timestamp, format))
+
+    async def fetch_archive(
+        self, timestamp: pa.DateTime | None = None, format: Format = Format.Parquet
+    ):
+        request = self.build_request(timestamp, format)
+        start = time.perf_counter()
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.TransportError:
+            raise ArchiveNotAvailableException
+        try:
+            latency = time.perf_counter() - start
+            if response.status_code != 200:
+                await response.aread()
+                raise HTTPException(response.status_code, response.text)
+            payload = await read_payload(response, format)
+        except httpx.TransportError:
+            raise ArchiveNotAvailableException
+        finally:
+            await response.aclose()
+        self.record(
+            TransferStats(
+                str(request.url),
+                response.status_code,
+                response.num_bytes_downloaded,
+                latency,
+                time.perf_counter() - start,
+            )
+        )
+        return payload
+
+    def build_request(
+        self, timestamp: pa.DateTime | None, format: Format = Format.Parquet
+    ) -> httpx.Request:
+        request_url = ARCHIVE_ENDPOINT + format.value
+        if timestamp is None:
+            return self.client.build_request("GET", request_url, timeout=self.timeout)
+        return self.client.build_request(
+            "POST",
+            request_url,
+            params={"start": str(timestamp)},
+            json=str(timestamp),
+            timeout=self.timeout,
+        )
+
+    def throughput(self, minimum_bytes: int = 64_000) -> float | None:
+        """Median bytes per second of the recent transfers large enough to be dominated by the body"""
+        rates = sorted(
+            stats.bytes / stats.duration
+            for stats in self.transfers
+            if stats.bytes >= minimum_bytes and stats.duration > 0
+        )
+        if not rates:
+            return None
+        return rates[len(rates) // 2]
+
+    def record(self, stats: TransferStats):
+        self.transfers.append(stats)
+        self.total_bytes += stats.bytes
+        self.total_requests += 1
+        logger.info(
+            f"{stats.url} Response Size={stats.bytes} Latency={stats.latency:.3f}s Duration={stats.duration:.3f}s"
+        )
+        logger.debug(f"{stats.status_code=}")
+
+
+@cache
+def default_transport() -> Transport:
+    return Transport()
 
 
 def download_archive(
     timestamp: pa.DateTime | None = None, format: Format = Format.Parquet
 ):
-    try:
-        response = send_request(timestamp, format)
-    except requests.ConnectionError:
-        raise ArchiveNotAvailableException
-
-    if response.status_code != 200:
-        raise HTTPException(response.status_code, response.json())
-
-    log_response(response)
-
-    return extract_payload(response, format)
-
-
-def send_request(timestamp: pa.DateTime | None, format: Format = Format.Parquet):
-    format_endpoint = format.value
-    query = make_query_string(start=timestamp) if timestamp is not None else ""
-    request_url = URL + ARCHIVE_ENDPOINT + format_endpoint + query
-    if timestamp is None:
-        response = requests.get(request_url)
-    else:
-        response = requests.post(request_url, json=str(timestamp))
-    return response
+    return default_transport().download_archive(timestamp, format)
 
 
-def make_query_string(**kwargs):
-    if len(kwargs) == 0:
-        return ""
-    query = "?"
-    for key, value in kwargs.items():
-        query += f"{key}={value}&"
-    return query[:-1]  # Cut off the last &
+async def read_payload(response: httpx.Response, format: Format):
+    """Reads the body of an archive response into what decode_archive takes for the format.
 
-
-def get_bytes_content(response: requests.Response) -> BytesIO:
-    buffer = BytesIO()
-    buffer.write(response.content)
-    buffer.seek(0)
-    return buffer
-
-
-def extract_payload(response: requests.Response, format):
+    Arrow IPC streams are read into a table as the chunks arrive. Parquet keeps its metadata in the
+    footer, at the end of the file, so nothing can be decoded before the whole body is in a seekable buffer.
+    """
     match format:
+        case Format.Arrow:
+            return await read_arrow_stream(response)
         case Format.Parquet:
-            return get_bytes_content(response)
+            buffer = BytesIO()
+            async for chunk in response.aiter_bytes():
+                buffer.write(chunk)
+            buffer.seek(0)
+            return buffer
         case Format.JSON:
-            return response.json()
-
-
-def log_response(response: requests.Response):
-    size = response.headers["content-length"]
-    logging.info(f"{format=} Response Size={size}")
-    logging.debug(f"{response.status_code=}")
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+            return json.loads(body)
+
+
+async def read_arrow_stream(response: httpx.Response) -> pyarrow.Table:
+    """The record batches are decoded by a worker thread while the next chunks download,
+    so only the message being decoded is held rather than the whole body."""
+    stream = ChunkStream()
+    decoded = asyncio.get_running_loop().run_in_executor(
+        None, lambda: ipc.open_stream(stream).read_all()
+    )
+    try:
+        async for chunk in response.aiter_bytes():
+            stream.feed(chunk)
+    except BaseException:
+        # The worker stops at the truncated stream
+        stream.end()
+        with suppress(Exception):
+            await decoded
+        raise
+    stream.end()
+    return await decoded
+
+
+class ChunkStream(RawIOBase):
+    """A blocking file over the chunks of a response body, fed from the I/O loop and read by pyarrow"""
+
+    def __init__(self):
+        self.chunks: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self.pending = bytearray()
+        self.ended = False
+
+    def feed(self, chunk: bytes):
+        self.chunks.put(chunk)
+
+    def end(self):
+        self.chunks.put(None)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> bytes:
+        # pyarrow takes a short read for the end of the stream, so block until size bytes are in
+        while (size is None or size < 0 or len(self.pending) < size) and not self.ended:
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.ended = True
+            else:
+                self.pending += chunk
+        if size is None or size < 0:
+            size = len(self.pending)
+        data = bytes(self.pending[:size])
+        del self.pending[:size]
+        return data
@@ -1,89 +1,362 @@
 import datetime
+import logging
+import threading
+from typing import Callable
 
+import numpy as np
 import pandas as pd
-import pandera as pa
+from datamodels.decimation import TimeBound, time_range, to_datetime64
+from datamodels.storage import MemoryUsage, RetentionPolicy
 from numpy import datetime64, floating
 from numpy.typing import NDArray
+from pandera.errors import SchemaError
 from pandera.typing import DataFrame
-from sources import DataNotReadyException
+from sources import DataNotReadyException, PollOutcome
 
-from .datatypes import Sensor, SensorData, SensorType
+from .archivecache import ArchiveCache
+from .archiveformat import FormatSelector, decode_archive
+from .datatypes import SensorData, SensorReading
 from .remotereader import (
     ArchiveNotAvailableException,
     Format,
     HTTPException,
-    download_archive,
+    Transport,
+    default_transport,
 )
+from .seriesstore import SeriesKey, SeriesStore
+from .subscription import PushSubscription, readings_to_frame
+from .validation import InvalidArchiveException, ValidationPolicy
+
+TimeSeries = tuple[NDArray[datetime64], NDArray[floating]]
+
+logger = logging.getLogger("sensordatahandler")
+
+# Bounds on the poll interval derived from the sensor cadence, and the interval before it is known
+MINIMUM_POLL_MS = 1000
+MAXIMUM_POLL_MS = 60_000
+DEFAULT_POLL_MS = 5000
+# The most days of the archive cache held in memory for a range older than the store
+MAX_PAGED_DAYS = 31
 
 
 class SensorDataFrameHandler:
-    def __init__(self):
-        self._dataframe: DataFrame | None = None
+    def __init__(
+        self,
+        cache: ArchiveCache | None = None,
+        history: datetime.timedelta = datetime.timedelta(days=7),
+        transport: Transport | None = None,
+        validation: ValidationPolicy | None = None,
+        retention: RetentionPolicy | None = None,
+    ):
+        self._store: SeriesStore | None = None
+        # The days last paged in from the archive cache for a range older than the store,
+        # and the days the plots asked for since
+        self._paged: tuple[pd.Timestamp, pd.Timestamp, SeriesStore | None] | None = None
+        self._page_request: tuple[pd.Timestamp, pd.Timestamp] | None = None
+        # Runs the loads of pages off the GUI thread, they are loaded in place without it
+        self.page_loader: Callable[[Callable[[], None]], None] | None = None
+        self._retention = retention if retention is not None else RetentionPolicy()
+        self._views: dict[SeriesKey, tuple[int, TimeSeries]] = {}
+        self._cache = cache if cache is not None else ArchiveCache()
+        self._history = history
+        self._transport = transport if transport is not None else default_transport()
+        self._format_selector = FormatSelector()
+        self._validation = validation if validation is not None else ValidationPolicy()
+        # Polls run on the data thread and pushed readings on the subscription thread
+        self._append_lock = threading.Lock()
+        self.last_poll: PollOutcome | None = None
 
     def get_data(
-        self, keys: tuple[SensorType, Sensor]
-    ) -> tuple[NDArray[datetime64], NDArray[floating]]:
-        if self._dataframe is None:
-            raise DataNotReadyException
-        data = self._dataframe.loc[
-            (*map(lambda enum: enum.value, keys), slice(None)), slice(None)
-        ]
-        data = data.reset_index().set_index("timestamp")["reading"]
-        data = data[data.notna()]
-        time_data = data.index.to_numpy()
-        temperature_data = data.to_numpy()
+        self,
+        keys: SeriesKey,
+        start: TimeBound = None,
+        end: TimeBound = None,
+    ) -> TimeSeries:
+        """Returns read-only views of the series, or of its readings between start and end.
+        The views are only rebuilt when the series version has changed. Readings older than
+        the store holds are paged in from the archive cache when start reaches back to them.
+        """
+        time_data, temperature_data = self._views_of(keys)
+        if start is None and end is None:
+            return time_data, temperature_data
+        selection = time_range(time_data, start, end)
+        time_data, temperature_data = time_data[selection], temperature_data[selection]
+        oldest = self._store.oldest if self._store is not None else None
+        if start is None or oldest is None or to_datetime64(start) >= oldest:
+            return time_data, temperature_data
+        if end is not None and to_datetime64(end) >= oldest:
+            end = None
+        paged_time, paged_value = self._paged_data(keys, start, end, oldest)
+        return (
+            np.concatenate((paged_time, time_data)),
+            np.concatenate((paged_value, temperature_data)),
+        )
+
+    def _paged_data(
+        self,
+        keys: SeriesKey,
+        start: datetime.datetime | datetime64 | pd.Timestamp,
+        end: TimeBound,
+        oldest: datetime64,
+    ) -> TimeSeries:
+        """The readings of the series from start to end, or to oldest, from the archive cache.
+        Days not paged in yet are loaded by the page loader, until then the readings already paged in are returned.
+        """
+        last_day = pd.Timestamp(
+            oldest if end is None else to_datetime64(end)
+        ).normalize()
+        first_day = max(
+            pd.Timestamp(to_datetime64(start)).normalize(),
+            last_day - pd.Timedelta(days=MAX_PAGED_DAYS - 1),
+        )
+        paged = self._paged
+        if paged is None or first_day < paged[0] or last_day > paged[1]:
+            self._page_request = (first_day, last_day)
+            if self.page_loader is None:
+                self.load_pages()
+            else:
+                self.page_loader(self.load_pages)
+            paged = self._paged
+        store = None if paged is None else paged[2]
+        if store is None or keys not in store.keys():
+            return np.array([], dtype="datetime64[ns]"), np.array([], dtype=np.float32)
+        time_data, value_data = store.series(keys).arrays()
+        selection = time_range(time_data, start, end)
+        time_data, value_data = time_data[selection], value_data[selection]
+        older = time_data < oldest
+        return time_data[older], value_data[older]
+
+    def load_pages(self):
+        """Pages in the days last asked for from the archive cache, replacing the ones held"""
+        request = self._page_request
+        if request is None:
+            return
+        paged = self._paged
+        if paged is not None and paged[0] <= request[0] and request[1] <= paged[1]:
+            return
+        frame = self._validated_cache(self._cache.load_range(*request))
+        store = None if frame is None else SeriesStore.from_frame(frame)
+        self._paged = (request[0], request[1], store)
+
+    def _views_of(self, keys: SeriesKey) -> TimeSeries:
+        series = self._series(keys)
+        version = series.version
+        try:
+            cached_version, views = self._views[keys]
+            if cached_version == version:
+                return views
+        except KeyError:
+            pass
+        time_data, temperature_data = series.arrays()
+        time_data.flags.writeable = False
+        temperature_data.flags.writeable = False
+        self._views[keys] = (version, (time_data, temperature_data))
         return time_data, temperature_data
 
+    def data_version(self, keys: SeriesKey) -> int:
+        return self._series(keys).version
+
+    def data_generation(self, keys: SeriesKey) -> int:
+        """Bumped when readings other than appended ones changed, see SeriesBuffer"""
+        return self._series(keys).generation
+
+    def _series(self, keys: SeriesKey):
+        if self._store is None:
+            raise DataNotReadyException
+        try:
+            return self._store.series(keys)
+        except KeyError:
+            raise DataNotReadyException
+
+    def _set_store(self, store: SeriesStore):
+        self._views.clear()
+        self._store = store
+
     def _load_dataframe(
-        self, timestamp: pd.Timestamp | None = None
+        self, timestamp: pd.Timestamp | None = None, initial: bool = False
     ) -> DataFrame | None:
-        def get_format(timestamp: pd.Timestamp | None) -> Format:
-            if timestamp is None:
-                return Format.Parquet
-            timedelta = datetime.datetime.now() - timestamp
-            if timedelta > pd.Timedelta(minutes=20):
-                return Format.Parquet
-            return Format.JSON
-
+        format = self.get_format(timestamp)
         try:
-            format = get_format(timestamp)
-            dataframe = self._read_archive(timestamp, format)
-        except (HTTPException, ArchiveNotAvailableException):
-            dataframe = None
-        return dataframe
+            return self._read_archive(timestamp, format, initial)
+        except HTTPException as e:
+            if e.status_code not in (404, 405, 415) or format == Format.Parquet:
+                return None
+        except (ArchiveNotAvailableException, InvalidArchiveException, SchemaError):
+            return None
+        # Older servers don't serve every format, fall back to the next cheapest one.
+        # The format is tried again later, the error may have been a passing one.
+        self._format_selector.mark_unsupported(format)
+        return self._load_dataframe(timestamp, initial)
+
+    def get_format(self, timestamp: pd.Timestamp | None) -> Format:
+        """Picks the format with the lowest estimated cost for the number of rows expected since timestamp"""
+        throughput = self._transport.throughput()
+        if throughput is not None:
+            self._format_selector.bytes_per_second = throughput
+        if timestamp is None or self._store is None:
+            return self._format_selector.choose(None)
+        row_rate = self._store.row_rate()
+        if row_rate is None:
+            return self._format_selector.choose(None)
+        seconds = (datetime.datetime.now() - timestamp).total_seconds()
+        return self._format_selector.choose(max(seconds, 0) * row_rate)
+
+    @property
+    def transport(self) -> Transport:
+        return self._transport
 
     @property
     def dataframe(self):
-        if self._dataframe is None:
+        if self._store is None:
             raise DataNotReadyException
-        return self._dataframe
+        return self._store.to_dataframe()
+
+    def history_start(self) -> pd.Timestamp:
+        return pd.Timestamp(datetime.datetime.now() - self._history)
 
     def initial_load(self):
-        time = pd.Timestamp(datetime.datetime.now() - datetime.timedelta(days=7))
-        self._dataframe = self._load_dataframe(time)
+        """Loads the local archive cache if there is one, so the plots can be drawn straight away.
+        The readings after the cached high-water mark are fetched by the first update_data.
+        Without a cache the history window is downloaded from the Pi."""
+        cached = self._validated_cache(self._cache.load(self.history_start()))
+        if cached is not None and len(cached) > 0:
+            self._set_store(SeriesStore.from_frame(cached))
+            return
+        self._download_history()
 
     def update_data(self):
-        if self._dataframe is None:
-            self._dataframe = self._load_dataframe()
+        """Appends the readings newer than the store's high-water mark. Only the delta is touched, not the full history.
+        The outcome is kept in last_poll."""
+        if self._store is None or self._store.high_water_mark is None:
+            self._download_history()
+            self.last_poll = (
+                PollOutcome.Failed if self._store is None else PollOutcome.NewData
+            )
+            return
+        new_df = self._load_dataframe(self._store.high_water_mark)
+        if new_df is None:
+            self.last_poll = PollOutcome.Failed
+        elif len(new_df) > 0 and self._append(new_df):
+            self.last_poll = PollOutcome.NewData
+        else:
+            self.last_poll = PollOutcome.NoNewData
+
+    def poll_outcome(self) -> PollOutcome | None:
+        """How the last poll went, for the poll scheduler to back off on"""
+        return self.last_poll
+
+    def poll_interval_ms(self) -> int:
+        """The cadence of the sensors, so a poll finds about one new reading per series"""
+        cadence = None if self._store is None else self._store.cadence()
+        if cadence is None:
+            return DEFAULT_POLL_MS
+        return int(min(max(cadence * 1000, MINIMUM_POLL_MS), MAXIMUM_POLL_MS))
+
+    def memory_usage(self) -> dict[str, MemoryUsage]:
+        usage = {} if self._store is None else self._store.memory_usage()
+        paged = None if self._paged is None else self._paged[2]
+        if paged is not None:
+            usage.update(
+                {
+                    f"{name} paged": memory
+                    for name, memory in paged.memory_usage().items()
+                }
+            )
+        return usage
+
+    def _append(self, new_df: pd.DataFrame) -> set[SeriesKey]:
+        assert self._store is not None
+        with self._append_lock:
+            changed = self._store.append_frame(new_df)
+            if changed:
+                self._cache.mark_dirty(new_df.index.get_level_values("timestamp").min())
+                self._cache.flush(self._store)
+                self._retain()
+        return changed
+
+    def _retain(self):
+        """Moves the readings past the retention window out of memory, they stay in the archive cache"""
+        assert self._store is not None
+        high_water_mark = self._store.high_water_mark
+        cutoff = self._retention.cutoff(
+            self._store.oldest,
+            None if high_water_mark is None else high_water_mark.to_datetime64(),
+        )
+        if cutoff is None:
+            return
+        # Whatever leaves memory has to be on disk
+        self._cache.flush(self._store, force=True)
+        self._store.trim_before(cutoff)
+
+    def close(self):
+        """Writes what the throttled flushes haven't yet written to the archive cache"""
+        if self._store is None:
             return
-        latest_available_timestamp = self._dataframe.sort_index().index[-1][-1]
-        new_df = self._load_dataframe(latest_available_timestamp)
-        self._dataframe = pd.concat((self._dataframe, new_df)).sort_index()
+        with self._append_lock:
+            self._cache.flush(self._store, force=True)
+
+    def append_readings(self, readings: list[SensorReading]) -> bool:
+        """Appends readings pushed by the Pi, checked like a delta by the validation policy.
+        Returns whether any series changed."""
+        if self._store is None or not readings:
+            return False
+        try:
+            df = self._validation.validate(readings_to_frame(readings), initial=False)
+        except (InvalidArchiveException, SchemaError) as e:
+            logger.warning(f"Discarding {len(readings)} pushed readings: {e}")
+            return False
+        return bool(self._append(df))
+
+    def _validated_cache(self, df: pd.DataFrame | None) -> pd.DataFrame | None:
+        """The cache is written from validated readings, so it gets the delta checks rather than the
+        full schema. They catch a damaged or foreign file without slowing every start down.
+        """
+        if df is None:
+            return None
+        try:
+            return self._validation.validate(df, initial=False)
+        except (InvalidArchiveException, SchemaError) as e:
+            logger.warning(f"Ignoring the archive cache: {e}")
+            return None
+
+    def subscribe(
+        self, on_received: Callable[[], None], on_closed: Callable[[bool], None]
+    ) -> PushSubscription:
+        """Opens a push subscription starting at the high-water mark. on_received is called from the subscription thread."""
+
+        def receive(readings: list[SensorReading]):
+            if self.append_readings(readings):
+                on_received()
+
+        def since():
+            return None if self._store is None else self._store.high_water_mark
+
+        subscription = PushSubscription(self._transport, since, receive, on_closed)
+        subscription.start()
+        return subscription
+
+    def _download_history(self):
+        dataframe = self._load_dataframe(self.history_start(), initial=True)
+        if dataframe is None or len(dataframe) == 0:
+            return
+        self._set_store(SeriesStore.from_frame(dataframe))
+        self._cache.mark_dirty(dataframe.index.get_level_values("timestamp").min())
+        self._cache.flush(self._store, force=True)
 
-    @pa.check_types
     def _read_archive(
-        self, timestamp: pd.Timestamp | None = None, format: Format = Format.Parquet
+        self,
+        timestamp: pd.Timestamp | None = None,
+        format: Format = Format.Parquet,
+        initial: bool = False,
     ) -> DataFrame[SensorData]:
-        """The data is stored in a pandas dataframe. Parquet is used to serialize the dataframe for initial transfer. Parquet is suitable for large dataframes, but the incremental updates are small.
-        Parquet has too much overhead for small incremental updates. JSON serialization is used instead. Pandas allows several ways to serialize with json. Using orient=table lets us preserve the index correctly.
+        """The data is stored in a pandas dataframe. Parquet is suitable for large dataframes, but has too much overhead for the small incremental updates.
+        Arrow IPC and JSON are cheaper for those. The format is chosen by get_format from the cost model fitted by benchmarks/formats.py.
+        The first load is validated against the full SensorData schema, deltas by the cheaper checks of the validation policy.
         """
-        raw_archive = download_archive(timestamp, format)
-        match format:
-            case Format.Parquet:
-                df = pd.read_parquet(raw_archive)
-                df = SensorData.repair_dataframe(df).sort_index()
-                return df
-            case Format.JSON:
-                return pd.read_json(raw_archive, orient="table").sort_index()
-            case _:
-                raise TypeError("Format not supported")
+        raw_archive = self._transport.download_archive(timestamp, format)
+        df = decode_archive(raw_archive, format)
+        return self._validation.validate(df, initial)
+
+    @property
+    def validation(self) -> ValidationPolicy:
+        return self._validation
@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+from datamodels.storage import (
+    TIME_DTYPE,
+    VALUE_DTYPE,
+    MemoryUsage,
+    as_datetime,
+    quantization_step,
+    to_epoch_ns,
+)
+from numpy import datetime64, floating
+from numpy.typing import NDArray
+
+from .datatypes import Sensor, SensorData, SensorType
+
+SeriesKey = tuple[SensorType, Sensor]
+
+
+class SeriesBuffer:
+    """Growable, time-sorted arrays holding the readings of a single sensor series.
+
+    The arrays are over-allocated and doubled when full, so appending a small delta
+    costs about as much as the delta itself. Only the first len(self) elements are valid.
+    Elements below len(self) are never written again. Appends go past the end and merges
+    reallocate, so slices handed out by arrays() stay valid. The arrays and the length are
+    published together as one tuple, so a reader on another thread sees them from the same change.
+    The version is bumped on every change, the generation only when rows other than appended ones
+    changed, by a merge or a trim.
+    Times are held as nanoseconds since the epoch and values in single precision, step is the
+    quantization of the readings so far, see quantization_step.
+    """
+
+    _INITIAL_CAPACITY = 1024
+
+    def __init__(self, unit: str):
+        self.unit = unit
+        self._state: tuple[NDArray[np.int64], NDArray[floating], int] = (
+            np.empty(self._INITIAL_CAPACITY, dtype=TIME_DTYPE),
+            np.empty(self._INITIAL_CAPACITY, dtype=VALUE_DTYPE),
+            0,
+        )
+        self.version = 0
+        self.generation = 0
+        self.step: float | None = None
+
+    def __len__(self) -> int:
+        return self._state[2]
+
+    @property
+    def latest(self) -> datetime64 | None:
+        time, _, length = self._state
+        if length == 0:
+            return None
+        return time[length - 1].astype("datetime64[ns]")
+
+    @property
+    def oldest(self) -> datetime64 | None:
+        time, _, length = self._state
+        if length == 0:
+            return None
+        return time[0].astype("datetime64[ns]")
+
+    def arrays(self) -> tuple[NDArray[datetime64], NDArray[floating]]:
+        # Read the state once, the worker thread may append or trim while we slice.
+        time, value, length = self._state
+        return as_datetime(time[:length]), value[:length]
+
+    def memory(self) -> MemoryUsage:
+        time, value, length = self._state
+        row_size = time.itemsize + value.itemsize
+        return MemoryUsage(length, length * row_size, time.nbytes + value.nbytes)
+
+    def append(self, time: NDArray[datetime64], value: NDArray[floating]):
+        valid = ~np.isnan(value)
+        time, value = time[valid], value[valid]
+        if len(time) == 0:
+            return
+        if np.any(time[1:] < time[:-1]):
+            order = np.argsort(time, kind="stable")
+            time, value = time[order], value[order]
+        latest = self.latest
+        if latest is not None:
+            # The archive query is inclusive, so the newest reading we already hold comes back again.
+            duplicates = np.searchsorted(time, latest, side="right")
+            if duplicates > 0 and time[duplicates - 1] == latest:
+                time, value = time[duplicates:], value[duplicates:]
+            if len(time) == 0:
+                return
+            if time[0] < latest:
+                self._merge(time, value)
+                return
+        length = len(self)
+        end = length + len(time)
+        held_time, held_value = self._reserve(end)
+        held_time[length:end] = to_epoch_ns(time)
+        held_value[length:end] = value
+        self.step = quantization_step(value, self.step)
+        self._state = (held_time, held_value, end)
+        self.version += 1
+
+    def _merge(self, time: NDArray[datetime64], value: NDArray[floating]):
+        """Slow path for readings arriving out of order. Rebuilds the buffer sorted and without duplicate timestamps."""
+        old_time, old_value = self.arrays()
+        merged_time = np.concatenate((old_time, time))
+        merged_value = np.concatenate((old_value, value))
+        order = np.argsort(merged_time, kind="stable")
+        merged_time, merged_value = merged_time[order], merged_value[order]
+        unique = np.concatenate(([True], merged_time[1:] != merged_time[:-1]))
+        merged_time, merged_value = merged_time[unique], merged_value[unique]
+        self.step = quantization_step(value, self.step)
+        self._replace(merged_time, merged_value)
+
+    def trim_before(self, cutoff: datetime64) -> bool:
+        """Drops the readings older than cutoff. The rest is copied to new arrays, like a merge."""
+        time, value = self.arrays()
+        first = int(np.searchsorted(time, cutoff))
+        if first == 0:
+            return False
+        self._replace(time[first:], value[first:])
+        return True
+
+    def _replace(self, time: NDArray[datetime64], value: NDArray[floating]):
+        """Holds time and value in new arrays instead, as a change to rows other than appended ones"""
+        length = len(time)
+        capacity = max(self._INITIAL_CAPACITY, 2 * length)
+        new_time = np.empty(capacity, dtype=TIME_DTYPE)
+        new_value = np.empty(capacity, dtype=VALUE_DTYPE)
+        new_time[:length] = to_epoch_ns(time)
+        new_value[:length] = value
+        self._state = (new_time, new_value, length)
+        self.version += 1
+        self.generation += 1
+
+    def _reserve(self, size: int) -> tuple[NDArray[np.int64], NDArray[floating]]:
+        """Arrays that hold the current readings with room for size. They are only published
+        with the length that covers what was written to them."""
+        time, value, length = self._state
+        capacity = len(time)
+        if size <= capacity:
+            return time, value
+        while capacity < size:
+            capacity *= 2
+        new_time = np.empty(capacity, dtype=TIME_DTYPE)
+        new_value = np.empty(capacity, dtype=VALUE_DTYPE)
+        new_time[:length] = time[:length]
+        new_value[:length] = value[:length]
+        return new_time, new_value
+
+
+class SeriesStore:
+    """Append-only store of sensor readings, one SeriesBuffer per (SensorType, Sensor)."""
+
+    def __init__(self):
+        self._series: dict[SeriesKey, SeriesBuffer] = {}
+        self._high_water_mark: pd.Timestamp | None = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SeriesStore":
+        store = cls()
+        store.append_frame(df)
+        return store
+
+    @property
+    def high_water_mark(self) -> pd.Timestamp | None:
+        """The newest timestamp held in any series"""
+        return self._high_water_mark
+
+    @property
+    def oldest(self) -> datetime64 | None:
+        """The oldest timestamp held in any series"""
+        return min(
+            (
+                oldest
+                for buffer in self._series.values()
+                if (oldest := buffer.oldest) is not None
+            ),
+            default=None,
+        )
+
+    def trim_before(self, cutoff: datetime64) -> set[SeriesKey]:
+        """Drops the readings older than cutoff from every series. Returns the keys of the series that changed."""
+        return {
+            key for key, buffer in self._series.items() if buffer.trim_before(cutoff)
+        }
+
+    def row_rate(self) -> float | None:
+        """Rows per second arriving over all series, estimated from the history held"""
+        rows = sum(len(buffer) for buffer in self._series.values())
+        earliest = min(
+            (buffer.arrays()[0][0] for buffer in self._series.values() if len(buffer)),
+            default=None,
+        )
+        if earliest is None or self._high_water_mark is None:
+            return None
+        span = (self._high_water_mark - pd.Timestamp(earliest)).total_seconds()
+        if span <= 0:
+            return None
+        return rows / span
+
+    def cadence(self, recent: int = 64) -> float | None:
+        """Seconds between readings of the most frequent series, the median spacing of its recent timestamps"""
+        spacings = []
+        for buffer in self._series.values():
+            time = buffer.arrays()[0][-recent:]
+            if len(time) > 1:
+                spacings.append(np.median(np.diff(time)) / np.timedelta64(1, "s"))
+        return min(spacings, default=None)
+
+    def memory_usage(self) -> dict[str, MemoryUsage]:
+        return {
+            f"{sensor.value} {sensor_type.value}": buffer.memory()
+            for (sensor_type, sensor), buffer in self._series.items()
+        }
+
+    def keys(self) -> set[SeriesKey]:
+        return set(self._series.keys())
+
+    def series(self, key: SeriesKey) -> SeriesBuffer:
+        return self._series[key]
+
+    def append_frame(self, df: pd.DataFrame) -> set[SeriesKey]:
+        """Appends a SensorData frame to the store. Returns the keys of the series that changed."""
+        changed: set[SeriesKey] = set()
+        if len(df) == 0:
+            return changed
+        grouping = df.groupby(["sensor_type", "sensor"], observed=True, sort=False)
+        for (sensor_type, sensor), group in grouping:
+            key = (SensorType(sensor_type), Sensor(sensor))
+            time = group.index.get_level_values("timestamp").to_numpy(
+                dtype="datetime64[ns]"
+            )
+            value = group["reading"].to_numpy(dtype=np.float64)
+            buffer = self._series.setdefault(key, SeriesBuffer(group["unit"].iloc[0]))
+            version_before = buffer.version
+            buffer.append(time, value)
+            if buffer.version != version_before:
+                changed.add(key)
+                self._update_high_water_mark(buffer)
+        return changed
+
+    def _update_high_water_mark(self, buffer: SeriesBuffer):
+        if buffer.latest is None:
+            return
+        latest = pd.Timestamp(buffer.latest)
+        if self._high_water_mark is None or latest > self._high_water_mark:
+            self._high_water_mark = latest
+
+    def to_dataframe(
+        self, start: pd.Timestamp | None = None, end: pd.Timestamp | None = None
+    ) -> pd.DataFrame:
+        """Rebuilds the MultiIndex SensorData frame from the stored series, optionally limited to [start, end)"""
+        frames = []
+        for (sensor_type, sensor), buffer in self._series.items():
+            time, value = buffer.arrays()
+            first = (
+                0
+                if start is None
+                else int(np.searchsorted(time, start.to_datetime64()))
+            )
+            last = (
+                len(time)
+                if end is None
+                else int(np.searchsorted(time, end.to_datetime64()))
+            )
+            time, value = time[first:last], value[first:last]
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "sensor_type": sensor_type.value,
+                        "sensor": sensor.value,
+                        "timestamp": time,
+                        "reading": value,
+                        "unit": buffer.unit,
+                    }
+                )
+            )
+        if not frames:
+            frames.append(
+                pd.DataFrame(
+                    columns=["sensor_type", "sensor", "timestamp", "reading", "unit"]
+                )
+            )
+        df = pd.concat(frames, ignore_index=True)
+        df["reading"] = df["reading"].astype(np.float64)
+        return SensorData.repair_dataframe(df).sort_index()
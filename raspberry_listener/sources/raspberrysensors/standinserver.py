@@ -0,0 +1,178 @@
+"""A local stand-in for the archive server running on the Pi, for development and tests.
+
+It serves synthetic readings for every sensor on the same endpoints as the Pi, plus the
+/stream/ server-sent event endpoint used by PushSubscription. Run it from raspberry_listener/ with
+`python -m sources.raspberrysensors.standinserver` and point remotereader.URL at http://localhost:8000.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from .archiveformat import encode_archive
+from .datatypes import SensorData
+from .remotereader import ARCHIVE_ENDPOINT, Format
+from .subscription import STREAM_ENDPOINT
+
+SERIES = (
+    ("temperature", "DHT11", "C"),
+    ("temperature", "DS18B20", "C"),
+    ("temperature", "PI_CPU", "C"),
+    ("humidity", "DHT11", "%"),
+)
+
+
+class StandInPi:
+    """Generates a reading for every sensor each cadence seconds, starting history before it was created.
+
+    The readings are a function of the time alone, so every request sees the same data.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        cadence: float = 1.0,
+        history: pd.Timedelta = pd.Timedelta(hours=1),
+        push: bool = True,
+    ):
+        self.cadence = pd.Timedelta(seconds=cadence)
+        self.origin = pd.Timestamp.now().floor("s") - history
+        self.push = push
+        self.stopped = threading.Event()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> "StandInPi":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def ticks_between(
+        self, start: pd.Timestamp | None, end: pd.Timestamp
+    ) -> pd.DatetimeIndex:
+        first = 0
+        if start is not None:
+            first = max(0, int(np.ceil((start - self.origin) / self.cadence)))
+        last = int((end - self.origin) // self.cadence)
+        return self.origin + pd.TimedeltaIndex(
+            np.arange(first, last + 1) * self.cadence
+        )
+
+    def frame_between(
+        self, start: pd.Timestamp | None, end: pd.Timestamp
+    ) -> pd.DataFrame:
+        timestamps = self.ticks_between(start, end)
+        seconds = (timestamps - self.origin).total_seconds().to_numpy()
+        frames = []
+        for i, (sensor_type, sensor, unit) in enumerate(SERIES):
+            reading = np.round(22 + 3 * np.sin(seconds / 600 + i), 1)
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "sensor_type": sensor_type,
+                        "sensor": sensor,
+                        "timestamp": timestamps,
+                        "reading": reading,
+                        "unit": unit,
+                    }
+                )
+            )
+        df = pd.concat(frames, ignore_index=True)
+        return SensorData.repair_dataframe(df).sort_index()
+
+    def _make_handler(self):
+        pi = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.route()
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                self.rfile.read(length)
+                self.route()
+
+            def route(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                start = pd.Timestamp(query["start"][0]) if "start" in query else None
+                if url.path == STREAM_ENDPOINT and pi.push:
+                    self.stream(start)
+                    return
+                for format in Format:
+                    if url.path == ARCHIVE_ENDPOINT + format.value:
+                        self.archive(start, format)
+                        return
+                self.send_body(404, b'{"detail":"Not Found"}')
+
+            def archive(self, start: pd.Timestamp | None, format: Format):
+                df = pi.frame_between(start, pd.Timestamp.now())
+                self.send_body(200, encode_archive(df, format))
+
+            def stream(self, start: pd.Timestamp | None):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.end_headers()
+                since = pd.Timestamp.now() if start is None else start
+                try:
+                    while not pi.stopped.is_set():
+                        now = pd.Timestamp.now()
+                        df = pi.frame_between(since, now).reset_index()
+                        for row in df.itertuples(index=False):
+                            event = {
+                                "sensor_type": row.sensor_type,
+                                "sensor": row.sensor,
+                                "timestamp": row.timestamp.isoformat(),
+                                "reading": row.reading,
+                                "unit": row.unit,
+                            }
+                            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                        self.wfile.write(b": keep-alive\n\n")
+                        self.wfile.flush()
+                        since = now + pd.Timedelta(microseconds=1)
+                        time.sleep(pi.cadence.total_seconds())
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def send_body(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cadence", type=float, default=1.0)
+    parser.add_argument("--no-push", action="store_true")
+    args = parser.parse_args()
+    pi = StandInPi(args.port, args.cadence, push=not args.no_push).start()
+    print(f"Serving synthetic sensor readings on {pi.url}")
+    try:
+        pi._thread.join()
+    except KeyboardInterrupt:
+        pi.stop()
+
+
+if __name__ == "__main__":
+    main()
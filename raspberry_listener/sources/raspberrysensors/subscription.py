@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+import httpx
+import pandas as pd
+from pydantic import ValidationError
+
+from ..ioloop import io_loop
+from .datatypes import SensorData, SensorReading
+from .remotereader import Transport
+
+STREAM_ENDPOINT = "/stream/"
+# The server sends a keep-alive comment every few seconds, silence for longer means the link is gone.
+STREAM_TIMEOUT = httpx.Timeout(3.0, read=30.0)
+
+logger = logging.getLogger("subscription")
+
+
+class PushSubscription:
+    """Receives new SensorReadings from the Pi as server-sent events, as a task on the shared I/O loop.
+
+    The stream is opened with the high-water mark as start, so nothing is missed between the last poll
+    and the subscription. Readings are handed to on_readings in batches of at most batch_interval seconds,
+    on a worker thread so the loop is never blocked by the store.
+    on_closed is called once when the stream ends, with available=False if the server has no stream endpoint.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        since: Callable[[], pd.Timestamp | None],
+        on_readings: Callable[[list[SensorReading]], None],
+        on_closed: Callable[[bool], None],
+        batch_interval: float = 0.5,
+    ):
+        self.transport = transport
+        self.since = since
+        self.on_readings = on_readings
+        self.on_closed = on_closed
+        self.batch_interval = batch_interval
+        self._stopped = threading.Event()
+        self._future: Future[None] | None = None
+
+    def start(self):
+        self._future = io_loop().submit(self.run())
+
+    def stop(self):
+        self._stopped.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    @property
+    def running(self) -> bool:
+        return (
+            self._future is not None
+            and not self._future.done()
+            and not self._stopped.is_set()
+        )
+
+    async def run(self):
+        available = True
+        try:
+            available = await self.listen()
+        except (httpx.TransportError, httpx.StreamError) as e:
+            logger.info(f"Push subscription closed: {e!r}")
+        except asyncio.CancelledError:
+            logger.info("Push subscription stopped")
+        finally:
+            self.on_closed(available)
+
+    async def listen(self) -> bool:
+        since = self.since()
+        params = {} if since is None else {"start": str(since)}
+        async with self.transport.client.stream(
+            "GET", STREAM_ENDPOINT, params=params, timeout=STREAM_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                logger.info(f"Push subscription not available: {response.status_code=}")
+                return response.status_code not in (404, 405)
+            batch: list[SensorReading] = []
+            last_flush = time.monotonic()
+            async for line in response.aiter_lines():
+                if self._stopped.is_set():
+                    break
+                if line.startswith("data:"):
+                    reading = parse_event(line[len("data:") :])
+                    if reading is not None:
+                        batch.append(reading)
+                # Comments and blank lines arrive as keep-alives, they flush the batch as well.
+                if batch and time.monotonic() - last_flush >= self.batch_interval:
+                    await asyncio.to_thread(self.on_readings, batch)
+                    batch = []
+                    last_flush = time.monotonic()
+            if batch:
+                await asyncio.to_thread(self.on_readings, batch)
+        return True
+
+
+def parse_event(data: str) -> SensorReading | None:
+    try:
+        return SensorReading(**json.loads(data))
+    except (ValueError, TypeError, ValidationError):
+        logger.warning(f"Discarding malformed event {data!r}")
+        return None
+
+
+def readings_to_frame(readings: list[SensorReading]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records([reading.dict() for reading in readings])
+    return SensorData.repair_dataframe(df).sort_index()
@@ -0,0 +1,116 @@
+import logging
+import time
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import cast
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_float_dtype
+
+from .datatypes import MemberStrEnum, Sensor, SensorData, SensorType, Unit
+
+logger = logging.getLogger("validation")
+
+
+class InvalidArchiveException(Exception):
+    ...
+
+
+class ValidationMode(Enum):
+    Full = auto()  # The complete pandera SensorData schema
+    Fast = auto()  # Vectorized dtype and category checks, linear in the rows received
+    Sampled = auto()  # Fast checks, plus the full schema on a random sample of rows
+
+
+@dataclass
+class ValidationTiming:
+    calls: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+
+class ValidationPolicy:
+    """Decides how thoroughly an archive is validated before it enters the store.
+
+    The first load is validated in full. Deltas only get the fast checks by default, so validation
+    cost follows the handful of rows that arrived rather than the history. Time spent is kept per mode in timings.
+    Neither the schema nor the fast checks reject duplicated or unsorted rows, validate returns the
+    frame sorted with the last of each duplicated row.
+    """
+
+    def __init__(
+        self,
+        initial: ValidationMode = ValidationMode.Full,
+        delta: ValidationMode = ValidationMode.Fast,
+        sample_size: int = 100,
+    ):
+        self.initial = initial
+        self.delta = delta
+        self.sample_size = sample_size
+        self.timings: dict[ValidationMode, ValidationTiming] = {
+            mode: ValidationTiming() for mode in ValidationMode
+        }
+
+    def validate(self, df: pd.DataFrame, initial: bool) -> pd.DataFrame:
+        mode = self.initial if initial else self.delta
+        start = time.perf_counter()
+        match mode:
+            case ValidationMode.Full:
+                df = cast(pd.DataFrame, SensorData.validate(df))
+            case ValidationMode.Fast:
+                fast_check(df)
+            case ValidationMode.Sampled:
+                fast_check(df)
+                if len(df) > self.sample_size:
+                    SensorData.validate(df.sample(self.sample_size))
+                else:
+                    SensorData.validate(df)
+        df = sorted_unique(df)
+        seconds = time.perf_counter() - start
+        timing = self.timings[mode]
+        timing.calls += 1
+        timing.rows += len(df)
+        timing.seconds += seconds
+        logger.debug(f"{mode.name} validation of {len(df)} rows took {seconds:.4f}s")
+        return df
+
+
+def fast_check(df: pd.DataFrame):
+    """Checks the structure and dtypes of a SensorData frame, that every categorical value is a known member
+    and that there are no NaN readings, like the schema. Raises InvalidArchiveException on the first problem found.
+    """
+    if list(df.index.names) != ["sensor_type", "sensor", "timestamp"]:
+        raise InvalidArchiveException(f"Unexpected index {df.index.names}")
+    if "reading" not in df.columns or "unit" not in df.columns:
+        raise InvalidArchiveException(f"Unexpected columns {list(df.columns)}")
+    if not is_datetime64_any_dtype(df.index.get_level_values("timestamp").dtype):
+        raise InvalidArchiveException("timestamp is not a datetime")
+    if not is_float_dtype(df["reading"].dtype):
+        raise InvalidArchiveException("reading is not a float")
+    check_categorical(df.index.get_level_values("sensor_type"), SensorType)
+    check_categorical(df.index.get_level_values("sensor"), Sensor)
+    check_categorical(df["unit"], Unit)
+    if df["reading"].isna().any():
+        raise InvalidArchiveException("reading has NaN values")
+
+
+def sorted_unique(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame sorted by sensor type, sensor and timestamp, keeping the last of duplicated rows.
+    Decoded archives already are, then the frame is returned as is."""
+    if not df.index.is_unique:
+        df = df[~df.index.duplicated(keep="last")]
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    return df
+
+
+def check_categorical(values: pd.Index | pd.Series, members: type[MemberStrEnum]):
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        raise InvalidArchiveException(f"{values.name} is not categorical")
+    unknown = set(values.dtype.categories) - set(members.values())
+    if unknown:
+        raise InvalidArchiveException(f"{values.name} has unknown values {unknown}")
+    codes = cast(pd.Categorical, values.array).codes
+    if np.any(codes < 0):
+        raise InvalidArchiveException(f"{values.name} has missing values")
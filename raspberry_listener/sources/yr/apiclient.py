@@ -1,16 +1,25 @@
+import hashlib
+import json
 import logging
 import tomllib
 from collections import namedtuple
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from enum import Enum
 from pathlib import Path
 
 import httpx
-from attrs import define
+from attrs import define, field
 from fastapi import HTTPException
 
+from ..ioloop import io_loop
+
 FORECAST_URL = "https://api.met.no/weatherapi/locationforecast/2.0/"
 HISTORIC_URL = "https://frost.met.no/observations/v0.jsonld"
+# Relative to the repository, a relative path would start an empty cache per working directory
+HTTP_CACHE_DIRECTORY = Path(__file__).resolve().parents[3] / "cache" / "http"
+# How long a revalidated response is fresh when the 304 doesn't say
+DEFAULT_TTL = timedelta(minutes=30)
 Location = namedtuple("Location", ["lat", "lon", "altitude"])
 
 
@@ -72,23 +81,123 @@ class APIClient:
         return response.json()
 
 
+@define
+class CachedResponse:
+    body: dict
+    last_modified: str | None
+    expires: str | None
+    modified: bool = True  # False when the body came from the cache
+
+    def expiry(self) -> datetime | None:
+        if self.expires is None:
+            return None
+        try:
+            return parsedate_to_datetime(self.expires)
+        except (TypeError, ValueError):
+            return None
+
+    def fresh(self) -> bool:
+        expiry = self.expiry()
+        return expiry is not None and datetime.now(timezone.utc) < expiry
+
+
+@define
+class HTTPCache:
+    """Persists JSON responses with their Expires and Last-Modified headers, one file per request"""
+
+    directory: Path = HTTP_CACHE_DIRECTORY
+
+    def path(self, url: str, params: dict) -> Path:
+        key = json.dumps([url, sorted(params.items())])
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def load(self, url: str, params: dict) -> CachedResponse | None:
+        path = self.path(url, params)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+            return CachedResponse(
+                entry["body"], entry["last_modified"], entry["expires"], modified=False
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            logging.warning(f"Discarding unreadable cache file {path}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def store(self, url: str, params: dict, response: CachedResponse):
+        path = self.path(url, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_suffix(".tmp")
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "url": url,
+                    "body": response.body,
+                    "last_modified": response.last_modified,
+                    "expires": response.expires,
+                },
+                file,
+            )
+        temporary_path.replace(path)
+
+
 @define
 class AsyncAPIClient:
-    async_client: httpx.AsyncClient = httpx.AsyncClient()
+    """Requests run on the shared I/O loop, with its per-host clients unless async_client is given"""
+
+    async_client: httpx.AsyncClient | None = None
+    http_cache: HTTPCache = field(factory=HTTPCache)
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        if self.async_client is not None:
+            return self.async_client
+        return io_loop().client(url)
 
     async def download_forecast_from_location(
         self, location: Location, variant: Variant
     ) -> dict:
-        response = await self.async_client.get(
-            FORECAST_URL + variant.value, params=location._asdict()
-        )
+        response = await self.forecast_from_location(location, variant)
+        return response.body
+
+    async def forecast_from_location(
+        self, location: Location, variant: Variant
+    ) -> CachedResponse:
+        """The forecast for location, from the cache until it expires.
+        After that the request is conditional on Last-Modified, and a 304 renews the cached copy.
+        """
+        url = FORECAST_URL + variant.value
+        params = location._asdict()
+        cached = self.http_cache.load(url, params)
+        if cached is not None and cached.fresh():
+            return cached
+
+        headers = {}
+        if cached is not None and cached.last_modified is not None:
+            headers["if-modified-since"] = cached.last_modified
+        response = await self.client_for(url).get(url, params=params, headers=headers)
+
+        if cached is not None and response.status_code == 304:
+            logging.debug(f"{url} not modified since {cached.last_modified}")
+            cached.expires = response.headers.get("expires") or format_datetime(
+                datetime.now(timezone.utc) + DEFAULT_TTL, usegmt=True
+            )
+            self.http_cache.store(url, params, cached)
+            return cached
 
         if response.status_code != 200:
             raise HTTPException(response.status_code, response)
 
         log_response(response)
 
-        return response.json()
+        result = CachedResponse(
+            response.json(),
+            response.headers.get("last-modified"),
+            response.headers.get("expires"),
+        )
+        self.http_cache.store(url, params, result)
+        return result
 
     async def download_historic_from_station_between_interval(
         self, station: str, early: datetime, late: datetime
@@ -99,7 +208,7 @@ class AsyncAPIClient:
             "referencetime": interval_str,
             "elements": "air_temperature,relative_humidity",
         }
-        response = await self.async_client.get(
+        response = await self.client_for(HISTORIC_URL).get(
             HISTORIC_URL,
             params=query_parameters,
             auth=(client_id(), ""),
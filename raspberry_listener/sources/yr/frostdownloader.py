@@ -0,0 +1,160 @@
+import asyncio
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from attrs import define, field, frozen
+from fastapi import HTTPException
+
+from .apiclient import AsyncAPIClient
+
+# Anchored to the repository like the archive cache, so it is reused whatever the working directory
+CACHE_DIRECTORY = Path(__file__).resolve().parents[3] / "cache" / "frost"
+
+logger = logging.getLogger("frostdownloader")
+
+ProgressFn = Callable[[str, int, int], None]
+
+
+@frozen
+class Window:
+    start: datetime
+    end: datetime
+
+    def closed(self, now: datetime, settle: timedelta) -> bool:
+        """A window is closed when no more observations are expected in it. Closed windows are cached."""
+        return self.end <= now - settle
+
+
+def add_months(time: datetime, months: int) -> datetime:
+    month = time.month - 1 + months
+    return time.replace(year=time.year + month // 12, month=month % 12 + 1)
+
+
+def split_interval(early: datetime, late: datetime, months: int = 1) -> list[Window]:
+    """Splits [early, late) into windows aligned to the first of every months'th month.
+    Aligned windows are stable between runs, so they can be cached."""
+    windows = []
+    start = early
+    boundary = early.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while start < late:
+        boundary = add_months(boundary, months)
+        end = min(boundary, late)
+        windows.append(Window(start, end))
+        start = end
+    return windows
+
+
+@define
+class FrostWindowCache:
+    """Raw Frost observations per station and window, stored as gzipped JSON"""
+
+    directory: Path = CACHE_DIRECTORY
+
+    def path(self, station: str, window: Window) -> Path:
+        return (
+            self.directory
+            / station
+            / f"{window.start:%Y%m%dT%H%M%S}_{window.end:%Y%m%dT%H%M%S}.json.gz"
+        )
+
+    def load(self, station: str, window: Window) -> list[dict] | None:
+        path = self.path(station, window)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning(f"Discarding unreadable cache file {path}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def store(self, station: str, window: Window, data: list[dict]):
+        path = self.path(station, window)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_suffix(".tmp")
+        with gzip.open(temporary_path, "wt", encoding="utf-8") as file:
+            json.dump(data, file)
+        temporary_path.replace(path)
+
+
+@define
+class FrostDownloader:
+    """Downloads the Frost observations of a station in windows, with at most max_parallel requests in flight.
+
+    Closed windows are served from the cache, so later runs only fetch the window still open.
+    Progress is reported per station as (station, finished windows, total windows).
+    """
+
+    client: AsyncAPIClient = field(factory=AsyncAPIClient)
+    cache: FrostWindowCache = field(factory=FrostWindowCache)
+    months: int = 1
+    max_parallel: int = 4
+    settle: timedelta = timedelta(days=1)
+    progress: dict[str, tuple[int, int]] = field(factory=dict)
+    _semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = field(
+        factory=dict, init=False
+    )
+
+    async def download(
+        self,
+        station: str,
+        early: datetime,
+        late: datetime,
+        on_progress: ProgressFn | None = None,
+    ) -> list[dict]:
+        windows = split_interval(early, late, self.months)
+        self.report(station, 0, len(windows), on_progress)
+        finished = 0
+
+        async def fetch(window: Window) -> list[dict]:
+            nonlocal finished
+            data = await self.fetch_window(station, window, late)
+            finished += 1
+            self.report(station, finished, len(windows), on_progress)
+            return data
+
+        results = await asyncio.gather(*[fetch(window) for window in windows])
+        return [item for data in results for item in data]
+
+    async def fetch_window(self, station: str, window: Window, now: datetime):
+        closed = window.closed(now, self.settle)
+        if closed:
+            cached = self.cache.load(station, window)
+            if cached is not None:
+                return cached
+        async with self.semaphore():
+            try:
+                response = (
+                    await self.client.download_historic_from_station_between_interval(
+                        station, window.start, window.end
+                    )
+                )
+                data = response["data"]
+            except HTTPException as e:
+                # Frost answers 404 when there are no observations in the interval
+                if e.status_code != 404:
+                    raise
+                data = []
+        if closed:
+            self.cache.store(station, window, data)
+        return data
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """The semaphore shared by every download on the running loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.max_parallel)}
+        return self._semaphores[loop]
+
+    def report(
+        self, station: str, finished: int, total: int, on_progress: ProgressFn | None
+    ):
+        self.progress[station] = (finished, total)
+        logger.info(f"Frost {station}: {finished}/{total} windows")
+        if on_progress is not None:
+            on_progress(station, finished, total)
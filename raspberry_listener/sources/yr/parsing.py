@@ -0,0 +1,69 @@
+"""Single-pass parsers from the api.met.no and Frost JSON responses to typed columns.
+
+Both walk the decoded JSON once, writing into preallocated numpy arrays, and parse
+the timestamps in one vectorized call. No intermediate object-dtype frames are built.
+"""
+import numpy as np
+import pandas as pd
+
+
+def parse_timestamps(times: list[str]) -> pd.DatetimeIndex:
+    """Parses ISO 8601 timestamps to a UTC DatetimeIndex.
+    Both APIs send UTC with a Z suffix, which numpy parses far faster than pandas once the Z is removed.
+    """
+    if all(time.endswith("Z") for time in times):
+        utc_times = np.array([time[:-1] for time in times], dtype="datetime64[ns]")
+        return pd.DatetimeIndex(utc_times).tz_localize("UTC")
+    return pd.to_datetime(np.asarray(times, dtype=object), utc=True, format="ISO8601")
+
+
+def parse_forecast(result: dict) -> pd.DataFrame:
+    """One row per forecast time, with the time column and a float column per instant detail"""
+    timeseries: list[dict] = result["properties"]["timeseries"]
+    rows = len(timeseries)
+    times: list[str] = [""] * rows
+    columns: dict[str, np.ndarray] = {}
+    for i, step in enumerate(timeseries):
+        times[i] = step["time"]
+        details: dict[str, float] = step["data"]["instant"]["details"]
+        for name, value in details.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = np.full(rows, np.nan)
+            column[i] = value
+    frame = pd.DataFrame({"time": parse_timestamps(times)})
+    for name, column in columns.items():
+        frame[name] = column
+    return frame
+
+
+def parse_observations(data: list[dict]) -> pd.DataFrame:
+    """One row per Frost observation, with referenceTime, a categorical elementId and value"""
+    counts = np.fromiter(
+        (len(item["observations"]) for item in data), dtype=np.int64, count=len(data)
+    )
+    rows = int(counts.sum())
+    codes = np.empty(rows, dtype=np.int8)
+    values = np.empty(rows, dtype=np.float64)
+    element_codes: dict[str, int] = {}
+    i = 0
+    for item in data:
+        for observation in item["observations"]:
+            element = observation["elementId"]
+            code = element_codes.get(element)
+            if code is None:
+                code = element_codes[element] = len(element_codes)
+            codes[i] = code
+            values[i] = observation["value"]
+            i += 1
+    reference_times = parse_timestamps([item["referenceTime"] for item in data])
+    return pd.DataFrame(
+        {
+            "referenceTime": reference_times.repeat(counts),
+            # The stubs only take a list of codes, but from_codes is meant for arrays
+            "elementId": pd.Categorical.from_codes(
+                codes, categories=pd.Index(list(element_codes))  # type: ignore[arg-type]
+            ),
+            "value": values,
+        }
+    )
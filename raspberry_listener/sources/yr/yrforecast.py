@@ -1,17 +1,28 @@
 import asyncio
+from datetime import datetime, timezone
 
 import pandas as pd
 from attrs import define, field
+from datamodels.storage import MemoryUsage
 from sources import DataNotReadyException
 
+from ..ioloop import io_loop
 from ..settings import get_settings
-from .apiclient import AsyncAPIClient, Location, Variant
+from .apiclient import AsyncAPIClient, CachedResponse, Location, Variant
+from .parsing import parse_forecast
+
+# Refresh interval for forecasts without an Expires header, and the least time between refreshes
+DEFAULT_REFRESH_MS = 30 * 60 * 1000
+MINIMUM_REFRESH_MS = 10 * 1000
 
 
 @define
 class YrForecast:
     _client: AsyncAPIClient = AsyncAPIClient()
     _dataframe_mapping: dict[str, pd.DataFrame] = field(factory=dict)
+    _expiry_mapping: dict[str, datetime | None] = field(factory=dict)
+    # Bumped whenever the frame of a location is replaced, the forecast values change on the same times
+    _generation_mapping: dict[str, int] = field(factory=dict)
 
     def get_locations(self) -> dict[str, Location]:
         settings = get_settings()
@@ -19,28 +30,24 @@ class YrForecast:
         return {location: Location(**kwargs) for location, kwargs in locations.items()}
 
     def initial_load(self) -> None:
-        locations = self.get_locations()
+        self.refresh()
 
-        async def get_forecast_for_location(location: Location):
-            return await self._client.download_forecast_from_location(
-                location, Variant.Compact
-            )
+    def refresh(self) -> None:
+        """Fetches every forecast that has expired. Frames are only rebuilt when the forecast changed."""
+        locations = self.get_locations()
 
-        def load_forecast_into_dataframe(result: dict) -> pd.DataFrame:
-            forecast = result["properties"]["timeseries"]
-            frame = pd.DataFrame.from_records(forecast)
-            observations_frame = pd.DataFrame.from_records(frame.data)
-            instant_data = [
-                item["details"] for item in observations_frame["instant"].to_numpy()
-            ]
-            instant_frame = pd.DataFrame.from_records(instant_data)
-            frame["time"] = pd.to_datetime(frame["time"])
-            return frame.join(instant_frame).drop("data", axis=1)
+        async def get_forecast_for_location(location: Location) -> CachedResponse:
+            return await self._client.forecast_from_location(location, Variant.Compact)
 
         async def collect_frame(location: Location, location_name: str):
-            data = await get_forecast_for_location(location)
-            frame = load_forecast_into_dataframe(data)
-            self._dataframe_mapping[location_name] = frame
+            response = await get_forecast_for_location(location)
+            self._expiry_mapping[location_name] = response.expiry()
+            if response.modified or location_name not in self._dataframe_mapping:
+                frame = parse_forecast(response.body)
+                self._dataframe_mapping[location_name] = frame
+                self._generation_mapping[location_name] = (
+                    self._generation_mapping.get(location_name, 0) + 1
+                )
 
         async def create_dataframes():
             await asyncio.gather(
@@ -50,11 +57,7 @@ class YrForecast:
                 ]
             )
 
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-        loop.run_until_complete(create_dataframes())
+        io_loop().run(create_dataframes())
 
     def data_for_location(self, location_name: str):
         try:
@@ -62,5 +65,26 @@ class YrForecast:
         except (AttributeError, KeyError):
             raise DataNotReadyException
 
+    def generation(self, location_name: str) -> int:
+        return self._generation_mapping.get(location_name, 0)
+
     def update_data(self) -> None:
-        pass
+        self.refresh()
+
+    def memory_usage(self) -> dict[str, MemoryUsage]:
+        # A forecast is a few hundred rows, it is kept as the parsed frame
+        usage = {}
+        for location_name, frame in self._dataframe_mapping.items():
+            size = int(frame.memory_usage(deep=True).sum())
+            usage[location_name] = MemoryUsage(len(frame), size, size)
+        return usage
+
+    def milliseconds_until_refresh(self) -> int:
+        """Time until the first forecast expires, which is when api.met.no has a new one"""
+        expiries = [
+            expiry for expiry in self._expiry_mapping.values() if expiry is not None
+        ]
+        if not expiries:
+            return DEFAULT_REFRESH_MS
+        remaining = min(expiries) - datetime.now(timezone.utc)
+        return max(MINIMUM_REFRESH_MS, int(remaining.total_seconds() * 1000))
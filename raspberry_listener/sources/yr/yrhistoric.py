@@ -1,18 +1,25 @@
 import asyncio
 from datetime import datetime
 
-import pandas as pd
 from attrs import define, field
+from datamodels.storage import CompactSeries, MemoryUsage
 from sources import DataNotReadyException
 
+from ..ioloop import io_loop
 from ..settings import get_settings
-from .apiclient import AsyncAPIClient
+from .frostdownloader import FrostDownloader
+from .parsing import parse_observations
+
+HISTORY_START = datetime(2023, 1, 1)
 
 
 @define
 class YrHistoric:
-    _dataframe_mapping: dict[str, pd.DataFrame] = field(factory=dict)
-    _client = AsyncAPIClient()
+    # The observations of each location, one compact series per element
+    _series_mapping: dict[str, dict[str, CompactSeries]] = field(factory=dict)
+    _downloader: FrostDownloader = field(factory=FrostDownloader)
+    # Bumped whenever the series of a location are replaced
+    _generation_mapping: dict[str, int] = field(factory=dict)
 
     def get_station_id_mapping(self):
         settings = get_settings()
@@ -21,33 +28,28 @@ class YrHistoric:
 
     def initial_load(self) -> None:
         station_id_mapping = self.get_station_id_mapping()
+        now = datetime.now()
 
         async def get_data_from_station_id(station_id: str):
-            response = (
-                await self._client.download_historic_from_station_between_interval(
-                    station_id,
-                    datetime(2023, 1, 1),
-                    datetime.now(),
-                )
-            )
-            return response["data"]
+            return await self._downloader.download(station_id, HISTORY_START, now)
 
-        def create_frame(data: dict, location_name):
-            full_frame = pd.DataFrame.from_records(data)
-            full_frame = full_frame.explode("observations").reset_index(drop=True)
-            observations_frame = pd.DataFrame.from_records(
-                full_frame.observations.to_numpy()
-            )
-            full_frame = full_frame.join(observations_frame).drop(
-                "observations", axis=1
-            )
-            full_frame["location"] = location_name
-            return full_frame
+        def create_series(data: list[dict]) -> dict[str, CompactSeries]:
+            frame = parse_observations(data)
+            return {
+                str(element_id): CompactSeries(
+                    group["referenceTime"].to_numpy(dtype="datetime64[ns]"),
+                    group["value"].to_numpy(),
+                )
+                for element_id, group in frame.groupby("elementId", observed=True)
+            }
 
         async def collect_frame(station_id: str, location_name: str):
             data = await get_data_from_station_id(station_id)
 
-            self._dataframe_mapping[location_name] = create_frame(data, location_name)
+            self._series_mapping[location_name] = create_series(data)
+            self._generation_mapping[location_name] = (
+                self._generation_mapping.get(location_name, 0) + 1
+            )
 
         async def create_dataframes():
             await asyncio.gather(
@@ -57,17 +59,24 @@ class YrHistoric:
                 ]
             )
 
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-        loop.run_until_complete(create_dataframes())
+        io_loop().run(create_dataframes())
 
-    def data_for_location(self, location: str):
+    def series_for_location(self, location: str, element_id: str) -> CompactSeries:
         try:
-            return self._dataframe_mapping[location]
+            series = self._series_mapping[location]
         except (AttributeError, KeyError):
             raise DataNotReadyException
+        return series.get(element_id, CompactSeries([], []))
+
+    def generation(self, location: str) -> int:
+        return self._generation_mapping.get(location, 0)
+
+    def memory_usage(self) -> dict[str, MemoryUsage]:
+        return {
+            f"{location} {element_id}": series.memory()
+            for location, elements in self._series_mapping.items()
+            for element_id, series in elements.items()
+        }
 
     def update_data(self) -> None:
         pass
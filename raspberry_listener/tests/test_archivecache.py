@@ -0,0 +1,80 @@
+import pandas as pd
+from sources import SensorDataFrameHandler
+from sources.raspberrysensors.archivecache import ArchiveCache
+from sources.raspberrysensors.datatypes import Sensor, SensorType
+from sources.raspberrysensors.seriesstore import SeriesStore
+from sources.raspberrysensors.validation import fast_check
+
+from .test_seriesstore import DHT11_TEMPERATURE, make_frame
+
+
+def flushed_cache(directory, df: pd.DataFrame, **kwargs) -> ArchiveCache:
+    cache = ArchiveCache(directory, **kwargs)
+    cache.mark_dirty(df.index.get_level_values("timestamp").min())
+    cache.flush(SeriesStore.from_frame(df))
+    return cache
+
+
+def test_days_round_trip(tmp_path):
+    df = pd.concat(
+        [
+            make_frame("2023-05-09 23:00:00", 7200),
+            make_frame("2023-05-09 23:00:00", 7200, "humidity", "%"),
+        ]
+    ).sort_index()
+    cache = flushed_cache(tmp_path, df)
+    assert list(cache.day_paths()) == [
+        pd.Timestamp("2023-05-09"),
+        pd.Timestamp("2023-05-10"),
+    ]
+    loaded = cache.load()
+    assert loaded is not None
+    pd.testing.assert_frame_equal(loaded, df)
+    since = pd.Timestamp("2023-05-10 00:30:00")
+    assert cache.load(since).equals(df[df.index.get_level_values("timestamp") >= since])
+
+
+def test_categories_are_repaired(tmp_path):
+    cache = flushed_cache(tmp_path, make_frame("2023-05-09 00:00:00", 10))
+    loaded = cache.load()
+    assert loaded is not None
+    fast_check(loaded)
+    sensor = loaded.index.get_level_values("sensor")
+    assert list(sensor.dtype.categories) == Sensor.values()
+    assert list(loaded.index.get_level_values("sensor_type").dtype.categories) == (
+        SensorType.values()
+    )
+
+
+def test_partial_day_is_merged_with_the_file(tmp_path):
+    cache = flushed_cache(tmp_path, make_frame("2023-05-09 00:00:00", 3600))
+    # Only the second half of the hour is still in memory, with a few new readings after it
+    store = SeriesStore.from_frame(make_frame("2023-05-09 00:30:00", 1810))
+    cache.mark_dirty(pd.Timestamp("2023-05-09 01:00:00"))
+    cache.flush(store, force=True)
+    loaded = cache.load()
+    assert loaded is not None
+    time = loaded.index.get_level_values("timestamp")
+    assert time[0] == pd.Timestamp("2023-05-09 00:00:00") and len(time) == 3610
+    assert time.is_unique
+
+
+def test_old_days_are_pruned(tmp_path):
+    cache = flushed_cache(
+        tmp_path, make_frame("2023-05-01 00:00:00", 3600), max_age=pd.Timedelta(days=3)
+    )
+    cache.mark_dirty(pd.Timestamp("2023-05-09"))
+    cache.flush(SeriesStore.from_frame(make_frame("2023-05-09", 10)), force=True)
+    assert list(cache.day_paths()) == [pd.Timestamp("2023-05-09")]
+
+
+def test_close_writes_the_throttled_readings(tmp_path):
+    handler = SensorDataFrameHandler(cache=ArchiveCache(tmp_path))
+    handler._set_store(SeriesStore.from_frame(make_frame("2023-05-09 00:00:00", 10)))
+    handler._cache.mark_dirty(pd.Timestamp("2023-05-09 00:00:00"))
+    handler._cache.flush(handler._store, force=True)
+    handler._append(make_frame("2023-05-09 00:00:10", 5))
+    assert len(handler._cache.load()) == 10
+    handler.close()
+    assert len(handler._cache.load()) == 15
+    assert len(handler.get_data(DHT11_TEMPERATURE)[0]) == 15
@@ -0,0 +1,26 @@
+from sources.raspberrysensors.archiveformat import FormatSelector
+from sources.raspberrysensors.remotereader import Format
+
+
+def test_small_deltas_use_a_cheap_format_and_large_ones_parquet():
+    selector = FormatSelector()
+    assert selector.choose(1) == Format.Arrow
+    assert selector.choose(1_000_000) == Format.Parquet
+    # Unknown size, usually the full archive
+    assert selector.choose(None) == Format.Parquet
+
+
+def test_a_slow_link_favours_the_smallest_payload():
+    selector = FormatSelector(bytes_per_second=1e3)
+    assert selector.choose(1_000) == Format.Parquet
+
+
+def test_unsupported_formats_are_skipped_until_they_expire():
+    selector = FormatSelector()
+    selector.mark_unsupported(Format.Arrow)
+    assert selector.choose(1) == Format.JSON
+    selector.mark_unsupported(Format.Parquet)
+    assert selector.choose(None) == Format.Parquet
+
+    selector.unsupported_seconds = 0
+    assert selector.choose(1) == Format.Arrow
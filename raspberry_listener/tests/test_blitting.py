@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+# ui is imported before plotmanager, as by main, which it imports in turn
+from ui.drawwidget import Blitter  # isort: skip
+
+import matplotlib
+import numpy as np
+from datamodels import DataIdentifier, DataUpdate, SeriesChange, TemperatureModel
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import date2num
+from matplotlib.figure import Figure
+from plotmanager import PlotManager
+from plotstrategies import LinePlot
+from plotstrategies.axes import SingleAxesStrategy
+from plotstrategies.color import CyclicColorStrategy
+from plotstrategies.legend import ExternalLegend
+from PySide6 import QtCore
+from redrawscheduler import RedrawScheduler
+
+TIME = np.arange("2023-05-09T00:00", "2023-05-09T01:00", dtype="datetime64[s]")
+VALUE = np.sin(np.arange(len(TIME)) / 100)
+
+
+def line_manager(blit: bool = True, rescale_plot: bool = False):
+    """A PlotManager with a line plot of a growing series, on an Agg canvas"""
+    QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    model = TemperatureModel()
+    length = {"a": 500}
+    dataset = DataIdentifier("pi", "a")
+    model.register_data(dataset, lambda: (TIME[: length["a"]], VALUE[: length["a"]]))
+    figure = Figure()
+    canvas = FigureCanvasAgg(figure)
+    widget = SimpleNamespace(
+        plot_live=True,
+        isVisible=lambda: True,
+        rescale_plot=rescale_plot,
+        blit=blit,
+        blitter=Blitter(canvas),
+        canvas=canvas,
+    )
+    manager = PlotManager(
+        widget,  # type: ignore
+        model,
+        LinePlot,
+        SingleAxesStrategy(figure),
+        CyclicColorStrategy(matplotlib.color_sequences["tab10"]),  # type: ignore
+        ExternalLegend(),
+        scheduler=RedrawScheduler(),
+    )
+    return manager, dataset, length
+
+
+def grow(manager: PlotManager, dataset: DataIdentifier, length: dict, rows: int):
+    start = length["a"]
+    length["a"] += rows
+    manager.model.data_updated.emit(
+        DataUpdate("pi", {dataset: SeriesChange(start, length["a"])})
+    )
+
+
+def test_data_updates_are_blitted_until_the_view_changes():
+    manager, dataset, length = line_manager()
+    widget = manager.widget
+    blits = []
+    draws = []
+    blit = widget.blitter.blit
+
+    def counted_blit():
+        blits.append(blit())
+        return blits[-1]
+
+    widget.blitter.blit = counted_blit
+    widget.canvas.mpl_connect("draw_event", draws.append)
+    manager.add_plotting_strategy(dataset)
+    manager.scheduler.flush()
+    line = manager.plots[dataset].plot_strategy.artist()
+    assert line.get_animated()
+    assert len(draws) == 1
+
+    grow(manager, dataset, length, 10)
+    manager.scheduler.flush()
+    assert blits == [True]
+    assert len(draws) == 1
+    assert len(line.get_xdata()) == 510
+
+    manager.axes_strategy.ax.set_ylim(-2, 2)
+    grow(manager, dataset, length, 10)
+    manager.scheduler.flush()
+    assert len(draws) == 2
+
+    widget.blit = False
+    grow(manager, dataset, length, 10)
+    manager.scheduler.flush()
+    assert not line.get_animated()
+    assert len(blits) == 1
+
+
+def test_replaced_data_is_set_on_the_line_and_blitted():
+    manager, dataset, length = line_manager()
+    blits = []
+    blit = manager.widget.blitter.blit
+
+    def counted_blit():
+        blits.append(blit())
+        return blits[-1]
+
+    manager.widget.blitter.blit = counted_blit
+    manager.add_plotting_strategy(dataset)
+    manager.scheduler.flush()
+    line = manager.plots[dataset].plot_strategy.artist()
+
+    length["a"] = 400
+    manager.model.data_updated.emit(
+        DataUpdate("pi", {dataset: SeriesChange(0, 400, replaced=True)})
+    )
+    manager.scheduler.flush()
+    assert manager.plots[dataset].plot_strategy.artist() is line
+    assert len(line.get_xdata()) == 400
+    assert blits == [True]
+
+
+def test_polls_are_blitted_while_the_plot_is_rescaled():
+    manager, dataset, length = line_manager(rescale_plot=True)
+    widget = manager.widget
+    blits = []
+    draws = []
+    blit = widget.blitter.blit
+
+    def counted_blit():
+        blits.append(blit())
+        return blits[-1]
+
+    widget.blitter.blit = counted_blit
+    widget.canvas.mpl_connect("draw_event", draws.append)
+    manager.add_plotting_strategy(dataset)
+    manager.scheduler.flush()
+    ax = manager.axes_strategy.ax
+    xlim = ax.get_xlim()
+
+    for _ in range(2):
+        grow(manager, dataset, length, 10)
+        manager.scheduler.flush()
+    assert blits == [True, True]
+    assert len(draws) == 1
+    assert ax.get_xlim() == xlim
+
+    # Past the headroom the limits move on and the figure is drawn again
+    grow(manager, dataset, length, 100)
+    manager.scheduler.flush()
+    assert len(draws) == 2
+    assert ax.get_xlim()[1] > xlim[1]
+    line = manager.plots[dataset].plot_strategy.artist()
+    assert ax.get_xlim()[1] > date2num(line.get_xdata()[-1])
@@ -0,0 +1,104 @@
+import numpy as np
+from datamodels import DataIdentifier, SeriesChange, TemperatureModel
+from sources import DataNotReadyException
+
+TIME = np.arange("2023-05-09T00:00", "2023-05-09T01:00", dtype="datetime64[s]")
+VALUE = np.arange(len(TIME), dtype=np.float64)
+
+
+def test_updates_carry_appended_rows_and_skip_unchanged_series():
+    model = TemperatureModel()
+    length = {"a": 100, "b": 100}
+    ready = {"c": False}
+
+    def series(name):
+        def fn():
+            return TIME[: length[name]], VALUE[: length[name]]
+
+        return fn
+
+    def not_ready():
+        if not ready["c"]:
+            raise DataNotReadyException
+        return TIME, VALUE
+
+    model.register_data(DataIdentifier("pi", "a"), series("a"))
+    model.register_data(DataIdentifier("pi", "b"), series("b"))
+    model.register_data(DataIdentifier("pi", "c"), not_ready)
+    updates = []
+    model.data_updated.connect(updates.append)
+
+    model.forward_source_updated("pi")
+    assert set(updates[-1].changes) == {
+        DataIdentifier("pi", "a"),
+        DataIdentifier("pi", "b"),
+    }
+    assert updates[-1].changes[DataIdentifier("pi", "a")] == SeriesChange(
+        0, 100, TIME[0], TIME[99], replaced=True
+    )
+
+    length["a"] = 150
+    model.forward_source_updated("pi")
+    assert updates[-1].changes == {
+        DataIdentifier("pi", "a"): SeriesChange(100, 150, TIME[100], TIME[149])
+    }
+
+    model.forward_source_updated("pi")
+    assert len(updates) == 2
+
+    length["b"] = 50
+    ready["c"] = True
+    model.forward_source_updated("pi")
+    assert updates[-1].changes[DataIdentifier("pi", "b")].replaced
+    assert updates[-1].changes[DataIdentifier("pi", "c")].replaced
+
+
+def test_line_is_updated_in_place_until_its_color_changes():
+    from matplotlib.figure import Figure
+    from plotstrategies.line import LinePlot
+
+    model = TemperatureModel()
+    length = {"a": 100}
+    dataset = DataIdentifier("pi", "a")
+    model.register_data(dataset, lambda: (TIME[: length["a"]], VALUE[: length["a"]]))
+    ax = Figure().add_subplot()
+    plot = LinePlot(model, dataset)
+    plot.set_color("C0")
+    assert not plot.append(ax, SeriesChange(0, 100, replaced=True))
+    plot(ax)
+    line = plot.artist()
+
+    length["a"] = 150
+    assert plot.append(ax, SeriesChange(100, 150))
+    assert plot.artist() is line
+    assert len(line.get_xdata()) == 150
+
+    plot.set_color("C1")
+    assert not plot.append(ax, SeriesChange(150, 150))
+    plot(ax)
+    assert plot.artist() is not line
+    assert ax.get_lines() == [plot.artist()]
+
+
+def test_values_replaced_on_the_same_times_are_reported():
+    model = TemperatureModel()
+    source = {"value": VALUE, "generation": 0}
+    dataset = DataIdentifier("yr", "a")
+    model.register_data(
+        dataset,
+        lambda: (TIME, source["value"]),
+        generation_fn=lambda: source["generation"],
+    )
+    updates = []
+    model.data_updated.connect(updates.append)
+    model.forward_source_updated("yr")
+    model.forward_source_updated("yr")
+    assert len(updates) == 1
+
+    # A new forecast for the same hours
+    source["value"], source["generation"] = VALUE + 1, 1
+    model.forward_source_updated("yr")
+    assert updates[-1].changes[dataset] == SeriesChange(
+        0, len(TIME), TIME[0], TIME[-1], replaced=True
+    )
+    assert model.get_aggregates(dataset).maximum.max() == VALUE.max() + 1
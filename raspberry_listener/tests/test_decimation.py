@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from datamodels import DataIdentifier, Decimation, TemperatureModel
+from datamodels.decimation import decimate, time_range
+
+TIME = np.arange("2023-05-09T00:00", "2023-05-10T00:00", dtype="datetime64[s]")
+VALUE = np.sin(np.arange(len(TIME)) / 3000)
+
+
+def test_time_range_is_inclusive():
+    selection = time_range(
+        TIME, pd.Timestamp("2023-05-09T01:00"), np.datetime64("2023-05-09T02:00")
+    )
+    assert TIME[selection][0] == np.datetime64("2023-05-09T01:00")
+    assert TIME[selection][-1] == np.datetime64("2023-05-09T02:00")
+
+
+def test_decimation_keeps_extremes_and_order():
+    for method in Decimation:
+        time, value = decimate(TIME, VALUE, 500, method)
+        assert len(time) <= 500
+        assert np.all(np.diff(time.astype(np.int64)) > 0)
+        assert time[0] == TIME[0] and time[-1] == TIME[-1]
+    time, value = decimate(TIME, VALUE, 500, Decimation.MinMax)
+    assert value.max() == VALUE.max() and value.min() == VALUE.min()
+
+
+def test_small_budgets():
+    for method in Decimation:
+        for max_points in range(0, 8):
+            time, value = decimate(TIME, VALUE, max_points, method)
+            assert len(time) <= max_points or len(time) == len(TIME)
+            assert len(time) == len(value)
+
+
+def test_model_ranges_and_native_range_support():
+    model = TemperatureModel()
+    calls = []
+
+    def ranged(start=None, end=None):
+        calls.append((start, end))
+        selection = time_range(TIME, start, end)
+        return TIME[selection], VALUE[selection]
+
+    model.register_data(DataIdentifier("full", "a"), lambda: (TIME, VALUE))
+    model.register_data(DataIdentifier("ranged", "a"), ranged, supports_range=True)
+    start, end = np.datetime64("2023-05-09T12:00"), np.datetime64("2023-05-09T13:00")
+    full = model.get_data(DataIdentifier("full", "a"), start, end)
+    native = model.get_data(DataIdentifier("ranged", "a"), start, end)
+    assert len(full[0]) == len(native[0]) == 3601
+    assert np.shares_memory(full[1], VALUE)
+    assert calls == [(start, end)]
+    assert len(model.get_data(DataIdentifier("full", "a"), max_points=100)[0]) <= 100
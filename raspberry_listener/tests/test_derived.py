@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from datamodels import (
+    CenteredMedian,
+    DataIdentifier,
+    DerivedSeries,
+    DewPoint,
+    Difference,
+    ResampledMean,
+    RollingMedian,
+    TemperatureModel,
+)
+from scipy.signal import medfilt
+
+TIME = np.arange("2023-05-09T00:00", "2023-05-09T06:00", 10, dtype="datetime64[s]")
+VALUE = 20 + 5 * np.sin(np.arange(len(TIME)) / 50) + np.arange(len(TIME)) % 7
+
+
+def growing(length: dict, name: str, value=VALUE):
+    return lambda: (TIME[: length[name]], value[: length[name]])
+
+
+def test_incremental_results_match_a_full_computation():
+    humidity = np.linspace(20, 90, len(TIME))
+    derivations = [
+        RollingMedian(5),
+        CenteredMedian(7),
+        ResampledMean(np.timedelta64(15, "m")),
+        DewPoint(),
+        Difference(),
+    ]
+    for derivation in derivations:
+        length = {"a": 100, "b": 90}
+        derived = DerivedSeries(
+            [growing(length, "a"), growing(length, "b", humidity)], derivation
+        )
+        for grown in (100, 101, 350, 1000, len(TIME)):
+            length["a"] = grown
+            length["b"] = grown - 10
+            time, value = derived()
+            fresh_time, fresh_value = derivation.compute(
+                [growing(length, "a")(), growing(length, "b", humidity)()], 0
+            )
+            assert np.array_equal(time, fresh_time)
+            np.testing.assert_allclose(value, fresh_value)
+
+
+def test_derivations_agree_with_pandas_and_scipy():
+    series = (TIME, VALUE)
+    _, rolling = RollingMedian(3).compute([series], 0)
+    np.testing.assert_allclose(
+        rolling, pd.Series(VALUE).rolling(3, min_periods=1).median()
+    )
+    _, centered = CenteredMedian(5).compute([series], 0)
+    np.testing.assert_allclose(centered, medfilt(VALUE, 5))
+    temperature = (TIME, np.full(len(TIME), 20.0))
+    humidity = (TIME, np.full(len(TIME), 50.0))
+    _, dew_point = DewPoint().compute([temperature, humidity], 0)
+    np.testing.assert_allclose(dew_point, 9.26, atol=0.01)
+
+
+def test_unchanged_inputs_are_served_from_the_cache():
+    calls = []
+
+    class Counting(RollingMedian):
+        def compute(self, inputs, start):
+            calls.append(start)
+            return super().compute(inputs, start)
+
+    length = {"a": 100}
+    derived = DerivedSeries([growing(length, "a")], Counting(3))
+    derived()
+    derived()
+    length["a"] = 120
+    derived()
+    # Derived series can feed other derived series
+    smoothed = DerivedSeries([derived], RollingMedian(3))
+    assert len(smoothed()[0]) == 120
+    assert calls == [0, 100]
+
+
+def test_a_new_input_generation_computes_the_series_again():
+    source = {"value": VALUE, "generation": 0}
+    derived = DerivedSeries(
+        [lambda: (TIME, source["value"])],
+        RollingMedian(3),
+        [lambda: source["generation"]],
+    )
+    derived()
+    generation = derived.generation()
+    source["value"], source["generation"] = VALUE + 1, 1
+    np.testing.assert_allclose(
+        derived()[1], RollingMedian(3).compute([(TIME, VALUE + 1)], 0)[1]
+    )
+    assert derived.generation() > generation
+
+
+def test_the_model_reports_the_memory_of_derived_series_and_summaries():
+    model = TemperatureModel()
+    dataset = DataIdentifier("pi", "median")
+    derived = DerivedSeries([growing({"a": 1000}, "a")], RollingMedian(5))
+    model.register_data(dataset, derived, generation_fn=derived.generation)
+    model.get_statistics(dataset)
+    model.get_time_of_day_histogram(dataset, np.linspace(15, 35, 21))
+
+    usage = model.memory_usage()
+    assert usage["median, pi derived"].rows == 1000
+    assert usage["median, pi derived"].used == 1000 * (8 + 8)
+    assert usage["median, pi time of day"].used == 24 * 20 * 8 + 21 * 8
+    assert usage["median, pi statistics"].used > 0
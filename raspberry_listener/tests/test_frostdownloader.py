@@ -0,0 +1,40 @@
+import asyncio
+from datetime import datetime
+
+from sources.yr.frostdownloader import FrostDownloader, FrostWindowCache
+
+
+class CountingClient:
+    def __init__(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def download_historic_from_station_between_interval(
+        self, station: str, early: datetime, late: datetime
+    ):
+        self.requests.append((early, late))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {"data": [{"sourceId": station, "referenceTime": early.isoformat()}]}
+
+
+def test_only_open_window_is_refetched(tmp_path):
+    early, late = datetime(2023, 1, 1), datetime(2023, 12, 15)
+    client = CountingClient()
+    downloader = FrostDownloader(client, FrostWindowCache(tmp_path), max_parallel=3)
+    progress = []
+
+    data = asyncio.run(
+        downloader.download("SN1", early, late, lambda *args: progress.append(args))
+    )
+    assert len(data) == 12
+    assert client.max_in_flight == 3
+    assert progress[-1] == ("SN1", 12, 12)
+
+    client = CountingClient()
+    downloader = FrostDownloader(client, FrostWindowCache(tmp_path))
+    assert asyncio.run(downloader.download("SN1", early, late)) == data
+    assert client.requests == [(datetime(2023, 12, 1), late)]
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+from sources.yr.apiclient import AsyncAPIClient, HTTPCache, Location, Variant
+
+LOCATION = Location(lat=59.91, lon=10.75, altitude=10)
+LAST_MODIFIED = "Sat, 17 Oct 2026 10:00:00 GMT"
+
+
+def make_client(
+    tmp_path,
+    expires: datetime,
+    requests: list[httpx.Request],
+    revalidated_expires: bool = True,
+):
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        headers = {"expires": format_datetime(expires, usegmt=True)}
+        if request.headers.get("if-modified-since") == LAST_MODIFIED:
+            return httpx.Response(304, headers=headers if revalidated_expires else None)
+        headers["last-modified"] = LAST_MODIFIED
+        return httpx.Response(200, headers=headers, json={"properties": {}})
+
+    return AsyncAPIClient(
+        httpx.AsyncClient(transport=httpx.MockTransport(handle)), HTTPCache(tmp_path)
+    )
+
+
+def test_fresh_response_is_served_from_cache(tmp_path):
+    requests = []
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    client = make_client(tmp_path, expires, requests)
+    first = asyncio.run(client.forecast_from_location(LOCATION, Variant.Compact))
+    second = asyncio.run(client.forecast_from_location(LOCATION, Variant.Compact))
+    assert first.modified and not second.modified
+    assert second.body == first.body
+    assert len(requests) == 1
+
+
+def test_expired_response_is_revalidated(tmp_path):
+    requests = []
+    expires = datetime.now(timezone.utc) - timedelta(minutes=1)
+    client = make_client(tmp_path, expires, requests)
+    asyncio.run(client.forecast_from_location(LOCATION, Variant.Compact))
+    revalidated = asyncio.run(client.forecast_from_location(LOCATION, Variant.Compact))
+    assert requests[1].headers["if-modified-since"] == LAST_MODIFIED
+    assert not revalidated.modified
+    assert revalidated.body == {"properties": {}}
+
+
+def test_revalidated_response_without_expires_is_fresh_for_a_while(tmp_path):
+    requests = []
+    expires = datetime.now(timezone.utc) - timedelta(minutes=1)
+    client = make_client(tmp_path, expires, requests, revalidated_expires=False)
+    asyncio.run(client.forecast_from_location(LOCATION, Variant.Compact))
+    revalidated = asyncio.run(client.forecast_from_location(LOCATION, Variant.Compact))
+    assert revalidated.fresh()
+    asyncio.run(client.forecast_from_location(LOCATION, Variant.Compact))
+    assert len(requests) == 2
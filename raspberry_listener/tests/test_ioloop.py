@@ -0,0 +1,21 @@
+import asyncio
+import threading
+
+from sources.ioloop import io_loop
+
+
+def test_coroutines_run_on_one_loop_thread():
+    async def thread_name():
+        await asyncio.sleep(0)
+        return threading.current_thread().name
+
+    futures = [io_loop().submit(thread_name()) for _ in range(3)]
+    assert {future.result(timeout=5) for future in futures} == {"io-loop"}
+    assert io_loop().run(thread_name()) == "io-loop"
+
+
+def test_one_client_per_host():
+    forecast = io_loop().client("https://api.met.no/weatherapi/locationforecast/2.0/")
+    assert forecast is io_loop().client("https://api.met.no/other")
+    assert forecast is not io_loop().client("https://frost.met.no/observations")
+    assert str(forecast.base_url) == "https://api.met.no"
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+from datathread import JobScheduler, Priority
+from PySide6 import QtCore
+
+
+@pytest.fixture
+def scheduler():
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    scheduler = JobScheduler(max_workers=1)
+    yield scheduler
+    scheduler.pool.waitForDone()
+    app.processEvents()
+
+
+def blocking_job(scheduler: JobScheduler) -> threading.Event:
+    """Occupies the only worker until the returned event is set"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(timeout=5)
+
+    scheduler.submit("blocker", "initial", block, Priority.Interactive)
+    assert started.wait(timeout=5)
+    return release
+
+
+def test_priority_order_and_coalescing(scheduler):
+    release = blocking_job(scheduler)
+    ran = []
+    scheduler.submit("frost", "initial", lambda: ran.append("frost"), Priority.Backfill)
+    scheduler.submit("pi", "update", lambda: ran.append("pi"), Priority.LiveUpdate)
+    scheduler.submit(
+        "pi", "update", lambda: ran.append("pi again"), Priority.LiveUpdate
+    )
+    scheduler.submit("yr", "initial", lambda: ran.append("yr"), Priority.Interactive)
+    release.set()
+    scheduler.pool.waitForDone()
+    assert ran == ["yr", "pi", "frost"]
+
+
+def test_cancel_drops_pending_jobs(scheduler):
+    release = blocking_job(scheduler)
+    ran = []
+    finished = []
+    scheduler.finished.connect(finished.append)
+    scheduler.submit("pi", "update", lambda: ran.append("pi"), Priority.LiveUpdate)
+    scheduler.cancel("pi")
+    release.set()
+    scheduler.pool.waitForDone()
+    QtCore.QCoreApplication.processEvents()
+    assert ran == []
+    assert finished == [("blocker", "initial")]
@@ -0,0 +1,54 @@
+import pandas as pd
+from sources.yr.parsing import parse_forecast, parse_observations
+
+
+def test_parse_observations():
+    data = [
+        {
+            "referenceTime": "2023-01-01T00:00:00.000Z",
+            "observations": [
+                {"elementId": "air_temperature", "value": -3.5},
+                {"elementId": "relative_humidity", "value": 91.0},
+            ],
+        },
+        {
+            "referenceTime": "2023-01-01T01:00:00.000Z",
+            "observations": [{"elementId": "air_temperature", "value": -3.9}],
+        },
+    ]
+    frame = parse_observations(data)
+    temperature = frame[frame["elementId"] == "air_temperature"]
+    assert list(temperature["value"]) == [-3.5, -3.9]
+    assert list(temperature["referenceTime"]) == [
+        pd.Timestamp("2023-01-01T00:00Z"),
+        pd.Timestamp("2023-01-01T01:00Z"),
+    ]
+    assert frame["elementId"].dtype == "category"
+
+
+def test_parse_forecast_with_missing_details():
+    result = {
+        "properties": {
+            "timeseries": [
+                {
+                    "time": "2023-05-09T12:00:00Z",
+                    "data": {"instant": {"details": {"air_temperature": 14.2}}},
+                },
+                {
+                    "time": "2023-05-09T13:00:00+00:00",
+                    "data": {
+                        "instant": {
+                            "details": {
+                                "air_temperature": 15.0,
+                                "relative_humidity": 40.1,
+                            }
+                        }
+                    },
+                },
+            ]
+        }
+    }
+    frame = parse_forecast(result)
+    assert list(frame["air_temperature"]) == [14.2, 15.0]
+    assert frame["relative_humidity"].isna().tolist() == [True, False]
+    assert frame["time"].iloc[1] == pd.Timestamp("2023-05-09T13:00Z")
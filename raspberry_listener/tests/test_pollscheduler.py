@@ -0,0 +1,50 @@
+import pytest
+from datathread import DataThreadController, JobScheduler, PollScheduler
+from PySide6 import QtCore
+from sources import PollOutcome
+
+
+@pytest.fixture
+def poller():
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    thread = DataThreadController(
+        lambda: None, lambda: None, scheduler=JobScheduler(max_workers=1)
+    )
+    thread.scheduler.pool.waitForDone()
+    poller = PollScheduler(thread, lambda: 1000, jitter=0.0, max_interval_ms=10_000)
+    yield poller
+    poller.timer.stop()
+    app.processEvents()
+
+
+def finish_with(poller: PollScheduler, outcome: PollOutcome):
+    poller.outcome_fn = lambda: outcome
+    poller.job_finished()
+
+
+def test_backoff_on_errors_and_empty_polls(poller):
+    finish_with(poller, PollOutcome.NewData)
+    assert poller.interval_ms == 1000
+    finish_with(poller, PollOutcome.Failed)
+    finish_with(poller, PollOutcome.Failed)
+    assert poller.interval_ms == 4000
+    assert poller.error_streak == 2
+    finish_with(poller, PollOutcome.NoNewData)
+    finish_with(poller, PollOutcome.NoNewData)
+    assert poller.interval_ms == 4000
+    finish_with(poller, PollOutcome.NoNewData)
+    finish_with(poller, PollOutcome.NoNewData)
+    assert poller.interval_ms == 10_000
+    finish_with(poller, PollOutcome.NewData)
+    assert poller.interval_ms == 1000
+    assert "errors" not in poller.status()
+
+
+def test_idle_sources_poll_slower(poller):
+    visible = False
+    poller.set_visible_fn(lambda: visible)
+    finish_with(poller, PollOutcome.NewData)
+    assert poller.interval_ms == 6000
+    visible = True
+    poller.visibility_changed()
+    assert poller.interval_ms == 1000
@@ -0,0 +1,63 @@
+import numpy as np
+from datamodels import DataIdentifier, TemperatureModel
+from datamodels.pyramid import TimeSeriesPyramid
+
+TIME = np.datetime64("2023-05-09") + np.arange(100_000) * np.timedelta64(700, "ms")
+VALUE = np.cos(np.arange(len(TIME)) / 500)
+
+
+def assert_same_levels(pyramid: TimeSeriesPyramid, other: TimeSeriesPyramid):
+    for level, other_level in zip(pyramid.levels, other.levels):
+        for column, other_column in zip(level.columns(), other_level.columns()):
+            np.testing.assert_array_equal(column, other_column)
+
+
+def test_incremental_updates_match_a_full_build():
+    pyramid = TimeSeriesPyramid()
+    for end in (10, 11, 5000, 5001, 70_000, len(TIME)):
+        pyramid.update(TIME[:end], VALUE[:end])
+    full = TimeSeriesPyramid()
+    full.update(TIME, VALUE)
+    assert_same_levels(pyramid, full)
+    assert pyramid.levels[0].count[: pyramid.levels[0].length].sum() == len(TIME)
+
+
+def test_query_returns_about_the_requested_buckets():
+    pyramid = TimeSeriesPyramid()
+    pyramid.update(TIME, VALUE)
+    aggregates = pyramid.query(buckets=500)
+    assert 250 <= len(aggregates) <= 500
+    assert aggregates.minimum.min() == VALUE.min()
+    assert aggregates.maximum.max() == VALUE.max()
+    zoomed = pyramid.query(TIME[1000], TIME[2000], buckets=100)
+    assert zoomed.resolution < aggregates.resolution
+    assert zoomed.time[0] <= TIME[1000] < zoomed.time[0] + zoomed.resolution
+
+
+def test_model_owns_the_pyramid():
+    model = TemperatureModel()
+    length = 50_000
+    model.register_data(
+        DataIdentifier("pi", "a"), lambda: (TIME[:length], VALUE[:length])
+    )
+    before = model.get_aggregates(DataIdentifier("pi", "a"), buckets=200)
+    length = len(TIME)
+    after = model.get_aggregates(DataIdentifier("pi", "a"), buckets=200)
+    assert after.count.sum() == len(TIME) > before.count.sum()
+    assert (
+        model.memory_usage()["a, pi pyramid"]
+        == model._pyramids[DataIdentifier("pi", "a")].memory()
+    )
+
+
+def test_levels_finer_than_the_readings_are_not_kept():
+    time = np.datetime64("2023-05-09") + np.arange(100_000) * np.timedelta64(1, "s")
+    value = np.sin(np.arange(len(time)) / 500).astype(np.float32)
+    pyramid = TimeSeriesPyramid()
+    for end in (10, 5001, len(time)):
+        pyramid.update(time[:end], value[:end])
+    assert pyramid.base == 1 and pyramid.levels[0].length == 0
+    assert pyramid.query(time[0], time[10]).resolution == np.timedelta64(2, "s")
+    assert pyramid.query().minimum.min() == value.min()
+    # Every level held a bucket per second in five 8 byte columns, 80 bytes per reading
+    assert pyramid.memory().used / len(time) < 30
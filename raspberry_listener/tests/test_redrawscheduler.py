@@ -0,0 +1,84 @@
+# ui is imported before plotmanager, as by main
+from ui.drawwidget import DrawWidget  # isort: skip
+
+import numpy as np
+from datamodels import DataIdentifier, DataUpdate, SeriesChange
+from plotmanager import PlotManager
+
+from .test_blitting import TIME, VALUE, grow, line_manager
+
+
+def count_redraws(manager: PlotManager) -> list:
+    redraws = []
+    for name in ("draw_plots", "update_plots"):
+        method = getattr(manager, name)
+
+        def counted(*args, method=method, name=name):
+            redraws.append(name)
+            method(*args)
+
+        setattr(manager, name, counted)
+    return redraws
+
+
+def test_updates_are_coalesced_and_unchanged_data_is_not_redrawn():
+    manager, dataset, length = line_manager(blit=False)
+    redraws = count_redraws(manager)
+    manager.add_plotting_strategy(dataset)
+    manager.plot()
+    grow(manager, dataset, length, 10)
+    assert manager.scheduler.timer.isActive()
+    manager.scheduler.flush()
+    assert redraws == ["draw_plots"]
+    assert len(manager.plots[dataset].plot_strategy.artist().get_xdata()) == 510
+
+    grow(manager, dataset, length, 10)
+    grow(manager, dataset, length, 5)
+    manager.scheduler.flush()
+    assert redraws == ["draw_plots", "update_plots"]
+    assert len(manager.plots[dataset].plot_strategy.artist().get_xdata()) == 525
+
+    # A tab switch without new data
+    manager.plot()
+    manager.scheduler.flush()
+    assert redraws == ["draw_plots", "update_plots"]
+
+
+def test_hidden_widgets_keep_their_changes_until_shown():
+    manager, dataset, length = line_manager(blit=False)
+    manager.add_plotting_strategy(dataset)
+    manager.scheduler.flush()
+    shown = {"visible": False}
+    manager.widget.isVisible = lambda: shown["visible"]
+    grow(manager, dataset, length, 10)
+    manager.scheduler.flush()
+    assert len(manager.plots[dataset].plot_strategy.artist().get_xdata()) == 500
+
+    shown["visible"] = True
+    manager.scheduler.schedule(manager)
+    manager.scheduler.flush()
+    assert len(manager.plots[dataset].plot_strategy.artist().get_xdata()) == 510
+
+
+def test_values_replaced_on_the_same_times_are_redrawn():
+    manager, _, _ = line_manager(blit=False)
+    source = {"value": VALUE[:500], "generation": 0}
+    dataset = DataIdentifier("yr", "b")
+    manager.model.register_data(
+        dataset,
+        lambda: (TIME[:500], source["value"]),
+        generation_fn=lambda: source["generation"],
+    )
+    redraws = count_redraws(manager)
+    manager.add_plotting_strategy(dataset)
+    manager.scheduler.flush()
+
+    source["value"], source["generation"] = VALUE[:500] + 1, 1
+    manager.model.data_updated.emit(
+        DataUpdate("yr", {dataset: SeriesChange(0, 500, replaced=True)})
+    )
+    manager.scheduler.flush()
+    assert redraws == ["draw_plots", "update_plots"]
+    np.testing.assert_allclose(
+        manager.plots[dataset].plot_strategy.artist().get_ydata()[0], VALUE[0] + 1
+    )
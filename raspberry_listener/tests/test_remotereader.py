@@ -0,0 +1,110 @@
+import json
+
+import httpx
+import pyarrow
+import pytest
+from fastapi import HTTPException
+from pyarrow import ipc
+from sources.raspberrysensors.archiveformat import decode_archive
+from sources.raspberrysensors.remotereader import (
+    ArchiveNotAvailableException,
+    Format,
+    TransferStats,
+    Transport,
+)
+
+from .test_seriesstore import make_frame
+
+BODY = json.dumps({"data": [1, 2, 3]}).encode()
+
+
+def make_transport(handle) -> Transport:
+    transport = Transport("http://pi.test")
+    transport.client = httpx.AsyncClient(
+        base_url="http://pi.test", transport=httpx.MockTransport(handle)
+    )
+    return transport
+
+
+def test_transfers_are_counted():
+    # Only a streamed body counts towards num_bytes_downloaded, as the Pi's does
+    transport = make_transport(
+        lambda request: httpx.Response(200, stream=httpx.ByteStream(BODY))
+    )
+    assert transport.download_archive(None, Format.JSON) == {"data": [1, 2, 3]}
+    transport.download_archive(None, Format.JSON)
+    assert transport.total_requests == 2
+    assert transport.total_bytes == 2 * len(BODY)
+    stats = transport.transfers[-1]
+    assert stats.url == "http://pi.test/archive/json/"
+    assert stats.status_code == 200 and stats.bytes == len(BODY)
+    assert 0 <= stats.latency <= stats.duration
+
+
+def test_throughput_is_the_median_of_the_large_transfers():
+    transport = make_transport(lambda request: httpx.Response(200))
+    assert transport.throughput() is None
+    for size, duration in ((100_000, 1.0), (300_000, 1.0), (200_000, 1.0)):
+        transport.record(TransferStats("", 200, size, 0.1, duration))
+    # Small transfers are dominated by the latency
+    transport.record(TransferStats("", 200, 100, 0.1, 0.001))
+    assert transport.throughput() == 200_000
+
+
+def test_failed_requests_raise_and_are_not_counted():
+    def time_out(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    transport = make_transport(time_out)
+    with pytest.raises(ArchiveNotAvailableException):
+        transport.download_archive(None, Format.Parquet)
+
+    transport = make_transport(lambda request: httpx.Response(405))
+    with pytest.raises(HTTPException) as error:
+        transport.download_archive(None, Format.Arrow)
+    assert error.value.status_code == 405
+    assert transport.total_requests == 0 and not transport.transfers
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    def __init__(self, body: bytes, chunk_size: int, error: Exception | None = None):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.error = error
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start : start + self.chunk_size]
+        if self.error is not None:
+            raise self.error
+
+
+def arrow_stream(df) -> bytes:
+    table = pyarrow.Table.from_pandas(df.reset_index(), preserve_index=False)
+    sink = pyarrow.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=3)
+    return sink.getvalue().to_pybytes()
+
+
+def test_arrow_streams_are_decoded_as_they_arrive():
+    df = make_frame("2023-05-09 00:00:00", 10)
+    body = arrow_stream(df)
+    transport = make_transport(
+        lambda request: httpx.Response(200, stream=ChunkedStream(body, 7))
+    )
+    table = transport.download_archive(None, Format.Arrow)
+    assert isinstance(table, pyarrow.Table) and table.num_rows == 10
+    assert decode_archive(table, Format.Arrow).equals(df)
+    assert transport.transfers[-1].bytes == len(body)
+
+
+def test_a_broken_arrow_stream_raises():
+    body = arrow_stream(make_frame("2023-05-09 00:00:00", 10))
+
+    def break_off(request: httpx.Request) -> httpx.Response:
+        error = httpx.ReadError("connection reset", request=request)
+        return httpx.Response(200, stream=ChunkedStream(body[:100], 7, error))
+
+    with pytest.raises(ArchiveNotAvailableException):
+        make_transport(break_off).download_archive(None, Format.Arrow)
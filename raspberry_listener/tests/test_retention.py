@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from datamodels.storage import RetentionPolicy
+from sources import SensorDataFrameHandler
+from sources.raspberrysensors.archivecache import ArchiveCache
+from sources.raspberrysensors.seriesstore import SeriesStore
+
+from .test_seriesstore import DHT11_TEMPERATURE, make_frame
+
+
+def test_readings_past_the_window_are_spilled_and_paged_back_in(tmp_path):
+    handler = SensorDataFrameHandler(
+        cache=ArchiveCache(tmp_path),
+        retention=RetentionPolicy(timedelta(hours=1), slack=timedelta(minutes=10)),
+    )
+    history = make_frame("2023-05-09 22:00:00", 3600)
+    handler._set_store(SeriesStore.from_frame(history))
+    handler._cache.mark_dirty(pd.Timestamp("2023-05-09 22:00:00"))
+    # Crosses midnight, the first day is only partly held in memory after the trim
+    handler._append(make_frame("2023-05-09 23:00:00", 2 * 3600 + 1))
+
+    time, _ = handler.get_data(DHT11_TEMPERATURE)
+    assert time[0] == np.datetime64("2023-05-10 00:00:00")
+    assert len(handler._cache.day_paths()) == 2
+
+    start = pd.Timestamp("2023-05-09 22:30:00")
+    time, value = handler.get_data(DHT11_TEMPERATURE, start, None)
+    assert time[0] == start.to_datetime64() and len(time) == 9001
+    assert np.all(np.diff(time) == np.timedelta64(1, "s"))
+    # The cold range is served from the pages already read
+    handler._cache.directory = tmp_path / "missing"
+    end = pd.Timestamp("2023-05-09 23:00:00")
+    assert len(handler.get_data(DHT11_TEMPERATURE, start, end)[0]) == 1801
+
+
+def test_pages_are_loaded_by_the_page_loader(tmp_path):
+    handler = SensorDataFrameHandler(
+        cache=ArchiveCache(tmp_path),
+        retention=RetentionPolicy(timedelta(hours=1), slack=timedelta(minutes=10)),
+    )
+    handler._set_store(SeriesStore.from_frame(make_frame("2023-05-09 22:00:00", 3600)))
+    handler._cache.mark_dirty(pd.Timestamp("2023-05-09 22:00:00"))
+    handler._append(make_frame("2023-05-09 23:00:00", 2 * 3600 + 1))
+    loads = []
+    handler.page_loader = loads.append
+
+    start = pd.Timestamp("2023-05-09 22:30:00")
+    time, _ = handler.get_data(DHT11_TEMPERATURE, start, None)
+    # Until the pages are loaded only the readings in memory are returned
+    assert time[0] == np.datetime64("2023-05-10 00:00:00") and len(loads) == 1
+    assert not any(name.endswith("paged") for name in handler.memory_usage())
+
+    loads.pop()()
+    time, _ = handler.get_data(DHT11_TEMPERATURE, start, None)
+    assert time[0] == start.to_datetime64() and not loads
+    assert any(name.endswith("paged") for name in handler.memory_usage())
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from sources import SensorDataFrameHandler
+from sources.raspberrysensors.datatypes import Sensor, SensorData, SensorType
+from sources.raspberrysensors.seriesstore import SeriesBuffer, SeriesStore
+
+DHT11_TEMPERATURE = (SensorType.Temperature, Sensor.DHT11)
+DHT11_HUMIDITY = (SensorType.Humidity, Sensor.DHT11)
+
+
+def make_frame(start: str, periods: int, sensor_type="temperature", unit="C"):
+    timestamps = pd.date_range(start, periods=periods, freq="s")
+    df = pd.DataFrame(
+        {
+            "sensor_type": sensor_type,
+            "sensor": "DHT11",
+            "timestamp": timestamps,
+            "reading": np.arange(periods, dtype=np.float64),
+            "unit": unit,
+        }
+    )
+    return SensorData.repair_dataframe(df).sort_index()
+
+
+def test_append_delta():
+    store = SeriesStore.from_frame(make_frame("2023-05-09 00:00:00", 2000))
+    assert store.high_water_mark == pd.Timestamp("2023-05-09 00:33:19")
+
+    # The archive query is inclusive, the first row is a duplicate
+    changed = store.append_frame(make_frame("2023-05-09 00:33:19", 3))
+    assert changed == {DHT11_TEMPERATURE}
+    time, value = store.series(DHT11_TEMPERATURE).arrays()
+    assert len(time) == 2002
+    assert np.all(np.diff(time) > np.timedelta64(0))
+    assert store.high_water_mark == pd.Timestamp("2023-05-09 00:33:21")
+
+
+def test_append_out_of_order():
+    store = SeriesStore.from_frame(make_frame("2023-05-09 00:00:10", 10))
+    store.append_frame(make_frame("2023-05-09 00:00:00", 15))
+    time, _ = store.series(DHT11_TEMPERATURE).arrays()
+    assert len(time) == 20
+    assert np.all(np.diff(time) > np.timedelta64(0))
+
+
+def test_nan_readings_are_dropped():
+    frame = make_frame("2023-05-09 00:00:00", 5)
+    frame.iloc[2, frame.columns.get_loc("reading")] = np.nan
+    store = SeriesStore.from_frame(frame)
+    assert len(store.series(DHT11_TEMPERATURE)) == 4
+
+
+def test_to_dataframe_roundtrip():
+    frame = pd.concat(
+        (
+            make_frame("2023-05-09 00:00:00", 5),
+            make_frame("2023-05-09 00:00:00", 5, "humidity", "%"),
+        )
+    ).sort_index()
+    store = SeriesStore.from_frame(frame)
+    assert store.keys() == {DHT11_TEMPERATURE, DHT11_HUMIDITY}
+    rebuilt = store.to_dataframe()
+    SensorData.validate(rebuilt)
+    pd.testing.assert_frame_equal(rebuilt, frame, check_index_type=False)
+
+
+def test_get_data_returns_cached_read_only_views():
+    handler = SensorDataFrameHandler()
+    handler._set_store(SeriesStore.from_frame(make_frame("2023-05-09 00:00:00", 10)))
+    time, value = handler.get_data(DHT11_TEMPERATURE)
+    assert not time.flags.writeable and not value.flags.writeable
+    assert handler.get_data(DHT11_TEMPERATURE)[0] is time
+
+    version = handler.data_version(DHT11_TEMPERATURE)
+    handler._store.append_frame(make_frame("2023-05-09 00:00:10", 2))
+    assert handler.data_version(DHT11_TEMPERATURE) > version
+    new_time, _ = handler.get_data(DHT11_TEMPERATURE)
+    assert len(new_time) == 12 and len(time) == 10
+    np.testing.assert_array_equal(new_time[:10], time)
+
+
+class InterleavedBuffer(SeriesBuffer):
+    """Reads the arrays whenever the writer sets an attribute, as a reader on another thread could"""
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if "reads" in self.__dict__:
+            self.reads.append(self.arrays())
+
+
+def test_readers_see_consistent_arrays_while_the_buffer_is_trimmed():
+    start = np.datetime64("2023-05-09T00:00:00", "ns")
+    buffer = InterleavedBuffer("C")
+    buffer.reads = []
+    for block in range(20):
+        offsets = np.arange(block * 100, (block + 1) * 100)
+        buffer.append(start + offsets * np.timedelta64(1, "s"), offsets)
+        buffer.trim_before(start + (offsets[-1] - 250) * np.timedelta64(1, "s"))
+    assert len(buffer) == 251
+    for time, value in buffer.reads:
+        seconds = (time - start) / np.timedelta64(1, "s")
+        assert len(time) == len(value) and np.array_equal(seconds, value)
@@ -0,0 +1,51 @@
+import numpy as np
+from datamodels import StreamingStatistics
+
+TIME = np.arange("2023-05-09T00:00", "2023-05-09T01:00", dtype="datetime64[s]")
+VALUE = np.round(20 + 5 * np.sin(np.arange(len(TIME)) / 300))
+
+
+def test_incremental_statistics_match_numpy():
+    statistics = StreamingStatistics()
+    for end in (10, 11, 500, 501, len(TIME)):
+        statistics.update(TIME[:end], VALUE[:end])
+    assert statistics.count == len(VALUE)
+    assert statistics.minimum == VALUE.min() and statistics.maximum == VALUE.max()
+    np.testing.assert_allclose(statistics.mean, VALUE.mean())
+    np.testing.assert_allclose(statistics.variance, VALUE.var(ddof=1))
+    assert statistics.step == 1.0
+    assert statistics.dynamic_range == 10
+    assert statistics.last_time == TIME[-1]
+
+
+def test_replaced_series_starts_over():
+    statistics = StreamingStatistics()
+    statistics.update(TIME, VALUE)
+    statistics.update(TIME[100:200], np.full(100, 3.5))
+    assert statistics.count == 100
+    assert statistics.minimum == statistics.maximum == 3.5
+    assert statistics.step == 0.5
+    assert statistics.dtype == np.float64
+    statistics.update(TIME[:10], VALUE[:10].astype(np.float32))
+    assert statistics.dtype == np.float32
+
+
+def test_bins_are_centered_on_quantized_values():
+    statistics = StreamingStatistics()
+    statistics.update(TIME, VALUE)
+    bins = statistics.bins(16)
+    np.testing.assert_allclose(bins[:2], [14.5, 15.5])
+    assert bins[-1] == 25.5
+    # Too many values for the bin count doubles the bin width
+    assert np.all(np.diff(statistics.bins(4)) == 4.0)
+    continuous = StreamingStatistics()
+    continuous.add(np.linspace(0, 1.234, 100))
+    assert continuous.step == 0.0 and len(continuous.bins(16)) == 18
+
+
+def test_new_generation_on_the_same_times_starts_over():
+    statistics = StreamingStatistics()
+    statistics.update(TIME, VALUE)
+    statistics.update(TIME, VALUE + 10, generation=1)
+    assert statistics.count == len(VALUE)
+    assert statistics.maximum == VALUE.max() + 10
@@ -0,0 +1,40 @@
+import numpy as np
+from datamodels.storage import (
+    CompactSeries,
+    MemoryUsage,
+    memory_report,
+    quantization_step,
+)
+from sources.raspberrysensors.seriesstore import SeriesBuffer
+
+TIME = np.arange("2023-05-09T00:00", "2023-05-09T01:00", dtype="datetime64[s]")
+
+
+def test_quantization_step_is_the_largest_common_step():
+    assert quantization_step(np.array([21.0, 22.0, 25.0])) == 1.0
+    assert quantization_step(np.array([21.5625, 21.625]).astype(np.float32)) == 0.0625
+    assert quantization_step(np.array([0.1, 0.2]), previous=0.25) == 0.05
+    assert quantization_step(np.array([21.123])) == 0.0
+    assert quantization_step(np.array([1.0]), previous=0.0) == 0.0
+
+
+def test_buffer_holds_the_canonical_layout():
+    buffer = SeriesBuffer("C")
+    buffer.append(TIME[:100], np.full(100, 21.0))
+    assert buffer.step == 1.0
+    buffer.append(TIME[100:200], np.full(100, 21.5))
+    assert buffer.step == 0.5
+    time, value = buffer.arrays()
+    assert time.dtype == np.dtype("datetime64[ns]") and value.dtype == np.float32
+    assert time[150] == TIME[150] and buffer.latest == TIME[199]
+    assert buffer.memory() == MemoryUsage(200, 200 * 12, 1024 * 12)
+
+
+def test_memory_report_totals_per_source():
+    series = CompactSeries(TIME, np.arange(len(TIME)))
+    assert series.memory() == MemoryUsage(3600, 3600 * 12, 3600 * 12)
+    usage = {"Yr Historic": {"a": series.memory(), "b": series.memory()}}
+    report = memory_report(usage)
+    lines = report.splitlines()
+    assert lines[0].startswith("Yr Historic: 7200 rows")
+    assert lines[-1].startswith("Total: 7200 rows")
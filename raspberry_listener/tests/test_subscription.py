@@ -0,0 +1,64 @@
+import threading
+
+import pandas as pd
+import pytest
+from sources import SensorDataFrameHandler
+from sources.raspberrysensors.archivecache import ArchiveCache
+from sources.raspberrysensors.datatypes import Sensor, SensorType
+from sources.raspberrysensors.remotereader import Transport
+from sources.raspberrysensors.standinserver import StandInPi
+
+DHT11_TEMPERATURE = (SensorType.Temperature, Sensor.DHT11)
+
+
+@pytest.fixture
+def make_handler(tmp_path):
+    servers = []
+
+    def make(push: bool):
+        pi = StandInPi(cadence=0.1, history=pd.Timedelta(minutes=10), push=push)
+        servers.append(pi.start())
+        return SensorDataFrameHandler(
+            ArchiveCache(tmp_path), transport=Transport(pi.url)
+        )
+
+    yield make
+    for pi in servers:
+        pi.stop()
+
+
+def test_initial_load_from_stand_in(make_handler):
+    handler = make_handler(push=True)
+    handler.initial_load()
+    time, _ = handler.get_data(DHT11_TEMPERATURE)
+    assert len(time) >= 6000
+    handler.update_data()
+    assert len(handler.get_data(DHT11_TEMPERATURE)[0]) >= len(time)
+
+
+def test_push_subscription_delivers_readings(make_handler):
+    handler = make_handler(push=True)
+    handler.initial_load()
+    length = len(handler.get_data(DHT11_TEMPERATURE)[0])
+    received = threading.Event()
+    closed = []
+
+    subscription = handler.subscribe(received.set, closed.append)
+    assert received.wait(timeout=5)
+    subscription.stop()
+    assert len(handler.get_data(DHT11_TEMPERATURE)[0]) > length
+
+
+def test_push_not_available_falls_back(make_handler):
+    handler = make_handler(push=False)
+    handler.initial_load()
+    closed = threading.Event()
+    availability = []
+
+    def on_closed(available: bool):
+        availability.append(available)
+        closed.set()
+
+    handler.subscribe(lambda: None, on_closed)
+    assert closed.wait(timeout=5)
+    assert availability == [False]
@@ -0,0 +1,58 @@
+import numpy as np
+from datamodels import TimeOfDayHistogram
+
+rng = np.random.default_rng(0)
+TIME = np.arange("2023-05-09T00:00", "2023-05-12T00:00", dtype="datetime64[m]")
+VALUE = np.round(rng.normal(20, 3, len(TIME))).astype(np.float32)
+BINS = np.linspace(VALUE.min(), VALUE.max() + 1, 8, dtype=np.float32)
+
+
+def histogram_by_hour(time, value, bins):
+    hour = time.astype("datetime64[h]").astype(np.int64) % 24
+    return np.array([np.histogram(value[hour == h], bins)[0] for h in range(24)])
+
+
+def test_counts_match_numpy_per_hour_as_rows_are_appended():
+    histogram = TimeOfDayHistogram()
+    for end in (1, 30, 61, 2000, len(TIME)):
+        histogram.update(TIME[:end], VALUE[:end], BINS)
+        np.testing.assert_array_equal(
+            histogram.counts, histogram_by_hour(TIME[:end], VALUE[:end], BINS)
+        )
+    np.testing.assert_allclose(histogram.fractions().sum(axis=1), 1.0)
+
+
+def test_new_bins_and_replaced_series_are_counted_again():
+    histogram = TimeOfDayHistogram()
+    histogram.update(TIME, VALUE, BINS)
+    bins = BINS[::2]
+    histogram.update(TIME, VALUE, bins)
+    np.testing.assert_array_equal(
+        histogram.counts, histogram_by_hour(TIME, VALUE, bins)
+    )
+
+    histogram.update(TIME[60:120], VALUE[60:120], bins)
+    assert histogram.counts.sum() == 60
+    assert histogram.counts[1].sum() == 60
+    assert histogram.fractions()[0].sum() == 0
+
+
+def test_clock_is_one_collection_updated_in_place():
+    import matplotlib
+    from matplotlib.figure import Figure
+    from plotstrategies import TimeOfDayPlot
+
+    ax = Figure().add_subplot(projection="polar")
+    plot = TimeOfDayPlot(None, None)  # type: ignore
+    plot.set_colormap(matplotlib.colormaps["turbo"])
+    histogram = TimeOfDayHistogram()
+    histogram.update(TIME, VALUE, BINS)
+    plot.plot_clock(ax, histogram.fractions(), BINS)
+    collection = plot.artist()
+    plot.plot_clock(ax, histogram.fractions()[::-1], BINS)
+    assert plot.artist() is collection
+    assert list(ax.collections) == [collection]
+    assert len(ax.lines) == 24
+    assert len(collection.get_paths()) == 24 * (len(BINS) - 1)
+    centres = (BINS[:-1] + BINS[1:]) / 2
+    np.testing.assert_array_equal(collection.get_array()[: len(centres)], centres)
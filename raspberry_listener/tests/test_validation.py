@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from sources import PollOutcome, SensorDataFrameHandler
+from sources.raspberrysensors.archivecache import ArchiveCache
+from sources.raspberrysensors.datatypes import SensorReading
+from sources.raspberrysensors.seriesstore import SeriesStore
+from sources.raspberrysensors.validation import (
+    InvalidArchiveException,
+    ValidationMode,
+    ValidationPolicy,
+    fast_check,
+)
+
+from .test_seriesstore import DHT11_TEMPERATURE, make_frame
+
+
+def test_valid_delta_passes():
+    policy = ValidationPolicy()
+    delta = make_frame("2023-05-09 00:00:00", 10)
+    assert policy.validate(delta, initial=False) is delta
+    assert policy.timings[ValidationMode.Fast].calls == 1
+    assert policy.timings[ValidationMode.Full].calls == 0
+
+
+def test_first_load_is_validated_in_full():
+    policy = ValidationPolicy()
+    policy.validate(make_frame("2023-05-09 00:00:00", 1000), initial=True)
+    policy.validate(make_frame("2023-05-09 00:16:40", 5), initial=False)
+    full = policy.timings[ValidationMode.Full]
+    assert (full.calls, full.rows) == (1, 1000)
+    assert full.seconds > 0
+    fast = policy.timings[ValidationMode.Fast]
+    assert (fast.calls, fast.rows) == (1, 5)
+
+
+def test_nan_readings_are_rejected():
+    df = make_frame("2023-05-09 00:00:00", 10)
+    df.iloc[3, df.columns.get_loc("reading")] = np.nan
+    with pytest.raises(InvalidArchiveException, match="NaN"):
+        fast_check(df)
+
+
+def test_out_of_order_and_duplicated_rows_are_sorted_out():
+    policy = ValidationPolicy()
+    df = make_frame("2023-05-09 00:00:00", 10)
+    assert policy.validate(df.iloc[::-1], initial=False).equals(df)
+    assert policy.validate(pd.concat([df.iloc[:5], df.iloc[4:]]), initial=True).equals(
+        df
+    )
+
+
+def test_a_delta_with_a_duplicated_row_is_ingested(tmp_path):
+    handler = SensorDataFrameHandler(cache=ArchiveCache(tmp_path))
+    handler._set_store(SeriesStore.from_frame(make_frame("2023-05-09 00:00:00", 10)))
+    delta = make_frame("2023-05-09 00:00:09", 5)
+    delta = pd.concat([delta.iloc[:3], delta.iloc[2:]])
+    handler._read_archive = lambda *args: handler.validation.validate(delta, False)
+    handler.update_data()
+    assert handler.last_poll == PollOutcome.NewData
+    assert handler._store.high_water_mark == pd.Timestamp("2023-05-09 00:00:13")
+    assert len(handler.get_data(DHT11_TEMPERATURE)[0]) == 14
+
+
+def test_unknown_sensor_categories_are_rejected():
+    df = make_frame("2023-05-09 00:00:00", 10).reset_index()
+    foreign = df.copy()
+    foreign["sensor"] = pd.Categorical(["BME280"] * len(df))
+    with pytest.raises(InvalidArchiveException, match="unknown values"):
+        fast_check(foreign.set_index(["sensor_type", "sensor", "timestamp"]))
+    missing = df.copy()
+    missing["sensor"] = pd.Categorical(
+        ["BME280"] * len(df), categories=df["sensor"].cat.categories
+    )
+    with pytest.raises(InvalidArchiveException, match="missing values"):
+        fast_check(missing.set_index(["sensor_type", "sensor", "timestamp"]))
+
+
+def test_pushed_readings_go_through_the_policy(tmp_path):
+    handler = SensorDataFrameHandler(cache=ArchiveCache(tmp_path))
+    handler._set_store(SeriesStore.from_frame(make_frame("2023-05-09 00:00:00", 10)))
+
+    def reading(second: int, value: float) -> SensorReading:
+        return SensorReading(
+            sensor_type="temperature",
+            sensor="DHT11",
+            timestamp=datetime(2023, 5, 9, 0, 0, second),
+            reading=value,
+            unit="C",
+        )
+
+    assert not handler.append_readings([reading(10, 1.0), reading(11, np.nan)])
+    assert handler.append_readings([reading(10, 1.0), reading(11, 2.0)])
+    assert len(handler.get_data(DHT11_TEMPERATURE)[0]) == 12
@@ -1,11 +1,16 @@
+import logging
+from functools import partial
 from typing import Callable
 
 from datamodels import DataTypeManager
-from datathread import DataThreadController
+from datamodels.storage import memory_report
+from datathread import DataThreadController, PollScheduler
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from .plottab import DataTypeTabWidget
 
+logger = logging.getLogger("dataplotterwindow")
+
 
 class DataSetList(QtWidgets.QDialog):
     # Dialog widget for choosing a dataset to load
@@ -56,7 +61,9 @@ class DataPlotterWindow(QtWidgets.QMainWindow):
         self.tab_widgets: dict[str, DataTypeTabWidget] = {}
         self.setCentralWidget(self.tab_widget)
         self._loaded_datasets: set[str] = set()
-        self._data_loading_threads = {}
+        self._data_loading_threads: dict[str, DataThreadController] = {}
+        self._poll_status_labels: dict[str, QtWidgets.QLabel] = {}
+        self.tab_widget.currentChanged.connect(self.visibility_changed)
 
         self.dataset_picker = DataSetList(self.available_datasets)
         self.dataset_picker.load_dataset.connect(self._load_dataset)
@@ -68,6 +75,8 @@ class DataPlotterWindow(QtWidgets.QMainWindow):
             thread = self.dataset_loader(name, self.datatype_manager)
             self._loaded_datasets.add(name)
             self._data_loading_threads[name] = thread
+            if thread.poller is not None:
+                self.show_poll_status(name, thread.poller)
             if name in self.available_datasets:
                 self.available_datasets.remove(name)
             self.create_missing_datatype_tabs(self.datatype_manager)
@@ -82,6 +91,55 @@ class DataPlotterWindow(QtWidgets.QMainWindow):
                 self.tab_widgets[data_model.name()] = tab
                 self.tab_widget.addTab(tab, data_model.name())
                 self.tab_widget.currentChanged.connect(tab.update_plots)
+                tab.currentChanged.connect(self.visibility_changed)
+                for widget in tab.widgets.values():
+                    widget.plots_toggled.connect(self.visibility_changed)
+
+    def source_visible(self, source_name: str) -> bool:
+        if not self.isVisible() or self.isMinimized():
+            return False
+        return any(
+            widget.manager is not None and widget.manager.shows_source(source_name)
+            for tab in self.tab_widgets.values()
+            for widget in tab.widgets.values()
+        )
+
+    def show_poll_status(self, source_name: str, poller: PollScheduler):
+        poller.set_visible_fn(partial(self.source_visible, source_name))
+        label = QtWidgets.QLabel(f"{source_name}: polling")
+        self._poll_status_labels[source_name] = label
+        self.statusBar().addPermanentWidget(label)
+        poller.changed.connect(lambda status: label.setText(f"{source_name}: {status}"))
+
+    def visibility_changed(self):
+        for thread in self._data_loading_threads.values():
+            if thread.poller is not None:
+                thread.poller.visibility_changed()
+
+    def memory_report(self) -> str:
+        """The memory held by the readings of every loaded source, and by what the models
+        keep of them, per series"""
+        usage = {
+            name: thread.memory_fn()
+            for name, thread in self._data_loading_threads.items()
+            if thread.memory_fn is not None
+        }
+        for type in self.datatype_manager.get_types():
+            model = self.datatype_manager.get_model(type)
+            model_usage = model.memory_usage()
+            if model_usage:
+                usage[f"{model.name()} model"] = model_usage
+        return memory_report(usage)
+
+    def show_memory_report(self):
+        report = self.memory_report()
+        logger.info(report)
+        QtWidgets.QMessageBox.information(self, "Memory", report)
+
+    def changeEvent(self, event: QtCore.QEvent):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.Type.WindowStateChange:
+            self.visibility_changed()
 
     def set_menubar(self):
         menubar = self.menuBar()
@@ -93,3 +151,7 @@ class DataPlotterWindow(QtWidgets.QMainWindow):
         add_plot_action = QtGui.QAction("Create &Plot", self)
         add_plot_action.setDisabled(True)
         menubar.addAction(add_plot_action)
+
+        memory_action = QtGui.QAction("&Memory", self)
+        memory_action.triggered.connect(self.show_memory_report)
+        menubar.addAction(memory_action)
@@ -1,2 +1,3 @@
+from .blitter import Blitter
 from .drawwidget import DrawWidget
 from .navbarbuilder import NavBarBuilder, Side
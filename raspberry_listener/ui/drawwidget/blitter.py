@@ -0,0 +1,48 @@
+from matplotlib.artist import Artist
+from matplotlib.backend_bases import FigureCanvasBase
+
+
+class Blitter:
+    """Redraws a few animated artists over a cached background instead of the whole figure.
+
+    Animated artists are left out of a full draw. After every full draw the rendered figure is
+    kept as the background and the artists are drawn on top of it. blit restores the background
+    and draws only the artists, so the axes, ticks, grid and legend aren't rendered again.
+    """
+
+    def __init__(self, canvas: FigureCanvasBase):
+        self.canvas = canvas
+        self.artists: list[Artist] = []
+        self._background = None
+        canvas.mpl_connect("draw_event", self.on_draw)
+
+    def set_artists(self, artists: list[Artist]):
+        """The artists drawn by blit. They are animated, and left out of full draws, until replaced."""
+        for artist in self.artists:
+            if artist not in artists:
+                artist.set_animated(False)
+        for artist in artists:
+            artist.set_animated(True)
+        self.artists = list(artists)
+
+    def on_draw(self, event):
+        figure = self.canvas.figure
+        self._background = self.canvas.copy_from_bbox(figure.bbox)
+        self._draw_artists()
+
+    def blit(self) -> bool:
+        """Draws the artists over the background. Returns False when there is no background yet
+        and the figure has to be drawn in full."""
+        if self._background is None:
+            return False
+        figure = self.canvas.figure
+        self.canvas.restore_region(self._background)
+        self._draw_artists()
+        self.canvas.blit(figure.bbox)
+        return True
+
+    def _draw_artists(self):
+        figure = self.canvas.figure
+        for artist in self.artists:
+            if artist.figure is not None and artist.get_visible():
+                figure.draw_artist(artist)
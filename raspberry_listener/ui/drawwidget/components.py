@@ -36,6 +36,23 @@ class RescalePlotButton(QtWidgets.QCheckBox):
         self.plot_widget.rescale_plot = checked
 
 
+class BlitPlotButton(QtWidgets.QCheckBox):
+    def __init__(
+        self, plot_widget: DrawWidget, parent: QtWidgets.QWidget | None = None
+    ):
+        super().__init__(parent)
+        self.plot_widget = plot_widget
+        self.setText("Only redraw data")
+        self.setToolTip(
+            "Redraws live updates over a cached background, the axes are drawn again when they change"
+        )
+        self.stateChanged.connect(self.set_blitting)
+        self.setChecked(self.plot_widget.blit)
+
+    def set_blitting(self, checked):
+        self.plot_widget.blit = bool(checked)
+
+
 class SimplifyPlotSpinBox(QtWidgets.QDoubleSpinBox):
     def __init__(
         self, plot_widget: DrawWidget, parent: QtWidgets.QWidget | None = None
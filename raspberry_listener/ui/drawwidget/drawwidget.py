@@ -4,6 +4,8 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from PySide6 import QtWidgets
 
+from .blitter import Blitter
+
 
 class LayoutBuilder(Protocol):
     def build(self, widget: "DrawWidget") -> QtWidgets.QHBoxLayout:
@@ -11,7 +13,7 @@ class LayoutBuilder(Protocol):
 
 
 class DrawWidget(QtWidgets.QWidget):
-    def __init__(self, rescale_plot=True, parent=None):
+    def __init__(self, rescale_plot=True, blit=False, parent=None):
         super().__init__(parent)
 
         self.canvas_toolbar_layout = QtWidgets.QVBoxLayout()
@@ -20,6 +22,9 @@ class DrawWidget(QtWidgets.QWidget):
         self.canvas_toolbar_layout.addWidget(self.canvas)
         self.plot_live = True
         self.rescale_plot = rescale_plot
+        # Live updates redraw only the plotted data over a cached background, see Blitter
+        self.blit = blit
+        self.blitter = Blitter(self.canvas)
 
     def add_axes(self, *args, subplot=True, **kwargs):
         if subplot:
@@ -4,7 +4,12 @@ from typing import Self
 from matplotlib.backends.backend_qt import NavigationToolbar2QT as NavigationToolbar
 from PySide6 import QtWidgets
 
-from .components import FreezePlotButton, RescalePlotButton, SimplifyPlotSpinBox
+from .components import (
+    BlitPlotButton,
+    FreezePlotButton,
+    RescalePlotButton,
+    SimplifyPlotSpinBox,
+)
 from .drawwidget import DrawWidget
 
 
@@ -49,6 +54,12 @@ class NavBarBuilder:
         )
         return self
 
+    def blit_plot(self, side: Side = Side.Left) -> Self:
+        self.queue.append(
+            lambda widget: self.nav_layouts[side].addWidget(BlitPlotButton(widget))
+        )
+        return self
+
     def simplify_plot(self, side: Side = Side.Right) -> Self:
         self.queue.append(
             lambda widget: self.nav_layouts[side].addWidget(SimplifyPlotSpinBox(widget))
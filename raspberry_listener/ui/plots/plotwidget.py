@@ -3,7 +3,7 @@ from typing import Self
 
 from datamodels import DataIdentifier
 from plotmanager import PlotManager
-from PySide6 import QtWidgets
+from PySide6 import QtCore, QtWidgets
 from ui.dataselector import DataSelector
 from ui.drawwidget import DrawWidget
 
@@ -13,6 +13,8 @@ class ManagerNotSetException(Exception):
 
 
 class PlotWidget(DrawWidget):
+    plots_toggled = QtCore.Signal()
+
     @staticmethod
     def ensure_manager(fn):
         @wraps(fn)
@@ -29,9 +31,10 @@ class PlotWidget(DrawWidget):
         self,
         selector: DataSelector,
         rescale_plot: bool,
+        blit: bool = False,
         parent: QtWidgets.QWidget | None = None,
     ):
-        super().__init__(rescale_plot, parent=parent)
+        super().__init__(rescale_plot, blit=blit, parent=parent)
         self.manager: PlotManager = None  # type: ignore
         self.h_layout = QtWidgets.QHBoxLayout()
         self.h_layout.addWidget(selector.widget())
@@ -45,6 +48,7 @@ class PlotWidget(DrawWidget):
             self.manager.add_plotting_strategy(dataset)
         else:
             self.manager.remove_plotting_strategy(dataset)
+        self.plots_toggled.emit()
 
     @ensure_manager
     def plot(self):
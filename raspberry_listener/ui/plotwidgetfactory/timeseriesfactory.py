@@ -59,6 +59,7 @@ def build_lineplot_widget(model: DataTypeModel) -> PlotWidget:
         .freeze_plot()
         .simplify_plot()
         .rescale_plot()
+        .blit_plot()
     )
     return lineplot_widget
 